@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from appointment_service.models import RecurringPattern
+from appointment_service.slot_generation import generate_slots, BULK_CREATE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Generate time slots for all active recurring patterns over a rolling horizon'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=28,
+                            help='Number of days ahead to fill with slots (default: 28)')
+        parser.add_argument('--batch-size', type=int, default=BULK_CREATE_BATCH_SIZE,
+                            help=f'Number of slots inserted per query (default: {BULK_CREATE_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+
+        today = timezone.localdate()
+        horizon_end = today + timedelta(days=options['days'])
+
+        patterns = RecurringPattern.objects.filter(
+            is_active=True,
+            start_date__lte=horizon_end
+        ).filter(Q(end_date__isnull=True) | Q(end_date__gte=today))
+
+        # Clamp the horizon to each pattern's own validity period
+        pattern_ranges = [
+            (
+                pattern,
+                max(today, pattern.start_date),
+                min(horizon_end, pattern.end_date) if pattern.end_date else horizon_end
+            )
+            for pattern in patterns
+        ]
+
+        self.stdout.write(f'Generating slots for {len(pattern_ranges)} active patterns '
+                          f'from {today} to {horizon_end}...')
+        new_slots = generate_slots(pattern_ranges, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Created {len(new_slots)} time slots'))
@@ -0,0 +1,63 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from appointment_service.slot_generation import claim_next_job, run_job, BULK_CREATE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Process queued time slot generation jobs with a pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Number of jobs processed concurrently (default: 4)')
+        parser.add_argument('--poll-interval', type=float, default=5.0,
+                            help='Seconds to wait before polling again when the queue is empty (default: 5)')
+        parser.add_argument('--batch-size', type=int, default=BULK_CREATE_BATCH_SIZE,
+                            help=f'Number of slots inserted per query (default: {BULK_CREATE_BATCH_SIZE})')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling for new jobs')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        self.options = options
+        self.stop_event = threading.Event()
+        self.stdout.write(f"Starting {options['workers']} slot generation workers...")
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [executor.submit(self.work) for _ in range(options['workers'])]
+            try:
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping workers after their current chunk...')
+                self.stop_event.set()
+
+        self.stdout.write(self.style.SUCCESS('Slot generation workers stopped'))
+
+    def work(self):
+        """Claim and run jobs until stopped (or until the queue is empty with --once)"""
+        try:
+            while not self.stop_event.is_set():
+                job = claim_next_job()
+                if job is None:
+                    if self.options['once']:
+                        return
+                    self.stop_event.wait(self.options['poll_interval'])
+                    continue
+
+                started = time.monotonic()
+                run_job(job, batch_size=self.options['batch_size'], stop_event=self.stop_event)
+                job.refresh_from_db()
+                self.stdout.write(
+                    f'Job {job.job_id} {job.status.lower()}: {job.slots_created} slots '
+                    f'in {time.monotonic() - started:.1f}s'
+                )
+        finally:
+            # Each worker thread has its own database connections
+            connections.close_all()
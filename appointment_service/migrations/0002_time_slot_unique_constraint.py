@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='timeslot',
+            constraint=models.UniqueConstraint(fields=('provider_id', 'provider_type', 'start_time', 'end_time'), name='unique_provider_time_slot'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment_service', '0002_time_slot_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotGenerationJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=20, unique=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('chunk_days', models.IntegerField(default=28)),
+                ('processed_through', models.DateField(blank=True, null=True)),
+                ('slots_created', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('requested_by', models.CharField(max_length=50)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pattern', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='generation_jobs', to='appointment_service.recurringpattern')),
+            ],
+            options={
+                'db_table': 'slot_generation_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='slotgenerationjob',
+            index=models.Index(fields=['status', 'created_at'], name='slot_genera_status_0f437b_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment_service', '0003_slot_generation_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='timeslot',
+            name='time_slots_provide_8f1403_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='timeslot',
+            name='time_slots_is_avai_5556fe_idx',
+        ),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(fields=['status', 'scheduled_time'], name='reminders_status_4d1a08_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeslot',
+            index=models.Index(fields=['provider_id', 'provider_type', 'is_available', 'start_time'], name='time_slots_provide_18722f_idx'),
+        ),
+    ]
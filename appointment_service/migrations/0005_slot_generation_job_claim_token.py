@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointment_service', '0004_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slotgenerationjob',
+            name='claim_token',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+    ]
@@ -23,9 +23,14 @@ class TimeSlot(models.Model):
         db_table = 'time_slots'
         ordering = ['start_time']
         indexes = [
-            models.Index(fields=['provider_id']),
-            models.Index(fields=['start_time']),
-            models.Index(fields=['is_available'])
+            models.Index(fields=['provider_id', 'provider_type', 'is_available', 'start_time']),
+            models.Index(fields=['start_time'])
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['provider_id', 'provider_type', 'start_time', 'end_time'],
+                name='unique_provider_time_slot'
+            )
         ]
     
     def __str__(self):
@@ -135,6 +140,9 @@ class Reminder(models.Model):
     class Meta:
         db_table = 'reminders'
         ordering = ['scheduled_time']
+        indexes = [
+            models.Index(fields=['status', 'scheduled_time'])
+        ]
     
     def __str__(self):
         return f"{self.reminder_type} reminder for appointment {self.appointment.appointment_id}"
@@ -179,3 +187,52 @@ class RecurringPattern(models.Model):
     
     def __str__(self):
         return f"{self.provider_type} {self.provider_id} - {self.day_of_week} {self.start_time.strftime('%H:%M')} to {self.end_time.strftime('%H:%M')}"
+
+
+class SlotGenerationJob(models.Model):
+    """Model for background time slot generation jobs"""
+    job_id = models.CharField(max_length=20, unique=True)
+    pattern = models.ForeignKey(RecurringPattern, on_delete=models.CASCADE, related_name='generation_jobs')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('PENDING', 'Pending'),
+            ('RUNNING', 'Running'),
+            ('COMPLETED', 'Completed'),
+            ('FAILED', 'Failed')
+        ],
+        default='PENDING'
+    )
+    chunk_days = models.IntegerField(default=28)  # Days of the range generated per chunk
+    processed_through = models.DateField(blank=True, null=True)  # Last date whose slots have been generated
+    slots_created = models.IntegerField(default=0)
+    claim_token = models.CharField(max_length=32, blank=True, null=True)  # Identifies the worker running the job
+    error = models.TextField(blank=True, null=True)
+    requested_by = models.CharField(max_length=50)  # ID of the user who requested the job
+    started_at = models.DateTimeField(blank=True, null=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'slot_generation_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'])
+        ]
+    
+    def __str__(self):
+        return f"Slot generation job {self.job_id} ({self.status})"
+    
+    @property
+    def progress(self):
+        """Percentage of the date range that has been processed"""
+        if self.status == 'COMPLETED':
+            return 100
+        if not self.processed_through:
+            return 0
+        total_days = (self.end_date - self.start_date).days + 1
+        done_days = (self.processed_through - self.start_date).days + 1
+        return min(100, int(done_days * 100 / total_days))
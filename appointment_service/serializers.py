@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import TimeSlot, AppointmentType, Appointment, Reminder, RecurringPattern
+from .models import TimeSlot, AppointmentType, Appointment, Reminder, RecurringPattern, SlotGenerationJob
 
 
 class TimeSlotSerializer(serializers.ModelSerializer):
@@ -78,6 +78,19 @@ class RecurringPatternSerializer(serializers.ModelSerializer):
         read_only_fields = ['pattern_id', 'created_at', 'updated_at']
         
 
+class SlotGenerationJobSerializer(serializers.ModelSerializer):
+    pattern_id = serializers.CharField(source='pattern.pattern_id', read_only=True)
+    progress = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = SlotGenerationJob
+        fields = '__all__'
+        read_only_fields = [
+            'job_id', 'status', 'processed_through', 'slots_created', 'error',
+            'requested_by', 'started_at', 'completed_at', 'created_at', 'updated_at'
+        ]
+        
+
 class ProviderScheduleSerializer(serializers.Serializer):
     provider_id = serializers.CharField(max_length=50)
     provider_type = serializers.ChoiceField(choices=[
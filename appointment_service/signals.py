@@ -0,0 +1,39 @@
+"""Publish the upcoming appointments section of the patient summary and clear the doctor dashboard counters"""
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from healthcare import doctor_dashboard
+from healthcare.patient_summary import register_section, schedule_publish
+
+from .models import Appointment
+from .serializers import AppointmentSerializer
+
+SUMMARY_SECTION = 'upcoming_appointments'
+SUMMARY_LIMIT = 20
+UPCOMING_STATUSES = ('SCHEDULED', 'CONFIRMED', 'CHECKED_IN')
+
+
+def upcoming_appointments(patient_id):
+    appointments = Appointment.objects.select_related(
+        'time_slot', 'appointment_type'
+    ).prefetch_related('reminders').filter(
+        patient_id=patient_id, status__in=UPCOMING_STATUSES, time_slot__start_time__gte=timezone.now()
+    ).order_by('time_slot__start_time')[:SUMMARY_LIMIT]
+    return AppointmentSerializer(appointments, many=True).data
+
+
+def patients_with_appointments():
+    return Appointment.objects.order_by().values_list('patient_id', flat=True).distinct()
+
+
+register_section(SUMMARY_SECTION, upcoming_appointments, patients_with_appointments)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def appointment_changed(sender, instance, **kwargs):
+    using = router.db_for_write(Appointment)
+    schedule_publish(instance.patient_id, SUMMARY_SECTION, using)
+    doctor_dashboard.invalidate_stats(instance.provider_id, using)
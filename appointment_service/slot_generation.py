@@ -0,0 +1,162 @@
+"""
+Time slot generation from recurring patterns.
+
+Candidate slots are computed in memory, the provider's existing slots are
+fetched once into a set and only the missing slots are inserted, in batches.
+Large date ranges are handled by SlotGenerationJob, processed in chunks by the
+run_slot_generation_jobs worker.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from django.db import router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import TimeSlot, SlotGenerationJob
+
+logger = logging.getLogger(__name__)
+
+# Define day of week mapping
+DAY_MAPPING = {
+    'MONDAY': 0, 'TUESDAY': 1, 'WEDNESDAY': 2, 'THURSDAY': 3,
+    'FRIDAY': 4, 'SATURDAY': 5, 'SUNDAY': 6
+}
+
+BULK_CREATE_BATCH_SIZE = 500
+
+# A running job whose progress has not moved for this long is considered
+# abandoned by its worker and can be claimed again
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+
+def iter_pattern_slots(pattern, start_date, end_date):
+    """Yield (start_time, end_time) for each slot of the pattern between the two dates, inclusive"""
+    slot_duration = timedelta(minutes=pattern.slot_duration_minutes)
+    if slot_duration <= timedelta(0):
+        return
+
+    # Move to the first occurrence of the pattern's day of week
+    days_ahead = (DAY_MAPPING[pattern.day_of_week] - start_date.weekday()) % 7
+    current_date = start_date + timedelta(days=days_ahead)
+
+    while current_date <= end_date:
+        day_start = timezone.make_aware(datetime.combine(current_date, pattern.start_time))
+        day_end = timezone.make_aware(datetime.combine(current_date, pattern.end_time))
+
+        # Don't create slots that extend beyond the pattern's end time
+        slot_start = day_start
+        while slot_start + slot_duration <= day_end:
+            yield slot_start, slot_start + slot_duration
+            slot_start += slot_duration
+
+        current_date += timedelta(days=7)
+
+
+def generate_slots(pattern_ranges, batch_size=BULK_CREATE_BATCH_SIZE):
+    """
+    Create the missing time slots for ``pattern_ranges``, an iterable of
+    ``(pattern, start_date, end_date)`` tuples.
+
+    Existing slots of all involved providers are read with a single query and
+    the new ones are written with ``bulk_create``; the unique constraint on
+    the slot key makes concurrent runs safe. Returns the (unsaved) slots that
+    were submitted for insertion.
+    """
+    candidates = {}
+    for pattern, start_date, end_date in pattern_ranges:
+        for slot_start, slot_end in iter_pattern_slots(pattern, start_date, end_date):
+            key = (pattern.provider_id, pattern.provider_type, slot_start, slot_end)
+            candidates.setdefault(key, TimeSlot(
+                provider_id=pattern.provider_id,
+                provider_type=pattern.provider_type,
+                start_time=slot_start,
+                end_time=slot_end,
+                is_available=True
+            ))
+
+    if not candidates:
+        return []
+
+    existing = set(
+        TimeSlot.objects.filter(
+            provider_id__in={key[0] for key in candidates},
+            provider_type__in={key[1] for key in candidates},
+            start_time__gte=min(key[2] for key in candidates),
+            start_time__lte=max(key[2] for key in candidates),
+        ).values_list('provider_id', 'provider_type', 'start_time', 'end_time')
+    )
+
+    new_slots = [slot for key, slot in candidates.items() if key not in existing]
+    TimeSlot.objects.bulk_create(new_slots, batch_size=batch_size, ignore_conflicts=True)
+    return new_slots
+
+
+def claim_next_job(stale_after=STALE_JOB_TIMEOUT):
+    """
+    Atomically claim the oldest pending (or abandoned running) job and mark it
+    as running. Rows locked by other workers are skipped, so several workers
+    can claim jobs concurrently. The job gets a new claim token, so a worker
+    whose job was reclaimed can no longer record progress on it. Returns None
+    when there is nothing to do.
+    """
+    stale_before = timezone.now() - stale_after
+    with transaction.atomic(using=router.db_for_write(SlotGenerationJob)):
+        job = (
+            SlotGenerationJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(Q(status='PENDING') | Q(status='RUNNING', updated_at__lt=stale_before))
+            .order_by('created_at')
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = 'RUNNING'
+        job.claim_token = uuid.uuid4().hex
+        if not job.started_at:
+            job.started_at = timezone.now()
+        job.save(update_fields=['status', 'claim_token', 'started_at', 'updated_at'])
+    return job
+
+
+def run_job(job, batch_size=BULK_CREATE_BATCH_SIZE, stop_event=None):
+    """
+    Generate the slots of ``job`` one chunk of ``job.chunk_days`` days at a
+    time, recording progress after every chunk. A job resumed after a crash
+    continues after the last processed chunk.
+
+    Once ``stop_event`` is set the job is put back in the queue before its
+    next chunk. Every update is conditional on the job's claim token: if the
+    job was reclaimed by another worker, this one stops without recording the
+    chunk it just processed.
+    """
+    jobs = SlotGenerationJob.objects.filter(pk=job.pk, claim_token=job.claim_token)
+    chunk_days = max(1, job.chunk_days)
+    if job.processed_through:
+        chunk_start = job.processed_through + timedelta(days=1)
+    else:
+        chunk_start = job.start_date
+
+    try:
+        while chunk_start <= job.end_date:
+            if stop_event is not None and stop_event.is_set():
+                jobs.update(status='PENDING', claim_token=None, updated_at=timezone.now())
+                return
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), job.end_date)
+            new_slots = generate_slots([(job.pattern, chunk_start, chunk_end)], batch_size=batch_size)
+            if not jobs.update(
+                processed_through=chunk_end,
+                slots_created=F('slots_created') + len(new_slots),
+                updated_at=timezone.now()
+            ):
+                logger.warning(f"Slot generation job {job.job_id} was claimed by another worker")
+                return
+            chunk_start = chunk_end + timedelta(days=1)
+    except Exception as e:
+        logger.error(f"Slot generation job {job.job_id} failed: {e}")
+        jobs.update(status='FAILED', error=str(e), completed_at=timezone.now(), updated_at=timezone.now())
+        return
+
+    jobs.update(status='COMPLETED', completed_at=timezone.now(), updated_at=timezone.now())
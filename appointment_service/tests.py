@@ -1,3 +1,277 @@
+import threading
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from auth_service.models import User
+
+from .models import Appointment, AppointmentType, RecurringPattern, Reminder, SlotGenerationJob, TimeSlot
+from .slot_generation import claim_next_job, generate_slots, iter_pattern_slots, run_job
+
+PROVIDER_ID = '100'
+PATIENT_ID = '200'
+SCHEDULE_DATE = '2030-01-15'
+
+
+class AppointmentQueryCountTests(TestCase):
+    """
+    The appointment endpoints load their related time slots, appointment types
+    and reminders in a fixed number of queries, whatever the number of
+    appointments returned.
+    """
+    databases = {'default', 'appointment_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='password', role='ADMINISTRATOR'
+        )
+        cls.appointment_type = AppointmentType.objects.create(
+            type_id='CONSULT', name='Consultation', description='Consultation', duration_minutes=15
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_appointments(self, count):
+        day_start = timezone.make_aware(datetime(2030, 1, 15, 1))
+        TimeSlot.objects.bulk_create([
+            TimeSlot(
+                provider_id=PROVIDER_ID, provider_type='DOCTOR',
+                start_time=day_start + timedelta(minutes=i), end_time=day_start + timedelta(minutes=i + 1),
+                is_available=False
+            )
+            for i in range(count)
+        ])
+        Appointment.objects.bulk_create([
+            Appointment(
+                appointment_id=f'APT{i:05d}', patient_id=PATIENT_ID, provider_id=PROVIDER_ID,
+                provider_type='DOCTOR', appointment_type=self.appointment_type, time_slot=slot,
+                reason='Checkup', created_by=PATIENT_ID
+            )
+            for i, slot in enumerate(TimeSlot.objects.order_by('start_time'))
+        ])
+        Reminder.objects.bulk_create([
+            Reminder(appointment=appointment, reminder_type='EMAIL', scheduled_time=day_start)
+            for appointment in Appointment.objects.all()
+        ])
+
+    def assert_constant_queries(self, url, expected, results=lambda data: data['results']):
+        for count in (1, 500):
+            with self.subTest(appointments=count):
+                Appointment.objects.all().delete()
+                TimeSlot.objects.all().delete()
+                self.create_appointments(count)
+                with self.assertNumQueries(expected, using='appointment_db'):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(results(response.data)), count)
+
+    def test_list(self):
+        self.assert_constant_queries('/api/appointments/?page_size=500', 2)
+
+    def test_patient_appointments(self):
+        self.assert_constant_queries(
+            f'/api/appointments/patient_appointments/?patient_id={PATIENT_ID}&page_size=500', 2
+        )
+
+    def test_provider_appointments(self):
+        self.assert_constant_queries(
+            f'/api/appointments/provider_appointments/?provider_id={PROVIDER_ID}&page_size=500', 2
+        )
+
+    def test_daily_schedule(self):
+        self.assert_constant_queries(
+            f'/api/appointments/daily_schedule/?provider_id={PROVIDER_ID}&provider_type=DOCTOR&date={SCHEDULE_DATE}',
+            3, results=lambda data: data['appointments']
+        )
+
+
+class SlotGenerationTests(TestCase):
+    databases = {'appointment_db'}
+
+    def setUp(self):
+        # Mondays from 09:00 to 10:00 in 20 minute slots
+        self.pattern = RecurringPattern.objects.create(
+            pattern_id='PAT1', provider_id=PROVIDER_ID, provider_type='DOCTOR', day_of_week='MONDAY',
+            start_time=time(9), end_time=time(10), slot_duration_minutes=20,
+            start_date=date(2030, 1, 1)
+        )
+
+    def slot_starts(self):
+        return [timezone.localtime(start) for start in TimeSlot.objects.values_list('start_time', flat=True)]
+
+    def test_slots_fill_each_matching_day_of_the_range(self):
+        # 2030-01-07 and 2030-01-14 are Mondays
+        slots = list(iter_pattern_slots(self.pattern, date(2030, 1, 2), date(2030, 1, 14)))
+        starts = [start for start, end in slots]
+        self.assertEqual([(start.day, start.hour, start.minute) for start in starts], [
+            (7, 9, 0), (7, 9, 20), (7, 9, 40), (14, 9, 0), (14, 9, 20), (14, 9, 40)
+        ])
+        self.assertTrue(all(end - start == timedelta(minutes=20) for start, end in slots))
+
+    def test_slots_do_not_extend_past_the_pattern_end(self):
+        self.pattern.slot_duration_minutes = 25
+        slots = list(iter_pattern_slots(self.pattern, date(2030, 1, 7), date(2030, 1, 7)))
+        self.assertEqual(len(slots), 2)
+        self.pattern.slot_duration_minutes = 0
+        self.assertEqual(list(iter_pattern_slots(self.pattern, date(2030, 1, 7), date(2030, 1, 7))), [])
+
+    def test_only_missing_slots_are_created(self):
+        existing_start = timezone.make_aware(datetime(2030, 1, 7, 9, 20))
+        TimeSlot.objects.create(
+            provider_id=PROVIDER_ID, provider_type='DOCTOR',
+            start_time=existing_start, end_time=existing_start + timedelta(minutes=20), is_available=False
+        )
+
+        with self.assertNumQueries(2, using='appointment_db'):
+            new_slots = generate_slots([(self.pattern, date(2030, 1, 7), date(2030, 1, 7))])
+        self.assertEqual(len(new_slots), 2)
+        self.assertEqual([start.minute for start in self.slot_starts()], [0, 20, 40])
+        # The existing slot keeps its booking
+        self.assertFalse(TimeSlot.objects.get(start_time=existing_start).is_available)
+
+        self.assertEqual(generate_slots([(self.pattern, date(2030, 1, 7), date(2030, 1, 7))]), [])
+        self.assertEqual(TimeSlot.objects.count(), 3)
+
+    def test_overlapping_ranges_create_each_slot_once(self):
+        new_slots = generate_slots([
+            (self.pattern, date(2030, 1, 1), date(2030, 1, 10)),
+            (self.pattern, date(2030, 1, 5), date(2030, 1, 20)),
+        ])
+        self.assertEqual(len(new_slots), 6)
+        self.assertEqual(TimeSlot.objects.count(), 6)
+
+
+class SlotGenerationJobTests(TestCase):
+    databases = {'appointment_db'}
+
+    def setUp(self):
+        self.pattern = RecurringPattern.objects.create(
+            pattern_id='PAT1', provider_id=PROVIDER_ID, provider_type='DOCTOR', day_of_week='MONDAY',
+            start_time=time(9), end_time=time(10), slot_duration_minutes=30, start_date=date(2030, 1, 1)
+        )
+
+    def create_job(self, job_id='JOB1', **fields):
+        return SlotGenerationJob.objects.create(
+            job_id=job_id, pattern=self.pattern, start_date=date(2030, 1, 1), end_date=date(2030, 3, 31),
+            chunk_days=28, requested_by=PROVIDER_ID, **fields
+        )
+
+    def test_job_generates_its_range_in_chunks(self):
+        job = self.create_job()
+        with mock.patch('appointment_service.slot_generation.generate_slots', wraps=generate_slots) as generate:
+            run_job(job)
+        # 90 days in chunks of 28 days
+        self.assertEqual(generate.call_count, 4)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'COMPLETED')
+        self.assertEqual(job.processed_through, date(2030, 3, 31))
+        # 12 Mondays with two slots each
+        self.assertEqual(job.slots_created, 24)
+        self.assertEqual(TimeSlot.objects.count(), 24)
+
+    def test_resumed_job_continues_after_the_last_chunk(self):
+        job = self.create_job(processed_through=date(2030, 2, 28), slots_created=16)
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.slots_created, 24)
+        self.assertFalse(TimeSlot.objects.filter(start_time__lt=timezone.make_aware(datetime(2030, 3, 1))).exists())
+
+    def test_failure_is_recorded_on_the_job(self):
+        job = self.create_job()
+        with mock.patch('appointment_service.slot_generation.generate_slots', side_effect=ValueError('boom')):
+            run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(job.error, 'boom')
+
+    def test_claims_pending_and_abandoned_jobs_oldest_first(self):
+        first = self.create_job('JOB1')
+        second = self.create_job('JOB2')
+        self.assertEqual(claim_next_job(), first)
+        self.assertEqual(claim_next_job(), second)
+        self.assertIsNone(claim_next_job())
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'RUNNING')
+        self.assertIsNotNone(first.started_at)
+
+        SlotGenerationJob.objects.filter(pk=first.pk).update(updated_at=timezone.now() - timedelta(minutes=11))
+        self.assertEqual(claim_next_job(), first)
+
+    def test_claiming_gives_the_job_a_new_token(self):
+        self.create_job()
+        job = claim_next_job()
+        self.assertTrue(job.claim_token)
+        SlotGenerationJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=11))
+        self.assertNotEqual(claim_next_job().claim_token, job.claim_token)
+
+    def test_stopped_job_is_put_back_in_the_queue_between_chunks(self):
+        self.create_job()
+        job = claim_next_job()
+        stop_event = threading.Event()
+
+        def generate_and_stop(*args, **kwargs):
+            stop_event.set()
+            return generate_slots(*args, **kwargs)
+
+        with mock.patch('appointment_service.slot_generation.generate_slots', side_effect=generate_and_stop) as generate:
+            run_job(job, stop_event=stop_event)
+        self.assertEqual(generate.call_count, 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'PENDING')
+        self.assertIsNone(job.claim_token)
+        self.assertEqual(job.processed_through, date(2030, 1, 28))
+        self.assertEqual(job.slots_created, 8)
+
+        run_job(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'COMPLETED')
+        self.assertEqual(job.slots_created, 24)
+
+    def test_reclaimed_job_is_left_to_its_new_worker(self):
+        self.create_job()
+        job = claim_next_job()
+        reclaimed = []
+
+        def generate_and_lose_the_job(*args, **kwargs):
+            new_slots = generate_slots(*args, **kwargs)
+            # Another worker takes the job over while this chunk is written
+            reclaimed.append(claim_next_job(stale_after=timedelta(0)))
+            return new_slots
+
+        with mock.patch(
+            'appointment_service.slot_generation.generate_slots', side_effect=generate_and_lose_the_job
+        ) as generate:
+            run_job(job)
+        self.assertEqual(generate.call_count, 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.claim_token, reclaimed[0].claim_token)
+        self.assertEqual(job.status, 'RUNNING')
+        self.assertIsNone(job.processed_through)
+        self.assertEqual(job.slots_created, 0)
+
+        run_job(reclaimed[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'COMPLETED')
+        self.assertEqual(job.processed_through, date(2030, 3, 31))
+        self.assertEqual(TimeSlot.objects.count(), 24)
+
+    def test_outdated_worker_does_not_finish_the_job(self):
+        self.create_job()
+        job = claim_next_job()
+        SlotGenerationJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(minutes=11))
+        claim_next_job()
 
-# Create your tests here.
+        for outcome in ({'return_value': []}, {'side_effect': ValueError('boom')}):
+            with mock.patch('appointment_service.slot_generation.generate_slots', **outcome):
+                run_job(job)
+            self.assertEqual(SlotGenerationJob.objects.get(pk=job.pk).status, 'RUNNING')
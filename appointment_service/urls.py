@@ -1,8 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AppointmentViewSet, TimeslotAvailabilityView
+from .views import AppointmentViewSet, SlotGenerationJobViewSet, TimeslotAvailabilityView
 
 router = DefaultRouter()
+# Registered before the appointment routes, which use an empty prefix
+router.register(r'jobs', SlotGenerationJobViewSet, basename='slot-generation-job')
 router.register(r'', AppointmentViewSet, basename='appointment')
 
 urlpatterns = [
@@ -8,7 +8,7 @@ from datetime import datetime, timedelta, date
 from django.utils import timezone
 import uuid
 
-from .models import TimeSlot, AppointmentType, Appointment, Reminder, RecurringPattern
+from .models import TimeSlot, AppointmentType, Appointment, Reminder, RecurringPattern, SlotGenerationJob
 from .serializers import (
     TimeSlotSerializer,
     AppointmentTypeSerializer,
@@ -18,7 +18,8 @@ from .serializers import (
     ReminderSerializer,
     RecurringPatternSerializer,
     ProviderScheduleSerializer,
-    CancelAppointmentSerializer
+    CancelAppointmentSerializer,
+    SlotGenerationJobSerializer
 )
 from .permissions import (
     IsProvider,
@@ -41,6 +42,7 @@ class AppointmentTypeViewSet(viewsets.ModelViewSet):
     filterset_fields = ['is_active', 'duration_minutes']
     search_fields = ['name', 'type_id', 'description']
     ordering_fields = ['name', 'duration_minutes']
+    ordering = ['-created_at', '-id']
     
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -64,6 +66,7 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['provider_id', 'provider_type', 'is_available']
     ordering_fields = ['start_time', 'end_time']
+    ordering = ['start_time', 'id']
     
     def get_permissions(self):
         if self.action in ['create', 'destroy']:
@@ -128,13 +131,17 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
             filter_kwargs['provider_type'] = provider_type
         
         time_slots = TimeSlot.objects.filter(**filter_kwargs).order_by('start_time')
+        page = self.paginate_queryset(time_slots)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(time_slots, many=True)
-        
+
         return Response(serializer.data)
     
     @action(detail=False, methods=['post'])
     def generate_from_pattern(self, request):
-        """Generate time slots from a recurring pattern"""
+        """Queue a background job that generates time slots from a recurring pattern"""
         pattern_id = request.data.get('pattern_id')
         start_date = request.data.get('start_date')
         end_date = request.data.get('end_date')
@@ -179,64 +186,24 @@ class TimeSlotViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Define day of week mapping
-        day_mapping = {
-            'MONDAY': 0, 'TUESDAY': 1, 'WEDNESDAY': 2, 'THURSDAY': 3,
-            'FRIDAY': 4, 'SATURDAY': 5, 'SUNDAY': 6
-        }
-        
-        pattern_day = day_mapping[pattern.day_of_week]
-        
-        # Calculate dates for the specified day of week in the date range
-        current_date = start_date_obj
-        if current_date.weekday() != pattern_day:
-            # Move to the next occurrence of the pattern's day of week
-            days_ahead = (pattern_day - current_date.weekday()) % 7
-            current_date = current_date + timedelta(days=days_ahead)
-        
-        # Generate slots for each applicable date
-        created_slots = []
-        while current_date <= end_date_obj:
-            # Create datetime objects for the start and end times on this date
-            start_datetime = datetime.combine(current_date, pattern.start_time)
-            end_datetime = datetime.combine(current_date, pattern.end_time)
-            
-            # Generate slots at interval specified by slot_duration_minutes
-            slot_start = start_datetime
-            while slot_start < end_datetime:
-                slot_end = slot_start + timedelta(minutes=pattern.slot_duration_minutes)
-                
-                # Don't create slots that extend beyond the pattern's end time
-                if slot_end > end_datetime:
-                    break
-                
-                # Check if a slot already exists for this provider and time
-                existing_slot = TimeSlot.objects.filter(
-                    provider_id=pattern.provider_id,
-                    provider_type=pattern.provider_type,
-                    start_time=slot_start,
-                    end_time=slot_end
-                ).exists()
-                
-                if not existing_slot:
-                    time_slot = TimeSlot.objects.create(
-                        provider_id=pattern.provider_id,
-                        provider_type=pattern.provider_type,
-                        start_time=slot_start,
-                        end_time=slot_end,
-                        is_available=True
-                    )
-                    created_slots.append(time_slot)
-                
-                # Move to the next slot start time
-                slot_start = slot_end
-            
-            # Move to the next occurrence of the pattern's day of week
-            current_date = current_date + timedelta(days=7)
+        if end_date_obj < start_date_obj:
+            return Response(
+                {"error": "End date must not be before start date"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Return the created slots
-        serializer = self.get_serializer(created_slots, many=True)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        # The slots are generated by the run_slot_generation_jobs worker; the
+        # job's progress is reported at /api/appointments/jobs/{id}/
+        job = SlotGenerationJob.objects.create(
+            job_id=f"JOB-{uuid.uuid4().hex[:8].upper()}",
+            pattern=pattern,
+            start_date=start_date_obj,
+            end_date=end_date_obj,
+            requested_by=str(request.user.id)
+        )
+        
+        serializer = SlotGenerationJobSerializer(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
 
 class AppointmentViewSet(viewsets.ModelViewSet):
@@ -256,6 +223,14 @@ class AppointmentViewSet(viewsets.ModelViewSet):
     }
     search_fields = ['appointment_id', 'reason', 'notes']
     ordering_fields = ['time_slot__start_time', 'created_at']
+    ordering = ['-created_at', '-id']
+
+    def get_queryset(self):
+        # Load the nested time slot, appointment type and reminders up front
+        # instead of querying them once per serialized appointment
+        return Appointment.objects.select_related(
+            'time_slot', 'appointment_type'
+        ).prefetch_related('reminders')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -404,7 +379,11 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        appointments = Appointment.objects.filter(patient_id=patient_id)
+        appointments = self.get_queryset().filter(patient_id=patient_id)
+        page = self.paginate_queryset(appointments)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(appointments, many=True)
         return Response(serializer.data)
     
@@ -425,7 +404,11 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        appointments = Appointment.objects.filter(provider_id=provider_id)
+        appointments = self.get_queryset().filter(provider_id=provider_id)
+        page = self.paginate_queryset(appointments)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(appointments, many=True)
         return Response(serializer.data)
     
@@ -452,7 +435,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         day_end = datetime.combine(date_param, datetime.max.time())
         
         # Get all appointments for the provider on the specified date
-        appointments = Appointment.objects.filter(
+        appointments = self.get_queryset().filter(
             provider_id=provider_id,
             provider_type=provider_type,
             time_slot__start_time__gte=day_start,
@@ -487,6 +470,7 @@ class ReminderViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['appointment__appointment_id', 'reminder_type', 'status']
     ordering_fields = ['scheduled_time']
+    ordering = ['-created_at', '-id']
     
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -527,6 +511,7 @@ class RecurringPatternViewSet(viewsets.ModelViewSet):
     filterset_fields = ['provider_id', 'provider_type', 'day_of_week', 'is_active']
     search_fields = ['pattern_id', 'provider_id']
     ordering_fields = ['day_of_week', 'start_time']
+    ordering = ['-created_at', '-id']
     
     def get_permissions(self):
         if self.action == 'create':
@@ -552,6 +537,25 @@ class RecurringPatternViewSet(viewsets.ModelViewSet):
             serializer.save(pattern_id=pattern_id)
 
 
+class SlotGenerationJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for the status of time slot generation jobs
+    """
+    serializer_class = SlotGenerationJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['status', 'pattern__pattern_id']
+    ordering_fields = ['created_at']
+    ordering = ['-created_at', '-id']
+    
+    def get_queryset(self):
+        queryset = SlotGenerationJob.objects.select_related('pattern')
+        # Administrators can see every job, other users only the jobs they requested
+        if self.request.user.role == 'ADMINISTRATOR':
+            return queryset
+        return queryset.filter(requested_by=str(self.request.user.id))
+
+
 class TimeslotAvailabilityView(generics.GenericAPIView):
     permission_classes = [permissions.AllowAny]
 
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import OuterRef, Subquery
 from django.utils.translation import gettext_lazy as _
 
 class UserRole(models.TextChoices):
@@ -56,6 +57,19 @@ class FullName(models.Model):
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
+
+def annotate_primary_name(queryset):
+    """
+    Annotate each user in ``queryset`` with ``primary_first_name`` and
+    ``primary_last_name`` taken from their primary FullName (or any FullName
+    if none is primary), so names are resolved in the same query as the users.
+    """
+    full_names = FullName.objects.filter(user=OuterRef('pk')).order_by('-is_primary', 'id')
+    return queryset.annotate(
+        primary_first_name=Subquery(full_names.values('first_name')[:1]),
+        primary_last_name=Subquery(full_names.values('last_name')[:1]),
+    )
+
 class Address(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='addresses')
     address = models.CharField(max_length=255)
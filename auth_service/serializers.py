@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 
 from auth_service.models import UserRole, FullName # Import FullName
+from healthcare.service_dispatch import ServiceCallError, call_service
 
 User = get_user_model()
 
@@ -16,27 +17,26 @@ class UserSerializer(serializers.ModelSerializer):
                   'phone_number', 'role', 'created_at', 'updated_at')
         read_only_fields = ('id', 'role', 'created_at', 'updated_at')
 
+    def _get_full_name(self, obj):
+        # Primary full name first, falling back to any full name. Uses the
+        # prefetched full_names when the caller prefetched them.
+        prefetched = getattr(obj, '_prefetched_objects_cache', {}).get('full_names')
+        if prefetched is not None:
+            return min(prefetched, key=lambda full_name: (not full_name.is_primary, full_name.pk), default=None)
+        return obj.full_names.order_by('-is_primary', 'id').first()
+
     def get_first_name(self, obj):
-        # Attempt to get the primary full name
-        primary_full_name = obj.full_names.filter(is_primary=True).first()
-        if primary_full_name:
-            return primary_full_name.first_name
-        # If no primary, try to get any full name
-        any_full_name = obj.full_names.first()
-        if any_full_name:
-            return any_full_name.first_name
-        return None # Or an empty string: ""
+        # Querysets built with annotate_primary_name carry the name already
+        if hasattr(obj, 'primary_first_name'):
+            return obj.primary_first_name
+        full_name = self._get_full_name(obj)
+        return full_name.first_name if full_name else None
 
     def get_last_name(self, obj):
-        # Attempt to get the primary full name
-        primary_full_name = obj.full_names.filter(is_primary=True).first()
-        if primary_full_name:
-            return primary_full_name.last_name
-        # If no primary, try to get any full name
-        any_full_name = obj.full_names.first()
-        if any_full_name:
-            return any_full_name.last_name
-        return None # Or an empty string: ""
+        if hasattr(obj, 'primary_last_name'):
+            return obj.primary_last_name
+        full_name = self._get_full_name(obj)
+        return full_name.last_name if full_name else None
 
 
 class PatientRegisterSerializer(serializers.ModelSerializer):
@@ -87,17 +87,12 @@ class PatientRegisterSerializer(serializers.ModelSerializer):
 
 
         # Create patient record
-        import requests
         patient_data['user_id'] = user.id
         try:
-            response = requests.post(
-                'http://localhost:8000/api/patients/create/',
-                json=patient_data
-            )
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
+            call_service('patient', 'create', patient_data)
+        except ServiceCallError as e:
             user.delete() # This will also cascade delete FullName
-            raise serializers.ValidationError(f"Failed to create patient record: {e}")
+            raise serializers.ValidationError(f"Failed to create patient record: {e.detail}")
 
         return user
 
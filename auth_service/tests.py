@@ -1,3 +1,46 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .models import FullName, User
+
+BATCH_URL = '/api/auth/internal/users/'
+
+
+@override_settings(INTERNAL_SERVICE_SECRET_TOKEN='s3cret')
+class InternalUserBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='patient', email='patient@example.com', password='password', role='PATIENT'
+        )
+        FullName.objects.create(user=cls.user, first_name='Ada', last_name='Lovelace', is_primary=True)
+
+    def lookup(self, client=None, **headers):
+        response = (client or APIClient()).post(BATCH_URL, [self.user.pk, 0], format='json', **headers)
+        if response.status_code != 200:
+            return response.status_code, None
+        return response.status_code, json.loads(b''.join(response.streaming_content))
+
+    def test_services_look_up_users_with_the_token(self):
+        status_code, users = self.lookup(HTTP_X_INTERNAL_SERVICE_TOKEN='s3cret')
+        self.assertEqual(status_code, 200)
+        self.assertEqual(list(users), [str(self.user.pk)])
+        self.assertEqual(users[str(self.user.pk)]['email'], 'patient@example.com')
+        self.assertEqual(users[str(self.user.pk)]['first_name'], 'Ada')
+
+    def test_staff_can_look_up_users(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(
+            username='admin', email='admin@example.com', password='password', is_staff=True
+        ))
+        self.assertEqual(self.lookup(client)[0], 200)
+
+    def test_other_callers_are_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(self.lookup()[0], 401)
+        self.assertEqual(self.lookup(HTTP_X_INTERNAL_SERVICE_TOKEN='guess')[0], 401)
+        self.assertEqual(self.lookup(client)[0], 403)
+        self.assertEqual(APIClient().get(BATCH_URL, {'ids': self.user.pk}).status_code, 401)
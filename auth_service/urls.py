@@ -1,6 +1,6 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from .views import PatientRegisterView, AdminCreateUserView, UserDetailView, ProfileUpdateView, InternalUserDetailView
+from .views import PatientRegisterView, AdminCreateUserView, UserDetailView, ProfileUpdateView, InternalUserDetailView, InternalUserBatchView
 
 urlpatterns = [
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -10,4 +10,5 @@ urlpatterns = [
     path('profile/', UserDetailView.as_view(), name='user_profile'),
     path('profile/update/', ProfileUpdateView.as_view(), name='profile_update'),
     path('internal/user/<int:id>/', InternalUserDetailView.as_view(), name='internal_user_detail'),
+    path('internal/users/', InternalUserBatchView.as_view(), name='internal_user_batch'),
 ]
@@ -1,9 +1,15 @@
+import json
+
 from django.contrib.auth import get_user_model
+from django.http import StreamingHttpResponse
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
-import requests  # Make sure requests is imported
+from rest_framework.views import APIView
+
+from healthcare.permissions import IsInternalService
+from healthcare.service_dispatch import ServiceCallError, call_service
 
-from .models import UserRole
+from .models import UserRole, annotate_primary_name
 from .serializers import AdminCreateUserSerializer, PatientRegisterSerializer, UserSerializer, ProfileUpdateSerializer
 
 User = get_user_model()
@@ -34,25 +40,24 @@ class AdminCreateUserView(generics.CreateAPIView):
             user_id = user.id
 
             service_payload = {'user_id': user_id}
-            service_endpoint = None
+            service = None
 
             if role == UserRole.DOCTOR:
-                service_endpoint = 'http://localhost:8000/api/doctors/create/'
+                service = 'doctor'
                 service_payload['specialization'] = serializer.validated_data.get('specialization')
                 service_payload['license_number'] = serializer.validated_data.get('license_number')
             elif role == UserRole.NURSE:
-                service_endpoint = 'http://localhost:8000/api/nurses/create/'  # Assuming this will be the create endpoint for nurses
+                service = 'nurse'
                 service_payload['department'] = serializer.validated_data.get('department')
                 service_payload['nurse_id'] = serializer.validated_data.get('nurse_id')
 
-            if service_endpoint:
+            if service:
                 try:
-                    api_response = requests.post(service_endpoint, json=service_payload)
-                    api_response.raise_for_status()  # Raise an exception for HTTP errors (4xx or 5xx)
-                except requests.exceptions.RequestException as e:
+                    call_service(service, 'create', service_payload)
+                except ServiceCallError as e:
                     user.delete()  # Rollback user creation if service call fails
                     return Response(
-                        {"error": f"Failed to create {role.lower()} record: {str(e)}"},
+                        {"error": f"Failed to create {role.lower()} record: {e.detail}"},
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR
                     )
 
@@ -90,8 +95,74 @@ class ProfileUpdateView(generics.UpdateAPIView):
 
 # New view for internal service communication
 class InternalUserDetailView(generics.RetrieveAPIView):
-    queryset = User.objects.all()
+    queryset = annotate_primary_name(User.objects.all())
     serializer_class = UserSerializer
     permission_classes = [permissions.AllowAny]  # Changed to AllowAny
     lookup_field = 'id'
 
+
+class InternalUserBatchView(APIView):
+    """
+    Bulk user lookup for internal service communication.
+
+    Accepts user IDs as a CSV query parameter (GET ``?ids=1,2,3``) or as a
+    JSON array (POST ``[1, 2, 3]`` or ``{"ids": [1, 2, 3]}``) and streams a
+    compact JSON object mapping each found user ID to its details. Users and
+    their primary names are read with a single query. Only other services
+    (with the internal service token) and staff may call it.
+    """
+    permission_classes = [IsInternalService]
+    max_ids = 5000
+
+    def get(self, request, format=None):
+        return self.lookup(request.query_params.get('ids', '').split(','))
+
+    def post(self, request, format=None):
+        user_ids = request.data.get('ids') if isinstance(request.data, dict) else request.data
+        if not isinstance(user_ids, list):
+            return Response(
+                {"error": "Expected a JSON array of user IDs"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self.lookup(user_ids)
+
+    def lookup(self, raw_ids):
+        try:
+            user_ids = {int(user_id) for user_id in raw_ids if str(user_id).strip()}
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "User IDs must be integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not user_ids:
+            return Response(
+                {"error": "At least one user ID is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(user_ids) > self.max_ids:
+            return Response(
+                {"error": f"At most {self.max_ids} user IDs can be looked up at once"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        users = annotate_primary_name(User.objects.filter(id__in=user_ids)).values_list(
+            'id', 'username', 'email', 'primary_first_name', 'primary_last_name', 'phone_number', 'role'
+        )
+        return StreamingHttpResponse(self.stream_users(users), content_type='application/json')
+
+    def stream_users(self, users):
+        yield '{'
+        separator = ''
+        for user_id, username, email, first_name, last_name, phone_number, role in users.iterator(chunk_size=1000):
+            user_data = {
+                'username': username,
+                'email': email,
+                'first_name': first_name,
+                'last_name': last_name,
+                'phone_number': phone_number,
+                'role': role,
+            }
+            yield f'{separator}"{user_id}":{json.dumps(user_data, separators=(",", ":"))}'
+            separator = ','
+        yield '}'
@@ -1,30 +1,75 @@
 import pickle
 import re
-from sklearn.metrics.pairwise import cosine_similarity
 import sys
 import os
 import logging
 
+from django.conf import settings
+
+from . import model_store
+from .answer_cache import AnswerCache
+from .model_registry import ModelRegistry
+from .retrieval import RetrievalIndex
+
 logger = logging.getLogger(__name__)
 
-# File path to the trained model
-MODEL_PATH = os.path.join(os.path.dirname(__file__), 'healthcare_bot_model.pkl')
+# Directory of the trained model, in the memory-mapped format of model_store
+MODEL_PATH = os.path.join(os.path.dirname(__file__), 'healthcare_bot_model')
+# Pickled model written by older versions of the training script
+LEGACY_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'healthcare_bot_model.pkl')
+
+# Only score questions that share at least one term with the query
+USE_INVERTED_INDEX = True
+
+NOT_AVAILABLE_MESSAGE = "I'm sorry, but I'm not able to answer questions right now. Please try again later."
+LOW_CONFIDENCE_MESSAGE = "I don't have enough information to answer that question confidently."
+
+def load_legacy_model(model_path=LEGACY_MODEL_PATH):
+    """Load a pickled model written by older versions of the training script"""
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    model['index'] = RetrievalIndex(model['question_vectors'], use_inverted_index=USE_INVERTED_INDEX)
+    model['version'] = f"legacy-{int(os.path.getmtime(model_path))}"
+    model['path'] = model_path
+    return model
 
 def load_model(model_path=MODEL_PATH):
     """Load the trained model from disk"""
-    if not os.path.exists(model_path):
-        logger.error(f"Error: Model file {model_path} not found.")
-        return None
-    
     try:
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-        logger.info(f"Model loaded successfully with {len(model['questions'])} Q&A pairs.")
+        if os.path.isdir(model_path):
+            model = model_store.load_model(model_path)
+        elif os.path.exists(LEGACY_MODEL_PATH):
+            logger.warning(
+                f"Loading pickled model {LEGACY_MODEL_PATH}; run the convert_chatbot_model "
+                f"command to switch to the memory-mapped format."
+            )
+            model = load_legacy_model(LEGACY_MODEL_PATH)
+        else:
+            logger.error(f"Error: Model file {model_path} not found.")
+            return None
+        logger.info(f"Model {model['version']} loaded successfully with {len(model['questions'])} Q&A pairs.")
         return model
     except Exception as e:
         logger.error(f"Error loading model: {e}")
         return None
 
+# Active model; a newly published model replaces it without a restart
+model_registry = ModelRegistry(
+    load_model,
+    watch_paths=[os.path.join(MODEL_PATH, model_store.META_FILE), LEGACY_MODEL_PATH],
+    check_interval=getattr(settings, 'CHATBOT_MODEL_CHECK_INTERVAL', 5)
+)
+
+# Answers of recent queries, keyed on the model version and normalized query
+answer_cache = AnswerCache(
+    maxsize=getattr(settings, 'CHATBOT_ANSWER_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'CHATBOT_ANSWER_CACHE_TTL', 3600)
+)
+
+def get_model():
+    """Return the active model, loading it on first use rather than at import time"""
+    return model_registry.get()
+
 def clean_text(text):
     """Clean and normalize text for processing"""
     if not isinstance(text, str):
@@ -38,42 +83,67 @@ def clean_text(text):
     text = re.sub(r'[^\w\s]', ' ', text)
     return text.strip()
 
+def get_index(model):
+    """Return the retrieval index of the model, building it on first use"""
+    if 'index' not in model:
+        model['index'] = RetrievalIndex(model['question_vectors'], use_inverted_index=USE_INVERTED_INDEX)
+    return model['index']
+
+def select_answer(matches, answers):
+    """Pick the answer of the best match based on the confidence thresholds"""
+    best_index, best_similarity = matches[0] if matches else (None, 0.0)
+    
+    # Return the best match based on confidence threshold
+    if best_similarity > 0.5:  # High confidence threshold
+        return answers[best_index]
+    elif best_similarity > 0.2:  # Medium confidence threshold
+        return answers[best_index]
+    else:
+        return LOW_CONFIDENCE_MESSAGE
+
 def get_answer(query, model):
     """Get answer for a user query"""
     # If model is not loaded, return error message
     if model is None:
-        return "I'm sorry, but I'm not able to answer questions right now. Please try again later."
+        return NOT_AVAILABLE_MESSAGE
     
     # Clean and process the query
     processed_query = clean_text(query)
     
-    # Get model components
-    vectorizer = model['vectorizer']
-    question_vectors = model['question_vectors']
-    questions = model['questions']
-    answers = model['answers']
+    # Repeated questions are answered from the cache
+    answer = answer_cache.get(model['version'], processed_query)
+    if answer is not None:
+        return answer
     
     # Transform query to vector
-    query_vector = vectorizer.transform([processed_query])
-    
-    # Calculate similarities
-    similarities = cosine_similarity(query_vector, question_vectors)[0]
+    query_vector = model['vectorizer'].transform([processed_query])
     
     # Get top most similar questions
-    top_indices = similarities.argsort()[-3:][::-1]  # Get top 3 matches
-    top_similarities = similarities[top_indices]
+    matches = get_index(model).search(query_vector, top_k=3)[0]  # Get top 3 matches
+    answer = select_answer(matches, model['answers'])
+    answer_cache.set(model['version'], processed_query, answer)
+    return answer
+
+def get_answers(queries, model, top_k=3):
+    """
+    Answer a batch of queries with one vectorizer transform and one sparse
+    matrix product. Returns, per query, the selected answer and the top-k
+    matches with their scores.
+    """
+    if model is None:
+        return [{'response': NOT_AVAILABLE_MESSAGE, 'matches': []} for _ in queries]
     
-    # Return the best match based on confidence threshold
-    if top_similarities[0] > 0.5:  # High confidence threshold
-        return answers[top_indices[0]]
-    elif top_similarities[0] > 0.2:  # Medium confidence threshold
-        return answers[top_indices[0]]
-    else:
-        return "I don't have enough information to answer that question confidently."
-
-# Global model instance - load once at module import time
-try:
-    model_instance = load_model()
-except Exception as e:
-    logger.error(f"Failed to load model: {e}")
-    model_instance = None 
\ No newline at end of file
+    questions = model['questions']
+    answers = model['answers']
+    query_vectors = model['vectorizer'].transform([clean_text(query) for query in queries])
+    
+    results = []
+    for matches in get_index(model).search(query_vectors, top_k=top_k):
+        results.append({
+            'response': select_answer(matches, answers),
+            'matches': [
+                {'question': questions[i], 'answer': answers[i], 'score': round(score, 4)}
+                for i, score in matches
+            ]
+        })
+    return results
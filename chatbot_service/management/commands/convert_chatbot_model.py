@@ -0,0 +1,32 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot_service import model_store
+from chatbot_service.chatbot_utils import MODEL_PATH, LEGACY_MODEL_PATH, load_legacy_model
+
+
+class Command(BaseCommand):
+    help = 'Convert a pickled chatbot model into the memory-mapped model format'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=LEGACY_MODEL_PATH,
+                            help='Pickled model to convert (default: the legacy model path)')
+        parser.add_argument('--output', default=MODEL_PATH,
+                            help='Model directory to write (default: the model path used by the chatbot)')
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['source']):
+            raise CommandError(f"Model file {options['source']} not found")
+
+        model = load_legacy_model(options['source'])
+        version = model_store.save_model(
+            options['output'],
+            model_store.QueryVectorizer.from_tfidf(model['vectorizer']),
+            model['question_vectors'],
+            model['questions'],
+            model['answers']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote model {version} with {len(model['questions'])} Q&A pairs to {options['output']}"
+        ))
@@ -0,0 +1,52 @@
+import logging
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chatbot_service.chatbot_utils import MODEL_PATH
+from chatbot_service.training import train, DEFAULT_CHUNK_SIZE, DEFAULT_N_FEATURES, DEFAULT_MIN_DF
+
+
+class Command(BaseCommand):
+    help = 'Train the chatbot model from a question/answer CSV file such as medquad.csv'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV file whose first two columns are the question and the answer')
+        parser.add_argument('--output', default=MODEL_PATH,
+                            help='Model directory to write (default: the model path used by the chatbot)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f'Rows processed per chunk (default: {DEFAULT_CHUNK_SIZE})')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes cleaning and vectorizing chunks (default: CPU count)')
+        parser.add_argument('--n-features', type=int, default=DEFAULT_N_FEATURES,
+                            help=f'Number of hashed term features (default: {DEFAULT_N_FEATURES})')
+        parser.add_argument('--min-df', type=int, default=DEFAULT_MIN_DF,
+                            help=f'Ignore terms found in fewer questions than this (default: {DEFAULT_MIN_DF})')
+        parser.add_argument('--max-samples', type=int, default=None,
+                            help='Only train on the first N rows (default: all rows)')
+
+    def handle(self, *args, **options):
+        if not os.path.isfile(options['csv_path']):
+            raise CommandError(f"File {options['csv_path']} does not exist")
+        if options['chunk_size'] < 1 or options['workers'] < 1 or options['n_features'] < 1:
+            raise CommandError('--chunk-size, --workers and --n-features must be positive')
+
+        if options['verbosity'] > 1:
+            logging.getLogger('chatbot_service.training').setLevel(logging.INFO)
+
+        try:
+            version, num_questions = train(
+                options['csv_path'],
+                options['output'],
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                n_features=options['n_features'],
+                min_df=options['min_df'],
+                max_samples=options['max_samples']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Trained model {version} with {num_questions} Q&A pairs, written to {options['output']}"
+        ))
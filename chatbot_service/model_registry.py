@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+
+from django.utils import timezone
+
+
+class ModelRegistry:
+    """
+    Holds the active chatbot model and replaces it when a new one is published.
+
+    ``get()`` is cheap: it returns the current model reference and, at most
+    once every ``check_interval`` seconds, compares the modification times of
+    ``watch_paths`` with those of the loaded model. When they change the new
+    model is loaded in a background thread while requests keep using the old
+    one. The reference is then swapped in a single assignment. Requests that
+    already hold the old model finish with it, and it is released once the
+    last of them drops its reference.
+    """
+
+    def __init__(self, loader, watch_paths, check_interval=5):
+        self._loader = loader
+        self._watch_paths = list(watch_paths)
+        self.check_interval = check_interval
+        self._model = None
+        self._stamp = None
+        self._loaded_at = None
+        self._last_error = None
+        self._initialized = False
+        self._next_check = 0.0
+        self._load_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._reload_thread = None
+
+    def _current_stamp(self):
+        stamp = []
+        for path in self._watch_paths:
+            try:
+                stamp.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def get(self):
+        """Return the active model, or None if no model could be loaded"""
+        if not self._initialized:
+            with self._load_lock:
+                if not self._initialized:
+                    self._load(force=True)
+                    self._initialized = True
+        elif self.check_interval and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.check_interval
+            if self._current_stamp() != self._stamp:
+                self.reload()
+        return self._model
+
+    def reload(self, force=False):
+        """
+        Load the model in a background thread unless a reload is already
+        running, and return that thread. Without ``force`` the model is only
+        replaced if its files or its version changed.
+        """
+        with self._thread_lock:
+            if self._reload_thread is None or not self._reload_thread.is_alive():
+                self._reload_thread = threading.Thread(
+                    target=self._reload, args=(force,), name='chatbot-model-reload', daemon=True
+                )
+                self._reload_thread.start()
+            return self._reload_thread
+
+    def _reload(self, force):
+        with self._load_lock:
+            self._load(force)
+            self._initialized = True
+
+    def _load(self, force):
+        stamp = self._current_stamp()
+        if not force and stamp == self._stamp:
+            return
+
+        model = self._loader()
+        self._stamp = stamp
+        if model is None:
+            # Keep serving the previous model until the files change again
+            self._last_error = 'Model could not be loaded, see the logs for details'
+            return
+
+        self._last_error = None
+        if not force and self._model is not None and model['version'] == self._model['version']:
+            return
+        self._model = model
+        self._loaded_at = timezone.now()
+
+    @property
+    def reloading(self):
+        return self._reload_thread is not None and self._reload_thread.is_alive()
+
+    def status(self):
+        model = self._model
+        return {
+            'version': model['version'] if model else None,
+            'path': model['path'] if model else None,
+            'num_questions': len(model['questions']) if model else 0,
+            'loaded_at': self._loaded_at,
+            'reloading': self.reloading,
+            'last_error': self._last_error,
+        }
@@ -0,0 +1,335 @@
+"""
+On-disk format of the chatbot model.
+
+A model is a directory of plain NumPy arrays and UTF-8 text blobs instead of
+a pickle:
+
+    meta.json                          model version and vectorizer settings
+    idf.npy                            inverse document frequency of each term
+    vocabulary.npy                     term of each column (vocabulary-based models only)
+    postings_data.npy                  L2-normalized question vectors stored
+    postings_indices.npy               term-major, as the data, indices and
+    postings_indptr.npy                indptr arrays of a CSR matrix
+    questions.bin, question_offsets.npy
+    answers.bin, answer_offsets.npy    texts and the byte offset of each one
+
+Arrays are opened with ``mmap_mode='r'``, so worker processes share the same
+pages through the OS page cache instead of each holding a private copy.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from collections.abc import Sequence
+from contextlib import contextmanager
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from .retrieval import RetrievalIndex
+
+FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+
+# Tokenization settings shared by the training and query vectorizers
+ANALYZER_PARAMS = ('analyzer', 'lowercase', 'ngram_range', 'stop_words', 'strip_accents', 'token_pattern')
+
+
+def make_hashing_vectorizer(n_features, analyzer_params):
+    """Feature hashing term counter used for hashing-based models"""
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None, **analyzer_params)
+
+
+class TextBlob(Sequence):
+    """Read-only list of strings backed by a memory-mapped UTF-8 blob and offsets"""
+
+    def __init__(self, blob_path, offsets_path):
+        self._offsets = np.load(offsets_path, mmap_mode='r')
+        if os.path.getsize(blob_path):
+            self._blob = np.memmap(blob_path, dtype=np.uint8, mode='r')
+        else:
+            self._blob = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError('text index out of range')
+        i %= len(self)
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode('utf-8')
+
+
+class QueryVectorizer:
+    """
+    Turn texts into L2-normalized TF-IDF vectors using a stored idf vector and
+    either a stored vocabulary or feature hashing, without a fitted pickle.
+    """
+
+    def __init__(self, analyzer_params, idf, vocabulary=None, sublinear_tf=False):
+        self.analyzer_params = dict(analyzer_params)
+        if self.analyzer_params.get('ngram_range') is not None:
+            self.analyzer_params['ngram_range'] = tuple(self.analyzer_params['ngram_range'])
+        self.idf = idf
+        self.vocabulary = vocabulary
+        self.sublinear_tf = sublinear_tf
+        if vocabulary is not None:
+            self._counter = CountVectorizer(
+                vocabulary={str(term): i for i, term in enumerate(vocabulary)},
+                **self.analyzer_params
+            )
+        else:
+            self._counter = make_hashing_vectorizer(len(idf), self.analyzer_params)
+
+    @classmethod
+    def from_tfidf(cls, vectorizer):
+        """Build a query vectorizer from a fitted TfidfVectorizer"""
+        params = {name: getattr(vectorizer, name) for name in ANALYZER_PARAMS}
+        if isinstance(params['stop_words'], (set, frozenset)):
+            params['stop_words'] = sorted(params['stop_words'])
+        vocabulary = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        return cls(params, vectorizer.idf_, vocabulary=vocabulary, sublinear_tf=vectorizer.sublinear_tf)
+
+    def term_counts(self, texts):
+        """Raw term counts of the texts, one row per text"""
+        return self._counter.transform(texts).astype(np.float32)
+
+    def transform(self, texts):
+        counts = self.term_counts(texts)
+        if self.sublinear_tf:
+            np.log(counts.data, out=counts.data)
+            counts.data += 1
+        return normalize(sp.csr_matrix(counts.multiply(self.idf)), norm='l2')
+
+
+class TextBlobWriter:
+    """Append texts to a UTF-8 blob, recording the byte offset of each one"""
+
+    def __init__(self, model_dir, name, offsets_name):
+        self._file = open(os.path.join(model_dir, name), 'wb')
+        self._offsets_path = os.path.join(model_dir, offsets_name)
+        self._offsets = array('q', [0])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def append(self, text):
+        encoded = str(text).encode('utf-8')
+        self._file.write(encoded)
+        self._offsets.append(self._offsets[-1] + len(encoded))
+
+    def close(self):
+        self._file.close()
+        np.save(self._offsets_path, np.frombuffer(self._offsets, dtype=np.int64))
+
+
+def _write_texts(model_dir, name, offsets_name, texts):
+    writer = TextBlobWriter(model_dir, name, offsets_name)
+    try:
+        for text in texts:
+            writer.append(text)
+    finally:
+        writer.close()
+    return len(writer)
+
+
+def write_postings(model_dir, postings):
+    """Write the term-major (terms x questions) matrix of normalized question vectors"""
+    postings = sp.csr_matrix(postings, dtype=np.float32)
+    postings.sort_indices()
+    np.save(os.path.join(model_dir, 'postings_data.npy'), postings.data)
+    np.save(os.path.join(model_dir, 'postings_indices.npy'), postings.indices)
+    np.save(os.path.join(model_dir, 'postings_indptr.npy'), postings.indptr)
+    return postings.shape
+
+
+class PostingsWriter:
+    """
+    Write the term-major postings one block of question-major vectors at a
+    time, without holding the whole matrix in memory. ``term_counts`` is the
+    number of questions each term will have a weight for, which lays out the
+    postings up front; the arrays are written through memory maps.
+    """
+
+    def __init__(self, model_dir, term_counts, num_questions):
+        self.num_questions = num_questions
+        term_counts = np.asarray(term_counts, dtype=np.int64)
+        nnz = int(term_counts.sum())
+        index_dtype = np.int32 if max(nnz, num_questions) < np.iinfo(np.int32).max else np.int64
+        self.indptr = np.zeros(len(term_counts) + 1, dtype=index_dtype)
+        np.cumsum(term_counts, out=self.indptr[1:])
+        np.save(os.path.join(model_dir, 'postings_indptr.npy'), self.indptr)
+
+        self._data = np.lib.format.open_memmap(
+            os.path.join(model_dir, 'postings_data.npy'), mode='w+', dtype=np.float32, shape=(nnz,)
+        )
+        self._indices = np.lib.format.open_memmap(
+            os.path.join(model_dir, 'postings_indices.npy'), mode='w+', dtype=index_dtype, shape=(nnz,)
+        )
+        # Next free position of each term
+        self._next = self.indptr[:-1].astype(np.int64)
+
+    def append(self, vectors, first_question):
+        """Add the vectors of questions ``first_question`` onwards, in question order"""
+        vectors = vectors.tocoo()
+        # Term-major, then question order, so every term's postings stay sorted
+        order = np.lexsort((vectors.row, vectors.col))
+        terms = vectors.col[order]
+        block_terms, starts, counts = np.unique(terms, return_index=True, return_counts=True)
+        positions = self._next[terms] + np.arange(len(terms)) - np.repeat(starts, counts)
+        self._data[positions] = vectors.data[order]
+        self._indices[positions] = vectors.row[order] + first_question
+        self._next[block_terms] += counts
+
+    def close(self):
+        if not np.array_equal(self._next, self.indptr[1:]):
+            raise ValueError('The postings written do not match the term counts')
+        self._data.flush()
+        self._indices.flush()
+        del self._data, self._indices
+        return len(self.indptr) - 1, self.num_questions
+
+
+def _content_hash(model_dir):
+    """Hash of every file of the model, used as its version"""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(model_dir)):
+        digest.update(name.encode('utf-8'))
+        with open(os.path.join(model_dir, name), 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def write_meta(model_dir, vectorizer, num_terms, num_questions, extra_meta=None):
+    """
+    Write the vectorizer arrays and meta.json once every other file of the
+    model is in place. Returns the model version.
+    """
+    np.save(os.path.join(model_dir, 'idf.npy'), np.asarray(vectorizer.idf, dtype=np.float32))
+    if vectorizer.vocabulary is not None:
+        np.save(os.path.join(model_dir, 'vocabulary.npy'), np.asarray(vectorizer.vocabulary, dtype=str))
+
+    version = _content_hash(model_dir)
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'version': version,
+        'num_questions': num_questions,
+        'num_terms': num_terms,
+        'vectorizer': {
+            'type': 'vocabulary' if vectorizer.vocabulary is not None else 'hashing',
+            'analyzer_params': vectorizer.analyzer_params,
+            'sublinear_tf': vectorizer.sublinear_tf,
+        },
+    }
+    meta.update(extra_meta or {})
+    with open(os.path.join(model_dir, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return version
+
+
+def write_model_files(model_dir, vectorizer, postings, questions, answers, extra_meta=None):
+    """
+    Write the files of a model into the existing directory ``model_dir``.
+    ``postings`` is the term-major (terms x questions) matrix of normalized
+    question vectors. Returns the model version.
+    """
+    num_terms, num_questions = write_postings(model_dir, postings)
+    if num_questions != len(questions) or num_questions != len(answers):
+        raise ValueError('Questions, answers and question vectors must have the same length')
+
+    _write_texts(model_dir, 'questions.bin', 'question_offsets.npy', questions)
+    _write_texts(model_dir, 'answers.bin', 'answer_offsets.npy', answers)
+    return write_meta(model_dir, vectorizer, num_terms, num_questions, extra_meta)
+
+
+def publish_model_dir(build_dir, model_dir):
+    """Move a fully written model directory into place, replacing the old one"""
+    model_dir = os.path.abspath(model_dir)
+    previous_dir = None
+    if os.path.exists(model_dir):
+        previous_dir = tempfile.mkdtemp(prefix='.previous-', dir=os.path.dirname(model_dir))
+        os.rmdir(previous_dir)
+        os.rename(model_dir, previous_dir)
+    os.rename(build_dir, model_dir)
+    if previous_dir:
+        # Processes that still map the old files keep them until they unmap them
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+
+@contextmanager
+def build_model_dir(model_dir):
+    """
+    Yield a temporary directory next to ``model_dir`` to write a model into.
+    It replaces ``model_dir`` once the block completes, so readers never see
+    a half-written model, and is removed if the block fails.
+    """
+    model_dir = os.path.abspath(model_dir)
+    os.makedirs(os.path.dirname(model_dir), exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix='.build-', dir=os.path.dirname(model_dir))
+    try:
+        yield build_dir
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    publish_model_dir(build_dir, model_dir)
+
+
+def save_model(model_dir, vectorizer, question_vectors, questions, answers, extra_meta=None):
+    """Save a model held in memory to ``model_dir``. Returns the model version."""
+    with build_model_dir(model_dir) as build_dir:
+        postings = RetrievalIndex(question_vectors).postings
+        version = write_model_files(build_dir, vectorizer, postings, questions, answers, extra_meta)
+    return version
+
+
+def read_meta(model_dir):
+    with open(os.path.join(model_dir, META_FILE)) as f:
+        return json.load(f)
+
+
+def load_model(model_dir):
+    """
+    Open a model directory. Arrays and texts are memory-mapped, so this only
+    reads the metadata and the vocabulary; pages are loaded on access.
+    """
+    meta = read_meta(model_dir)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported chatbot model format {meta.get('format_version')}")
+
+    def path(name):
+        return os.path.join(model_dir, name)
+
+    postings = sp.csr_matrix(
+        (
+            np.load(path('postings_data.npy'), mmap_mode='r'),
+            np.load(path('postings_indices.npy'), mmap_mode='r'),
+            np.load(path('postings_indptr.npy'), mmap_mode='r'),
+        ),
+        shape=(meta['num_terms'], meta['num_questions']),
+        copy=False
+    )
+
+    vectorizer_meta = meta['vectorizer']
+    vocabulary = None
+    if vectorizer_meta['type'] == 'vocabulary':
+        vocabulary = np.load(path('vocabulary.npy'), mmap_mode='r')
+    vectorizer = QueryVectorizer(
+        vectorizer_meta['analyzer_params'],
+        np.load(path('idf.npy'), mmap_mode='r'),
+        vocabulary=vocabulary,
+        sublinear_tf=vectorizer_meta.get('sublinear_tf', False)
+    )
+
+    return {
+        'version': meta['version'],
+        'path': model_dir,
+        'vectorizer': vectorizer,
+        'index': RetrievalIndex.from_postings(postings),
+        'questions': TextBlob(path('questions.bin'), path('question_offsets.npy')),
+        'answers': TextBlob(path('answers.bin'), path('answer_offsets.npy')),
+    }
@@ -0,0 +1,87 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+
+class RetrievalIndex:
+    """
+    Top-k cosine similarity search over TF-IDF question vectors.
+
+    Question vectors are L2-normalized once when the index is built, so the
+    cosine similarity of a query is a plain sparse dot product. With the
+    inverted index enabled the vectors are stored term-major (one posting list
+    of questions per term), and only questions sharing at least one term with
+    the query are ever scored.
+    """
+
+    def __init__(self, question_vectors, use_inverted_index=True):
+        vectors = normalize(sp.csr_matrix(question_vectors, dtype=np.float32), norm='l2')
+        self.num_questions, self.num_terms = vectors.shape
+        self.use_inverted_index = use_inverted_index
+        if use_inverted_index:
+            # Row t lists the questions that contain term t, with their weights
+            self._postings = vectors.T.tocsr()
+            self._vectors = None
+        else:
+            self._postings = None
+            self._vectors = vectors
+
+    @classmethod
+    def from_postings(cls, postings):
+        """
+        Build an inverted index from an already normalized term-major
+        (terms x questions) CSR matrix, without copying it.
+        """
+        index = cls.__new__(cls)
+        index.num_terms, index.num_questions = postings.shape
+        index.use_inverted_index = True
+        index._postings = postings
+        index._vectors = None
+        return index
+
+    @property
+    def postings(self):
+        """The normalized question vectors as a term-major CSR matrix"""
+        if self._postings is not None:
+            return self._postings
+        return self._vectors.T.tocsr()
+
+    def scores(self, query_vectors):
+        """Return a sparse (queries x questions) matrix of cosine similarities"""
+        queries = normalize(sp.csr_matrix(query_vectors, dtype=np.float32), norm='l2')
+        if self._postings is not None:
+            result = queries @ self._postings
+        else:
+            result = (self._vectors @ queries.T).T
+        return sp.csr_matrix(result)
+
+    def search(self, query_vectors, top_k=3):
+        """
+        Return, for every query row, up to ``top_k`` ``(question index, score)``
+        pairs sorted by descending score. Questions that share no term with
+        the query are never returned.
+        """
+        scores = self.scores(query_vectors)
+        return [
+            self._top_k(
+                scores.indices[scores.indptr[row]:scores.indptr[row + 1]],
+                scores.data[scores.indptr[row]:scores.indptr[row + 1]],
+                top_k
+            )
+            for row in range(scores.shape[0])
+        ]
+
+    @staticmethod
+    def _top_k(question_ids, question_scores, top_k):
+        """Select the best ``top_k`` entries without sorting every candidate"""
+        if top_k < 1:
+            return []
+        if len(question_scores) > top_k:
+            selected = np.argpartition(-question_scores, top_k - 1)[:top_k]
+            question_ids = question_ids[selected]
+            question_scores = question_scores[selected]
+        order = np.argsort(-question_scores, kind='stable')
+        return [
+            (int(question_id), float(score))
+            for question_id, score in zip(question_ids[order], question_scores[order])
+        ]
@@ -1,3 +1,444 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import scipy.sparse as sp
+from django.test import SimpleTestCase
+from rest_framework.test import APIClient
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+from .answer_cache import AnswerCache
+from . import chatbot_utils
+from .chatbot_utils import LOW_CONFIDENCE_MESSAGE
+from .model_registry import ModelRegistry
+from .model_store import (
+    META_FILE, PostingsWriter, QueryVectorizer, load_model, make_hashing_vectorizer, read_meta, save_model,
+    write_postings,
+)
+from .retrieval import RetrievalIndex
+from .training import prepare_chunk, train
+
+
+class TempDirMixin:
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def make_dir(self, name):
+        path = os.path.join(self.tmp, name)
+        os.makedirs(path)
+        return path
+
+
+QUESTIONS = [
+    'what is diabetes',
+    'what causes diabetes',
+    'how is high blood pressure treated',
+    'what causes high blood pressure',
+]
+ANSWERS = [
+    'A disease of high blood sugar.',
+    'Insulin problems.',
+    'With medication.',
+    'Many things.',
+]
+
+
+def save_sample_model(model_dir, questions=QUESTIONS, answers=ANSWERS):
+    """Fit a TF-IDF vectorizer on the questions and save it as a model"""
+    tfidf = TfidfVectorizer()
+    question_vectors = tfidf.fit_transform(questions)
+    return tfidf, save_model(model_dir, QueryVectorizer.from_tfidf(tfidf), question_vectors, questions, answers)
+
+
+def load_postings(model_dir):
+    return [np.load(os.path.join(model_dir, f'postings_{name}.npy')) for name in ('data', 'indices', 'indptr')]
+
+
+class RetrievalIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.questions = sp.random(200, 80, density=0.05, format='csr', dtype=np.float32, random_state=1)
+        self.queries = sp.random(20, 80, density=0.1, format='csr', dtype=np.float32, random_state=2)
+        self.similarities = cosine_similarity(self.queries, self.questions)
+
+    def assert_matches_cosine_similarity(self, index, top_k):
+        for query, matches in enumerate(index.search(self.queries, top_k=top_k)):
+            expected = self.similarities[query]
+            candidates = np.flatnonzero(expected)
+            self.assertEqual(len(matches), min(top_k, len(candidates)))
+            scores = [score for _, score in matches]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+            for question, score in matches:
+                self.assertAlmostEqual(score, expected[question], places=5)
+            if matches and len(candidates) > top_k:
+                # Nothing left out scores higher than the last match
+                self.assertGreaterEqual(scores[-1] + 1e-6, np.sort(expected)[-top_k])
+
+    def test_search_matches_cosine_similarity(self):
+        for use_inverted_index in (True, False):
+            with self.subTest(use_inverted_index=use_inverted_index):
+                index = RetrievalIndex(self.questions, use_inverted_index=use_inverted_index)
+                for top_k in (1, 3, 500):
+                    self.assert_matches_cosine_similarity(index, top_k)
+
+    def test_index_from_postings_gives_the_same_results(self):
+        index = RetrievalIndex.from_postings(RetrievalIndex(self.questions).postings)
+        self.assert_matches_cosine_similarity(index, top_k=5)
+
+    def test_questions_without_a_shared_term_are_not_returned(self):
+        index = RetrievalIndex(sp.csr_matrix(np.array([[1, 0, 0], [0, 1, 1]], dtype=np.float32)))
+        self.assertEqual(index.search(sp.csr_matrix(np.array([[2, 0, 0]], dtype=np.float32)), top_k=3), [[(0, 1.0)]])
+        self.assertEqual(index.search(sp.csr_matrix((1, 3), dtype=np.float32)), [[]])
+        self.assertEqual(index.search(sp.csr_matrix(np.array([[1, 1, 0]], dtype=np.float32)), top_k=0), [[]])
+
+
+class ModelStoreTests(TempDirMixin, SimpleTestCase):
+    def test_vocabulary_model_round_trip(self):
+        model_dir = os.path.join(self.tmp, 'model')
+        answers = ANSWERS[:-1] + ['Ça dépend ✓']
+        tfidf, version = save_sample_model(model_dir, answers=answers)
+
+        model = load_model(model_dir)
+        self.assertEqual(model['version'], version)
+        self.assertEqual(list(model['questions']), QUESTIONS)
+        self.assertEqual(list(model['answers']), answers)
+        self.assertEqual(model['answers'][-1], 'Ça dépend ✓')
+        with self.assertRaises(IndexError):
+            model['answers'][len(answers)]
+
+        np.testing.assert_allclose(
+            model['index'].postings.toarray(),
+            normalize(tfidf.transform(QUESTIONS)).T.toarray(),
+            rtol=1e-6
+        )
+        queries = ['What causes diabetes?', 'blood pressure', 'nothing known']
+        np.testing.assert_allclose(
+            model['vectorizer'].transform(queries).toarray(), tfidf.transform(queries).toarray(), rtol=1e-6
+        )
+
+    def test_hashing_model_round_trip(self):
+        model_dir = os.path.join(self.tmp, 'model')
+        counts = make_hashing_vectorizer(2 ** 10, {}).transform(QUESTIONS)
+        idf = np.linspace(1, 2, 2 ** 10, dtype=np.float32)
+        vectorizer = QueryVectorizer({}, idf, sublinear_tf=True)
+        save_model(model_dir, vectorizer, vectorizer.transform(QUESTIONS), QUESTIONS, ANSWERS)
+
+        self.assertEqual(read_meta(model_dir)['vectorizer']['type'], 'hashing')
+        self.assertFalse(os.path.exists(os.path.join(model_dir, 'vocabulary.npy')))
+        model = load_model(model_dir)
+        self.assertIsNone(model['vectorizer'].vocabulary)
+        self.assertTrue(model['vectorizer'].sublinear_tf)
+        np.testing.assert_allclose(
+            model['vectorizer'].transform(QUESTIONS).toarray(), vectorizer.transform(QUESTIONS).toarray(), rtol=1e-6
+        )
+        self.assertEqual(model['index'].postings.shape, (2 ** 10, len(QUESTIONS)))
+        self.assertEqual(set(model['index'].postings.indices), set(range(len(QUESTIONS))))
+        self.assertEqual(model['index'].postings.nnz, counts.nnz)
+
+    def test_version_follows_the_content(self):
+        first, second, other = (os.path.join(self.tmp, name) for name in ('first', 'second', 'other'))
+        self.assertEqual(save_sample_model(first)[1], save_sample_model(second)[1])
+        self.assertNotEqual(save_sample_model(first)[1], save_sample_model(other, answers=ANSWERS[::-1])[1])
+
+    def test_saving_replaces_the_previous_model(self):
+        model_dir = os.path.join(self.tmp, 'model')
+        save_sample_model(model_dir)
+        save_sample_model(model_dir, questions=QUESTIONS[:2], answers=ANSWERS[:2])
+        self.assertEqual(list(load_model(model_dir)['questions']), QUESTIONS[:2])
+        self.assertEqual(os.listdir(self.tmp), ['model'])
+
+    def test_other_format_versions_are_rejected(self):
+        model_dir = os.path.join(self.tmp, 'model')
+        save_sample_model(model_dir)
+        meta = read_meta(model_dir)
+        meta['format_version'] += 1
+        with open(os.path.join(model_dir, META_FILE), 'w') as f:
+            json.dump(meta, f)
+        with self.assertRaises(ValueError):
+            load_model(model_dir)
+
+    def test_mismatched_lengths_are_rejected(self):
+        with self.assertRaises(ValueError):
+            save_sample_model(os.path.join(self.tmp, 'model'), answers=ANSWERS[:-1])
+        self.assertEqual(os.listdir(self.tmp), [])
+
+
+class PostingsWriterTests(TempDirMixin, SimpleTestCase):
+    def test_blocks_match_the_transposed_matrix(self):
+        vectors = sp.random(300, 50, density=0.1, format='csr', dtype=np.float32, random_state=0)
+        expected_dir, written_dir = self.make_dir('expected'), self.make_dir('written')
+        write_postings(expected_dir, vectors.T.tocsr())
+
+        writer = PostingsWriter(written_dir, np.bincount(vectors.indices, minlength=50), 300)
+        for start in range(0, 300, 70):
+            writer.append(vectors[start:start + 70], start)
+        self.assertEqual(writer.close(), (50, 300))
+
+        for expected, written in zip(load_postings(expected_dir), load_postings(written_dir)):
+            np.testing.assert_array_equal(expected, written)
+
+    def test_missing_postings_are_reported(self):
+        writer = PostingsWriter(self.make_dir('model'), [2, 1], 2)
+        writer.append(sp.csr_matrix(np.array([[1, 1]], dtype=np.float32)), 0)
+        with self.assertRaises(ValueError):
+            writer.close()
+
+
+class TrainTests(TempDirMixin, SimpleTestCase):
+    rows = [
+        ('What is diabetes?', 'A disease of high blood sugar.'),
+        ('What causes diabetes?', 'Insulin problems.'),
+        ('', 'An answer without a question is skipped.'),
+        ('How is high blood pressure treated?', 'With medication.'),
+        ('What causes high blood pressure?', 'Many things.'),
+    ]
+
+    def write_csv(self):
+        path = os.path.join(self.tmp, 'qa.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['question', 'answer'])
+            writer.writerows(self.rows)
+        return path
+
+    def test_postings_hold_the_tfidf_question_vectors(self):
+        model_dir = os.path.join(self.tmp, 'model')
+        _, num_questions = train(self.write_csv(), model_dir, chunk_size=2, workers=1, n_features=2 ** 12, min_df=1)
+        self.assertEqual(num_questions, 4)
+
+        model = load_model(model_dir)
+        self.assertEqual(list(model['answers']), [answer for question, answer in self.rows if question])
+        _, _, counts = prepare_chunk((self.rows, 2 ** 12))
+        expected = normalize(sp.csr_matrix(counts.multiply(model['vectorizer'].idf)), norm='l2')
+        postings = sp.csr_matrix(tuple(load_postings(model_dir)), shape=(2 ** 12, 4))
+        np.testing.assert_allclose(postings.T.toarray(), expected.toarray(), rtol=1e-6)
+
+    def test_empty_file_is_rejected(self):
+        self.rows = []
+        with self.assertRaises(ValueError):
+            train(self.write_csv(), os.path.join(self.tmp, 'model'), workers=1, n_features=2 ** 12)
+
+
+class ChatbotBatchAPITests(TempDirMixin, SimpleTestCase):
+    url = '/api/chatbot/batch/'
+
+    def setUp(self):
+        super().setUp()
+        model_dir = os.path.join(self.tmp, 'model')
+        save_sample_model(model_dir)
+        patcher = mock.patch('chatbot_service.views.get_model', return_value=load_model(model_dir))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, data):
+        return APIClient().post(self.url, data, format='json')
+
+    def test_every_message_gets_an_answer_and_its_matches(self):
+        response = self.post({'messages': ['What causes diabetes?', 'weather forecast'], 'top_k': 2})
+        self.assertEqual(response.status_code, 200)
+        diabetes, unknown = response.json()['results']
+
+        self.assertEqual(diabetes['message'], 'What causes diabetes?')
+        self.assertEqual(diabetes['response'], 'Insulin problems.')
+        self.assertEqual(len(diabetes['matches']), 2)
+        self.assertEqual(diabetes['matches'][0]['question'], 'what causes diabetes')
+        self.assertEqual(diabetes['matches'][0]['answer'], 'Insulin problems.')
+        self.assertAlmostEqual(diabetes['matches'][0]['score'], 1.0, places=4)
+        self.assertGreater(diabetes['matches'][0]['score'], diabetes['matches'][1]['score'])
+
+        self.assertEqual(unknown, {'message': 'weather forecast', 'response': LOW_CONFIDENCE_MESSAGE, 'matches': []})
+
+    def test_model_not_loaded(self):
+        with mock.patch('chatbot_service.views.get_model', return_value=None):
+            response = self.post({'messages': ['What is diabetes?']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['matches'], [])
+
+    def test_invalid_requests_are_rejected(self):
+        for data in (
+            {},
+            {'messages': []},
+            {'messages': 'What is diabetes?'},
+            {'messages': ['What is diabetes?', '  ']},
+            {'messages': ['What is diabetes?', 3]},
+            {'messages': ['What is diabetes?'] * 1001},
+            {'messages': ['What is diabetes?'], 'top_k': 0},
+            {'messages': ['What is diabetes?'], 'top_k': 11},
+            {'messages': ['What is diabetes?'], 'top_k': 'three'},
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(self.post(data).status_code, 400)
+
+
+class AnswerCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('chatbot_service.answer_cache.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = AnswerCache(maxsize=2)
+        cache.set('v1', 'a', 'answer a')
+        cache.set('v1', 'b', 'answer b')
+        cache.get('v1', 'a')
+        cache.set('v1', 'c', 'answer c')
+
+        self.assertIsNone(cache.get('v1', 'b'))
+        self.assertEqual(cache.get('v1', 'a'), 'answer a')
+        self.assertEqual(cache.get('v1', 'c'), 'answer c')
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = AnswerCache(ttl=60)
+        cache.set('v1', 'a', 'answer a')
+        self.now += 59
+        self.assertEqual(cache.get('v1', 'a'), 'answer a')
+        self.now += 1
+        self.assertIsNone(cache.get('v1', 'a'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_entries_are_kept_per_model_version(self):
+        cache = AnswerCache()
+        cache.set('v1', 'a', 'old answer')
+        self.assertIsNone(cache.get('v2', 'a'))
+        cache.set('v2', 'a', 'new answer')
+        self.assertEqual(cache.get('v2', 'a'), 'new answer')
+
+    def test_stats_count_hits_and_misses(self):
+        cache = AnswerCache(maxsize=5, ttl=30)
+        cache.set('v1', 'a', 'answer a')
+        cache.get('v1', 'a')
+        cache.get('v1', 'b')
+        self.assertEqual(cache.stats(), {
+            'size': 1, 'maxsize': 5, 'ttl': 30, 'hits': 1, 'misses': 1, 'hit_rate': 0.5,
+        })
+        cache.clear()
+        self.assertEqual(cache.stats()['hits'], 0)
+
+    def test_zero_maxsize_disables_the_cache(self):
+        cache = AnswerCache(maxsize=0)
+        cache.set('v1', 'a', 'answer a')
+        self.assertIsNone(cache.get('v1', 'a'))
+
+
+class ModelRegistryTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        patcher = mock.patch('chatbot_service.model_registry.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.model_dir = os.path.join(self.tmp, 'model')
+        self.meta_path = os.path.join(self.model_dir, META_FILE)
+        self.loads = 0
+        self.mtime = 1_000_000_000
+        self.registry = ModelRegistry(self.load, [self.meta_path], check_interval=5)
+
+    def load(self):
+        self.loads += 1
+        return chatbot_utils.load_model(self.model_dir)
+
+    def touch(self):
+        # Mark the files as changed even within the file system's timestamp resolution
+        self.mtime += 1
+        os.utime(self.meta_path, (self.mtime, self.mtime))
+
+    def publish(self, answers=ANSWERS):
+        version = save_sample_model(self.model_dir, answers=answers)[1]
+        self.touch()
+        return version
+
+    def get_after_check(self):
+        """Call get() once the check interval has passed and wait for the reload it starts"""
+        self.now += 5
+        model = self.registry.get()
+        self.registry.reload().join()
+        return model
+
+    def test_model_is_loaded_on_first_use(self):
+        version = self.publish()
+        self.assertEqual(self.loads, 0)
+        self.assertEqual(self.registry.get()['version'], version)
+        self.assertEqual(self.registry.get()['version'], version)
+        self.assertEqual(self.loads, 1)
+
+    def test_published_model_is_swapped_in(self):
+        old_version = self.publish()
+        old_model = self.registry.get()
+        new_version = self.publish(answers=ANSWERS[::-1])
+
+        self.now += 4
+        self.assertIs(self.registry.get(), old_model)
+        # The old model keeps being served until the new one is loaded
+        self.assertIs(self.get_after_check(), old_model)
+        self.assertEqual(self.registry.get()['version'], new_version)
+        self.assertNotEqual(new_version, old_version)
+        self.assertEqual(list(old_model['answers']), ANSWERS)
+        self.assertEqual(list(self.registry.get()['answers']), ANSWERS[::-1])
+
+    def test_unchanged_files_are_not_reloaded(self):
+        self.publish()
+        self.registry.get()
+        self.get_after_check()
+        self.assertEqual(self.loads, 1)
+
+    def test_same_version_is_not_swapped(self):
+        self.publish()
+        model = self.registry.get()
+        self.publish()
+        self.get_after_check()
+        self.assertEqual(self.loads, 2)
+        self.assertIs(self.registry.get(), model)
+
+    def test_failed_load_keeps_the_previous_model(self):
+        version = self.publish()
+        self.registry.get()
+        meta = read_meta(self.model_dir)
+        meta['format_version'] += 1
+        with open(self.meta_path, 'w') as f:
+            json.dump(meta, f)
+        self.touch()
+
+        with self.assertLogs('chatbot_service.chatbot_utils', 'ERROR'):
+            self.get_after_check()
+        self.assertEqual(self.registry.get()['version'], version)
+        self.assertIsNotNone(self.registry.status()['last_error'])
+
+        new_version = self.publish(answers=ANSWERS[::-1])
+        self.get_after_check()
+        self.assertEqual(self.registry.get()['version'], new_version)
+        self.assertIsNone(self.registry.status()['last_error'])
+
+    def test_forced_reload_swaps_the_same_version(self):
+        self.publish()
+        model = self.registry.get()
+        self.registry.reload(force=True).join()
+        self.assertIsNot(self.registry.get(), model)
+        self.assertEqual(self.registry.get()['version'], model['version'])
+
+    def test_status(self):
+        self.assertEqual(self.registry.status()['version'], None)
+        version = self.publish()
+        self.registry.get()
+        status = self.registry.status()
+        self.assertEqual(status['version'], version)
+        self.assertEqual(status['path'], self.model_dir)
+        self.assertEqual(status['num_questions'], len(QUESTIONS))
+        self.assertIsNotNone(status['loaded_at'])
+        self.assertFalse(status['reloading'])
+        self.assertIsNone(status['last_error'])
+
+    def test_missing_model(self):
+        legacy_path = os.path.join(self.tmp, 'missing.pkl')
+        with mock.patch.object(chatbot_utils, 'LEGACY_MODEL_PATH', legacy_path), \
+                self.assertLogs('chatbot_service.chatbot_utils', 'ERROR'):
+            self.assertIsNone(self.registry.get())
+        self.assertIsNotNone(self.registry.status()['last_error'])
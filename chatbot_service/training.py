@@ -0,0 +1,166 @@
+"""
+Streaming training pipeline for the chatbot model.
+
+The Q&A CSV is read twice, in chunks, and a worker pool cleans every chunk
+and turns its questions into term counts with feature hashing, so no
+vocabulary is built and held in memory. The first pass streams the questions
+and answers into the model directory and accumulates document frequencies.
+Once they are known, the second pass hashes the chunks again, weights and
+normalizes them with the IDF and writes them into the postings, so memory
+stays flat however large the file is.
+"""
+import csv
+import itertools
+import logging
+import os
+from multiprocessing import Pool
+
+import numpy as np
+import scipy.sparse as sp
+from django.utils import timezone
+from sklearn.preprocessing import normalize
+
+from .chatbot_utils import clean_text
+from .model_store import (
+    PostingsWriter, QueryVectorizer, TextBlobWriter, build_model_dir, make_hashing_vectorizer, write_meta
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_N_FEATURES = 2 ** 20
+DEFAULT_MIN_DF = 2
+MAX_ANSWER_LENGTH = 1000
+
+ANALYZER_PARAMS = {
+    'analyzer': 'word',
+    'lowercase': True,
+    'ngram_range': (1, 2),
+    'stop_words': 'english',
+    'strip_accents': None,
+    'token_pattern': r'(?u)\b\w\w+\b',
+}
+
+
+def truncate_text(text, max_length=MAX_ANSWER_LENGTH):
+    """Truncate very long answers to a reasonable length"""
+    if len(text) <= max_length:
+        return text
+
+    # Try to find a period to break at
+    cutoff = text[:max_length].rfind('.')
+    if cutoff > max_length // 2:
+        return text[:cutoff + 1]
+
+    return text[:max_length] + "..."
+
+
+def iter_csv_chunks(csv_path, chunk_size=DEFAULT_CHUNK_SIZE, max_samples=None):
+    """Yield lists of (question, answer) rows taken from the first two CSV columns"""
+    # Answers can be longer than the default field size limit
+    csv.field_size_limit(2 ** 31 - 1)
+    with open(csv_path, newline='', encoding='utf-8', errors='ignore') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip the header
+        rows = (row[:2] for row in reader if len(row) >= 2)
+        if max_samples:
+            rows = itertools.islice(rows, max_samples)
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def prepare_chunk(args):
+    """Clean a chunk of rows and hash its questions into term counts (runs in a worker)"""
+    rows, n_features = args
+    questions = []
+    answers = []
+    for question, answer in rows:
+        question = question.strip()
+        answer = answer.strip()
+        # Skip empty entries
+        if not question or not answer:
+            continue
+        questions.append(question)
+        answers.append(truncate_text(answer))
+
+    counts = make_hashing_vectorizer(n_features, ANALYZER_PARAMS).transform(
+        [clean_text(question) for question in questions]
+    )
+    return questions, answers, sp.csr_matrix(counts, dtype=np.float32)
+
+
+def train(csv_path, model_dir, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, n_features=DEFAULT_N_FEATURES,
+          min_df=DEFAULT_MIN_DF, max_samples=None):
+    """
+    Train a model from ``csv_path`` and publish it to ``model_dir``.
+    Returns ``(model version, number of Q&A pairs)``.
+    """
+    workers = workers or os.cpu_count() or 1
+    pool = None
+
+    def prepared_chunks():
+        """Read the CSV from the start, yielding each chunk as prepare_chunk returns it"""
+        chunks = ((rows, n_features) for rows in iter_csv_chunks(csv_path, chunk_size, max_samples))
+        return pool.imap(prepare_chunk, chunks) if pool else map(prepare_chunk, chunks)
+
+    with build_model_dir(model_dir) as build_dir:
+        pool = Pool(workers) if workers > 1 else None
+        try:
+            # First pass: texts and document frequencies
+            questions = TextBlobWriter(build_dir, 'questions.bin', 'question_offsets.npy')
+            answers = TextBlobWriter(build_dir, 'answers.bin', 'answer_offsets.npy')
+            document_frequency = np.zeros(n_features, dtype=np.int64)
+            try:
+                for chunk_questions, chunk_answers, counts in prepared_chunks():
+                    for question, answer in zip(chunk_questions, chunk_answers):
+                        questions.append(question)
+                        answers.append(answer)
+                    document_frequency += np.bincount(counts.indices, minlength=n_features)
+                    logger.info(f"Read {len(questions)} Q&A pairs")
+            finally:
+                questions.close()
+                answers.close()
+
+            num_questions = len(questions)
+            if not num_questions:
+                raise ValueError(f"No Q&A pairs found in {csv_path}")
+
+            # Smoothed IDF as computed by TfidfVectorizer; terms seen in fewer
+            # than min_df questions are ignored
+            idf = np.log((1 + num_questions) / (1 + document_frequency)) + 1
+            idf[document_frequency < min_df] = 0
+            idf = idf.astype(np.float32)
+
+            # Second pass: weighted, normalized question vectors
+            postings = PostingsWriter(build_dir, np.where(idf > 0, document_frequency, 0), num_questions)
+            first_question = 0
+            for _, _, counts in prepared_chunks():
+                counts.data *= idf[counts.indices]
+                counts.eliminate_zeros()
+                normalize(counts, norm='l2', copy=False)
+                postings.append(counts, first_question)
+                first_question += counts.shape[0]
+                logger.info(f"Indexed {first_question} of {num_questions} Q&A pairs")
+            if first_question != num_questions:
+                raise ValueError(f"{csv_path} changed while the model was trained")
+            num_terms, _ = postings.close()
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+
+        version = write_meta(
+            build_dir,
+            QueryVectorizer(ANALYZER_PARAMS, idf),
+            num_terms,
+            num_questions,
+            extra_meta={
+                'source': os.path.basename(csv_path),
+                'trained_at': timezone.now().isoformat(),
+                'min_df': min_df,
+            }
+        )
+    return version, num_questions
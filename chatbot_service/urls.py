@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import ChatbotAPIView
+from .views import ChatbotAPIView, ChatbotBatchAPIView, ChatbotCacheStatsAPIView, ChatbotModelAPIView
 
 urlpatterns = [
     path('api/chatbot/', ChatbotAPIView.as_view(), name='chatbot-api'),
+    path('api/chatbot/batch/', ChatbotBatchAPIView.as_view(), name='chatbot-batch-api'),
+    path('api/chatbot/cache/', ChatbotCacheStatsAPIView.as_view(), name='chatbot-cache-api'),
+    path('api/chatbot/model/', ChatbotModelAPIView.as_view(), name='chatbot-model-api'),
 ] 
\ No newline at end of file
@@ -3,10 +3,10 @@ from django.http import JsonResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 import json
 import logging
-from .chatbot_utils import get_answer, model_instance
+from .chatbot_utils import get_answer, get_answers, get_model, answer_cache, model_registry
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +30,7 @@ class ChatbotAPIView(APIView):
             logger.info(f"User {request.user.username} sent message: {message}")
             
             # Get response from the chatbot
-            response = get_answer(message, model_instance)
+            response = get_answer(message, get_model())
             
             # Return the response
             return Response({'response': response})
@@ -41,3 +41,80 @@ class ChatbotAPIView(APIView):
                 {'error': 'An error occurred while processing your request'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class ChatbotBatchAPIView(APIView):
+    """Answer a list of messages in a single request"""
+    max_messages = 1000
+    max_top_k = 10
+    
+    def post(self, request, format=None):
+        messages = request.data.get('messages')
+        if not isinstance(messages, list) or not messages:
+            return Response(
+                {'error': 'A non-empty list of messages is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(messages) > self.max_messages:
+            return Response(
+                {'error': f'At most {self.max_messages} messages can be sent at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not all(isinstance(message, str) and message.strip() for message in messages):
+            return Response(
+                {'error': 'Every message must be a non-empty string'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            top_k = int(request.data.get('top_k', 3))
+        except (TypeError, ValueError):
+            return Response({'error': 'top_k must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= top_k <= self.max_top_k:
+            return Response(
+                {'error': f'top_k must be between 1 and {self.max_top_k}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            results = get_answers([message.strip() for message in messages], get_model(), top_k=top_k)
+        except Exception as e:
+            logger.error(f"Error processing chatbot batch request: {e}")
+            return Response(
+                {'error': 'An error occurred while processing your request'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        return Response({
+            'results': [{'message': message, **result} for message, result in zip(messages, results)]
+        })
+
+
+class ChatbotCacheStatsAPIView(APIView):
+    """Report the answer cache counters of this worker"""
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request, format=None):
+        model = get_model()
+        return Response({
+            'model_version': model['version'] if model else None,
+            'cache': answer_cache.stats()
+        })
+
+
+class ChatbotModelAPIView(APIView):
+    """
+    Report the active chatbot model of this worker (GET) or reload it (POST).
+    Other workers pick up a newly published model on their own.
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request, format=None):
+        return Response(model_registry.status())
+    
+    def post(self, request, format=None):
+        thread = model_registry.reload(force=True)
+        if request.data.get('wait', True) in (False, 'false', '0'):
+            return Response(model_registry.status(), status=status.HTTP_202_ACCEPTED)
+        thread.join()
+        return Response(model_registry.status())
@@ -13,7 +13,7 @@ import codecs
 # File paths
 CSV_DATA_PATH = 'medquad.csv'
 MODEL_SAVE_PATH = 'healthcare_bot_model.pkl'
-SAMPLE_SIZE = 5000  # Process 5000 samples, or None for all data
+SAMPLE_SIZE = None  # Number of samples to process, or None for all data
 
 # Set up logging
 def log(message):
@@ -0,0 +1,184 @@
+"""
+Doctor dashboard aggregates.
+
+Appointments reference their doctor by ``provider_id``, the doctor's user ID.
+The dashboard counters are cached per doctor and day in the shared cache and
+invalidated by the appointment and medical record services when one of the
+doctor's appointments or records changes (see healthcare/doctor_dashboard.py),
+so a dashboard refreshing every few seconds only runs its queries after a
+change.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from healthcare.doctor_dashboard import stats_cache_key
+from healthcare.user_enrichment import fetch_users
+
+# Appointment statuses still ahead of the visit
+UPCOMING_STATUSES = ('SCHEDULED', 'CONFIRMED')
+
+RECENT_PATIENTS_LIMIT = 10
+
+
+def today_range(now=None):
+    now = timezone.localtime(now)
+    start = timezone.make_aware(datetime.combine(now.date(), time.min))
+    return start, start + timedelta(days=1)
+
+
+def _full_name(user):
+    if not user:
+        return None
+    return ' '.join(part for part in (user.get('first_name'), user.get('last_name')) if part) or user.get('username')
+
+
+def _fetch_patients(patient_ids):
+    # Patient IDs are user IDs stored as strings
+    return fetch_users(patient_id for patient_id in patient_ids if patient_id.isdigit())
+
+
+def _patient_name(users, patient_id):
+    return _full_name(users.get(int(patient_id))) if patient_id.isdigit() else None
+
+
+def dashboard_stats(doctor):
+    """Appointment counters of the doctor, cached until they change"""
+    provider_id = str(doctor.user_id)
+    key = stats_cache_key(provider_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_stats(provider_id)
+        cache.set(key, stats, settings.DOCTOR_DASHBOARD_CACHE_TTL)
+
+    user = fetch_users([doctor.user_id]).get(doctor.user_id)
+    return {
+        'doctor_id': doctor.id,
+        'full_name': _full_name(user),
+        'specialization': doctor.specialization,
+        **stats,
+    }
+
+
+def compute_stats(provider_id):
+    from appointment_service.models import Appointment
+    from medical_record_service.models import MedicalRecord
+
+    appointments = Appointment.objects.filter(provider_id=provider_id).order_by()
+    status_counts = dict(appointments.values_list('status').annotate(count=Count('id')))
+
+    now = timezone.now()
+    day_start, day_end = today_range(now)
+    counts = appointments.aggregate(
+        total_patients=Count('patient_id', distinct=True),
+        today_appointments=Count('id', filter=Q(
+            time_slot__start_time__gte=day_start, time_slot__start_time__lt=day_end
+        ) & ~Q(status='CANCELLED')),
+        upcoming_appointments=Count('id', filter=Q(
+            time_slot__start_time__gte=now, status__in=UPCOMING_STATUSES
+        )),
+    )
+    pending_reports = MedicalRecord.objects.filter(provider_id=provider_id, status='DRAFT').count()
+
+    return {
+        **counts,
+        'pending_reports': pending_reports,
+        'status_counts': status_counts,
+        'computed_at': now.isoformat(),
+    }
+
+
+def today_appointments(doctor):
+    """
+    The doctor's appointments today in time order, with patient names, read
+    with a single range query over the appointments joined to their slots
+    """
+    from appointment_service.models import Appointment
+
+    day_start, day_end = today_range()
+    appointments = list(
+        Appointment.objects.filter(
+            provider_id=str(doctor.user_id),
+            time_slot__start_time__gte=day_start,
+            time_slot__start_time__lt=day_end,
+        ).order_by('time_slot__start_time').values(
+            'id', 'appointment_id', 'patient_id', 'status', 'reason', 'appointment_type__name',
+            'time_slot__start_time', 'time_slot__end_time'
+        )
+    )
+    users = _fetch_patients(appointment['patient_id'] for appointment in appointments)
+    return [
+        {
+            'id': appointment['id'],
+            'appointment_id': appointment['appointment_id'],
+            'patient_id': appointment['patient_id'],
+            'patient_name': _patient_name(users, appointment['patient_id']),
+            'status': appointment['status'],
+            'reason': appointment['reason'],
+            'appointment_type': appointment['appointment_type__name'],
+            'time_slot': {
+                'start_time': appointment['time_slot__start_time'],
+                'end_time': appointment['time_slot__end_time'],
+            },
+        }
+        for appointment in appointments
+    ]
+
+
+def _last_appointment_visits(provider_id, now, limit):
+    """Latest past appointment start of each of the doctor's most recent patients"""
+    from appointment_service.models import Appointment
+
+    appointments = Appointment.objects.filter(
+        provider_id=provider_id, time_slot__start_time__lte=now
+    ).exclude(status='CANCELLED')
+    if connections[router.db_for_read(Appointment)].features.can_distinct_on_fields:
+        # The latest appointment of each patient, then the most recent of those
+        latest = appointments.order_by('patient_id', '-time_slot__start_time').distinct('patient_id')
+        rows = Appointment.objects.filter(pk__in=latest.values('pk')).order_by(
+            '-time_slot__start_time'
+        ).values_list('patient_id', 'time_slot__start_time')[:limit]
+    else:
+        rows = appointments.order_by().values_list('patient_id').annotate(
+            last_visit=Max('time_slot__start_time')
+        ).order_by('-last_visit')[:limit]
+    return dict(rows)
+
+
+def _last_record_visits(provider_id, limit):
+    """Latest visit date of the patients in the doctor's most recent medical records"""
+    from medical_record_service.models import MedicalRecord
+
+    visits = {}
+    records = MedicalRecord.objects.filter(provider_id=provider_id).order_by('-created_at').values_list(
+        'patient_id', 'visit_date'
+    )
+    # Recent records rarely all belong to a few patients; a bounded window is enough
+    for patient_id, visit_date in records[:limit * 5]:
+        if patient_id not in visits or visit_date > visits[patient_id]:
+            visits[patient_id] = visit_date
+    return visits
+
+
+def recent_patients(doctor, limit=RECENT_PATIENTS_LIMIT):
+    """The doctor's most recently seen patients, from appointments and medical records"""
+    provider_id = str(doctor.user_id)
+    last_visits = _last_appointment_visits(provider_id, timezone.now(), limit)
+    for patient_id, visit_date in _last_record_visits(provider_id, limit).items():
+        if patient_id not in last_visits or visit_date > last_visits[patient_id]:
+            last_visits[patient_id] = visit_date
+
+    recent = sorted(last_visits.items(), key=lambda visit: visit[1], reverse=True)[:limit]
+    users = _fetch_patients(patient_id for patient_id, _ in recent)
+    return [
+        {
+            'patient_id': patient_id,
+            'patient_name': _patient_name(users, patient_id),
+            'last_visit': last_visit,
+        }
+        for patient_id, last_visit in recent
+    ]
@@ -9,3 +9,8 @@ class IsDoctorOrAdmin(permissions.BasePermission):
 class IsAdminUser(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_staff
+
+class IsOwnDoctorOrAdmin(permissions.BasePermission):
+    """The doctor themselves, or staff"""
+    def has_object_permission(self, request, view, obj):
+        return obj.user_id == request.user.id or request.user.is_staff or request.user.role == 'ADMINISTRATOR'
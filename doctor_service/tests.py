@@ -1,3 +1,78 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from appointment_service.models import Appointment, AppointmentType, TimeSlot
+from auth_service.models import User
+from medical_record_service.models import MedicalRecord
+
+from .models import Doctor
+
+
+class DashboardStatsTests(TestCase):
+    databases = {'default', 'appointment_db'}
+
+    def setUp(self):
+        # Medical records use MongoDB-only (djongo) fields; count no pending reports
+        patcher = mock.patch.object(MedicalRecord, 'objects')
+        patcher.start().filter.return_value.count.return_value = 0
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='doctor', email='doctor@example.com', password='password', role='DOCTOR'
+        )
+        self.doctor = Doctor.objects.create(user_id=self.user.id, specialization='Cardiology', license_number='L-1')
+        self.appointment_type = AppointmentType.objects.create(
+            type_id='CONSULT', name='Consultation', description='Consultation', duration_minutes=15
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/doctors/{self.doctor.pk}/dashboard_stats/'
+
+    def book(self, number):
+        start = timezone.now() + timedelta(minutes=number)
+        slot = TimeSlot.objects.create(
+            provider_id=str(self.user.id), provider_type='DOCTOR', start_time=start, end_time=start + timedelta(minutes=15)
+        )
+        return Appointment.objects.create(
+            appointment_id=f'APT{number}', patient_id=str(100 + number), provider_id=str(self.user.id),
+            provider_type='DOCTOR', appointment_type=self.appointment_type, time_slot=slot,
+            reason='Checkup', created_by=str(self.user.id)
+        )
+
+    def test_counters_are_cached(self):
+        self.book(1)
+        self.assertEqual(self.client.get(self.url).data['total_patients'], 1)
+        with self.assertNumQueries(0, using='appointment_db'):
+            self.assertEqual(self.client.get(self.url).data['total_patients'], 1)
+
+    def test_appointment_changes_clear_the_counters(self):
+        appointment = self.book(1)
+        self.assertEqual(self.client.get(self.url).data['upcoming_appointments'], 1)
+
+        self.book(2)
+        self.assertEqual(self.client.get(self.url).data['upcoming_appointments'], 2)
+
+        appointment.status = 'CANCELLED'
+        appointment.save()
+        data = self.client.get(self.url).data
+        self.assertEqual(data['upcoming_appointments'], 1)
+        self.assertEqual(data['status_counts'], {'SCHEDULED': 1, 'CANCELLED': 1})
+
+    def test_only_the_doctor_and_staff_see_the_dashboard(self):
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(
+            username='other', email='other@example.com', password='password', role='DOCTOR'
+        ))
+        self.assertEqual(other.get(self.url).status_code, 403)
 
-# Create your tests here.
+        admin = APIClient()
+        admin.force_authenticate(User.objects.create_user(
+            username='admin', email='admin@example.com', password='password', is_staff=True
+        ))
+        self.assertEqual(admin.get(self.url).status_code, 200)
+        self.assertEqual(admin.get('/api/doctors/0/dashboard_stats/').status_code, 404)
@@ -5,4 +5,10 @@ urlpatterns = [
     path('', views.DoctorListView.as_view(), name='doctor-list'),
     path('create/', views.DoctorCreateView.as_view(), name='doctor-create'),
     path('<int:pk>/', views.DoctorDetailView.as_view(), name='doctor-detail'),
+    path('<int:pk>/dashboard_stats/', views.DoctorDashboardView.as_view(part='dashboard_stats'),
+         name='doctor-dashboard-stats'),
+    path('<int:pk>/today_appointments/', views.DoctorDashboardView.as_view(part='today_appointments'),
+         name='doctor-today-appointments'),
+    path('<int:pk>/recent_patients/', views.DoctorDashboardView.as_view(part='recent_patients'),
+         name='doctor-recent-patients'),
 ]
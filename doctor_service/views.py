@@ -1,9 +1,10 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
-import requests
+from healthcare.user_enrichment import attach_user_details, USER_CONTACT_FIELDS
 from .models import Doctor
 from .serializers import DoctorSerializer
-from .permissions import IsDoctorOrAdmin, IsAdminUser
+from .permissions import IsDoctorOrAdmin, IsAdminUser, IsOwnDoctorOrAdmin
+from . import dashboard
 
 class DoctorCreateView(generics.CreateAPIView):
     queryset = Doctor.objects.all()
@@ -20,34 +21,27 @@ class DoctorListView(generics.ListAPIView):
     serializer_class = DoctorSerializer
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        data = []
-        for doctor in queryset:
-            doctor_data = DoctorSerializer(doctor).data
-            try:
-                auth_service_url = f'http://localhost:8000/api/auth/internal/user/{doctor.user_id}/'
-                response = requests.get(auth_service_url)
-                response.raise_for_status()
-                user_data = response.json()
-
-                doctor_data['username'] = user_data.get('username')
-                doctor_data['email'] = user_data.get('email')
-                doctor_data['first_name'] = user_data.get('first_name')
-                doctor_data['last_name'] = user_data.get('last_name')
-                doctor_data['phone_number'] = user_data.get('phone_number')
-            except requests.exceptions.RequestException as e:
-                doctor_data['username'] = 'N/A'
-                doctor_data['email'] = 'N/A'
-                doctor_data['first_name'] = 'N/A'
-                doctor_data['last_name'] = 'N/A'
-                doctor_data['phone_number'] = 'N/A'
-            except Exception as e:
-                doctor_data['username'] = 'Error'
-                doctor_data['email'] = 'Error'
-                doctor_data['first_name'] = 'Error'
-                doctor_data['last_name'] = 'Error'
-                doctor_data['phone_number'] = 'Error'
-
-            data.append(doctor_data)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        doctors = page if page is not None else list(queryset)
+
+        # Resolve user details for every doctor on the page in one lookup
+        data = self.get_serializer(doctors, many=True).data
+        attach_user_details(data, [doctor.user_id for doctor in doctors], fields=USER_CONTACT_FIELDS)
+
+        if page is not None:
+            return self.get_paginated_response(data)
         return Response(data)
 
+class DoctorDashboardView(generics.GenericAPIView):
+    """
+    One part of a doctor's dashboard, chosen with ``as_view(part=...)``:
+    the counters, today's appointments or the recent patients
+    """
+    queryset = Doctor.objects.all()
+    permission_classes = [permissions.IsAuthenticated, IsOwnDoctorOrAdmin]
+    part = None
+
+    def get(self, request, *args, **kwargs):
+        doctor = self.get_object()
+        return Response(getattr(dashboard, self.part)(doctor))
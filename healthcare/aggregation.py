@@ -0,0 +1,97 @@
+"""
+Concurrent fan-out to several services for aggregated responses.
+
+An aggregated endpoint declares its parts as Sources and awaits
+``fan_out``, which fetches all of them at once. A part whose service runs in
+this process (see healthcare/service_dispatch.py) is read with its ORM
+function in a worker thread; any other part is fetched over HTTP with the
+pooled service client. Each call has its own deadline. A part that fails or
+misses its deadline is reported in ``errors`` while the others are still
+returned.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from healthcare.profiling import instrument_connections
+from healthcare.service_client import service_client
+from healthcare.service_dispatch import is_local, service_config
+
+# Threads shared by every fan-out. The event loop's default executor would
+# be shut down with the loop at the end of each request, which waits for
+# calls that already missed their deadline.
+_executor = ThreadPoolExecutor(max_workers=settings.AGGREGATION_MAX_WORKERS, thread_name_prefix='fan-out')
+
+
+class Source:
+    """
+    One part of an aggregated response.
+
+    ``local`` is called with the fan-out keyword arguments and returns the
+    part as JSON data. ``path`` and ``params`` describe the equivalent GET
+    request and are formatted with the same arguments; a paginated response
+    is reduced to its ``results``.
+    """
+
+    def __init__(self, service, local, path, params=None, timeout=None):
+        self.service = service
+        self.local = local
+        self.path = path
+        self.params = params or {}
+        self.timeout = timeout
+
+
+def _call_local(func, kwargs):
+    try:
+        with instrument_connections():
+            return func(**kwargs)
+    finally:
+        # Worker threads outlive the request, so do not leave their
+        # connections open for the next one
+        connections.close_all()
+
+
+def _call_remote(url, params, headers, timeout):
+    response = service_client.get(url, params=params, headers=headers,
+                                  timeout=(settings.SERVICE_CLIENT_CONNECT_TIMEOUT, timeout))
+    response.raise_for_status()
+    data = response.json()
+    if isinstance(data, dict) and 'results' in data:
+        return data['results']
+    return data
+
+
+async def fetch(source, kwargs, headers=None, timeout=None):
+    """Fetch one source, raising asyncio.TimeoutError past its deadline"""
+    timeout = source.timeout or timeout or settings.AGGREGATION_CALL_TIMEOUT
+    if is_local(source.service):
+        call = sync_to_async(_call_local, thread_sensitive=False, executor=_executor)(source.local, kwargs)
+    else:
+        url = f"{service_config(source.service)['url']}{source.path.format(**kwargs)}"
+        params = {key: str(value).format(**kwargs) for key, value in source.params.items()}
+        call = sync_to_async(_call_remote, thread_sensitive=False, executor=_executor)(url, params, headers, timeout)
+    return await asyncio.wait_for(call, timeout)
+
+
+async def fan_out(sources, kwargs, headers=None, timeout=None):
+    """
+    Fetch every source of the ``{name: Source}`` dict concurrently.
+    Returns ``(data, errors)``, both keyed by source name.
+    """
+    names = list(sources)
+    results = await asyncio.gather(
+        *(fetch(sources[name], kwargs, headers, timeout) for name in names),
+        return_exceptions=True
+    )
+    data, errors = {}, {}
+    for name, result in zip(names, results):
+        if isinstance(result, asyncio.TimeoutError):
+            errors[name] = 'Timed out'
+        elif isinstance(result, Exception):
+            errors[name] = str(result) or result.__class__.__name__
+        else:
+            data[name] = result
+    return data, errors
@@ -0,0 +1,29 @@
+"""
+Cached doctor dashboard counters.
+
+doctor_service caches each doctor's dashboard counters per day in the
+shared cache (settings.CACHES), which every process of every service reads.
+The services owning the counted data, appointments and medical records, clear
+a doctor's counters from their own post-save and post-delete signals, so
+they are invalidated whichever process writes the change. Writes that send
+no signals, such as queryset updates, are only picked up once the counters
+expire after DOCTOR_DASHBOARD_CACHE_TTL seconds.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+
+def stats_cache_key(provider_id, day=None):
+    return f"doctor-dashboard:{provider_id}:{day or timezone.localdate()}"
+
+
+def invalidate_stats(provider_id, using):
+    """Clear the doctor's counters now and once the transaction on database ``using`` commits"""
+    if not provider_id:
+        return
+    key = stats_cache_key(provider_id)
+    cache.delete(key)
+    # Again after the commit, in case a dashboard read cached the old
+    # counters while the transaction was still open
+    transaction.on_commit(lambda: cache.delete(key), using=using)
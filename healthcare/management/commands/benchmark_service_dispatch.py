@@ -0,0 +1,57 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_service.models import User
+from healthcare.service_dispatch import ServiceCallError, call_service, service_config
+
+
+class Command(BaseCommand):
+    help = ('Compare in-process and HTTP dispatch of the auth service bulk user lookup. '
+            'The HTTP run needs the service running at its configured URL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200, help='Lookups per dispatch mode')
+        parser.add_argument('--ids', type=int, default=50, help='User IDs per lookup')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed lookups before each run')
+
+    def handle(self, *args, **options):
+        user_ids = list(User.objects.order_by('id').values_list('id', flat=True)[:options['ids']])
+        if not user_ids:
+            raise CommandError('No users to look up; create some first (e.g. with create_sample_data)')
+
+        self.stdout.write(f"{options['calls']} lookups of {len(user_ids)} users, "
+                          f"HTTP target {service_config('auth')['url']}")
+        results = {}
+        for mode in ('local', 'http'):
+            try:
+                results[mode] = self._run(mode, user_ids, options['calls'], options['warmup'])
+            except ServiceCallError as e:
+                self.stdout.write(self.style.WARNING(f"{mode:>5}: skipped, {e}"))
+                continue
+            timings = results[mode]
+            self.stdout.write(
+                f"{mode:>5}: mean {statistics.mean(timings):8.3f} ms  "
+                f"p50 {self._percentile(timings, 50):8.3f} ms  "
+                f"p95 {self._percentile(timings, 95):8.3f} ms"
+            )
+
+        if len(results) == 2:
+            speedup = statistics.mean(results['http']) / statistics.mean(results['local'])
+            self.stdout.write(self.style.SUCCESS(f"In-process dispatch is {speedup:.1f}x faster"))
+
+    def _run(self, mode, user_ids, calls, warmup):
+        for _ in range(warmup):
+            call_service('auth', 'users', user_ids, mode=mode)
+        timings = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            call_service('auth', 'users', user_ids, mode=mode)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    @staticmethod
+    def _percentile(values, percent):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * percent / 100))]
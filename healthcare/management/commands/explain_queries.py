@@ -0,0 +1,165 @@
+import json
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from appointment_service.models import TimeSlot, Appointment, Reminder
+from appointment_service.views import TimeSlotViewSet, AppointmentViewSet
+from laboratory_service.models import LabOrder, TestResult
+from laboratory_service.views import LabOrderViewSet, TestResultViewSet
+from medical_record_service.models import MedicalRecord
+from medical_record_service.views import MedicalRecordViewSet
+from payment_service.models import PaymentTransaction
+from payment_service.views import PaymentTransactionViewSet
+from pharmacy_service.models import Order
+from pharmacy_service.views import OrderViewSet
+from prescription_service.models import Prescription
+from prescription_service.views import PrescriptionViewSet
+
+SAMPLE_ID = 'EXPLAIN-0000'
+
+
+def canonical_queries():
+    """
+    The filters and orderings the service viewsets and their custom actions
+    run most often, as (name, queryset) pairs.
+    """
+    now = timezone.now()
+    return [
+        ('appointments.available_slots', TimeSlot.objects.filter(
+            provider_id=SAMPLE_ID, provider_type='DOCTOR', is_available=True,
+            start_time__gte=now, end_time__lte=now + timedelta(days=7)
+        ).order_by('start_time')),
+        ('appointments.slots_by_provider', TimeSlot.objects.filter(
+            provider_id=SAMPLE_ID, is_available=True
+        ).order_by(*TimeSlotViewSet.ordering)),
+        ('appointments.patient_appointments', Appointment.objects.filter(
+            patient_id=SAMPLE_ID
+        ).order_by(*AppointmentViewSet.ordering)),
+        ('appointments.provider_appointments', Appointment.objects.filter(
+            provider_id=SAMPLE_ID
+        ).order_by(*AppointmentViewSet.ordering)),
+        ('appointments.doctor_today', Appointment.objects.filter(
+            provider_id=SAMPLE_ID, time_slot__start_time__gte=now, time_slot__start_time__lt=now + timedelta(days=1)
+        ).order_by('time_slot__start_time')),
+        ('appointments.due_reminders', Reminder.objects.filter(
+            status='PENDING', scheduled_time__lte=now
+        ).order_by('scheduled_time')),
+        ('laboratory.patient_orders', LabOrder.objects.filter(
+            patient_id=SAMPLE_ID
+        ).order_by(*LabOrderViewSet.ordering)),
+        ('laboratory.doctor_orders', LabOrder.objects.filter(
+            doctor_id=SAMPLE_ID
+        ).order_by(*LabOrderViewSet.ordering)),
+        ('laboratory.orders_by_status', LabOrder.objects.filter(
+            status='ORDERED'
+        ).order_by(*LabOrderViewSet.ordering)),
+        ('laboratory.patient_results', TestResult.objects.filter(
+            order_test__order__patient_id=SAMPLE_ID
+        ).order_by(*TestResultViewSet.ordering)),
+        ('medical_records.patient_records', MedicalRecord.objects.filter(
+            patient_id=SAMPLE_ID
+        ).order_by(*MedicalRecordViewSet.ordering)),
+        ('medical_records.provider_records', MedicalRecord.objects.filter(
+            provider_id=SAMPLE_ID
+        ).order_by(*MedicalRecordViewSet.ordering)),
+        ('payments.patient_transactions', PaymentTransaction.objects.filter(
+            patient_id=SAMPLE_ID
+        ).order_by(*PaymentTransactionViewSet.ordering)),
+        ('payments.transactions_by_status', PaymentTransaction.objects.filter(
+            payment_status='pending'
+        ).order_by(*PaymentTransactionViewSet.ordering)),
+        ('pharmacy.patient_orders', Order.objects.filter(
+            patient_id=SAMPLE_ID
+        ).order_by(*OrderViewSet.ordering)),
+        ('pharmacy.orders_by_status', Order.objects.filter(
+            status='pending'
+        ).order_by(*OrderViewSet.ordering)),
+        ('prescriptions.patient_prescriptions', Prescription.objects.filter(
+            patient_id=SAMPLE_ID
+        ).order_by(*PrescriptionViewSet.ordering)),
+        ('prescriptions.doctor_prescriptions', Prescription.objects.filter(
+            doctor_id=SAMPLE_ID
+        ).order_by(*PrescriptionViewSet.ordering)),
+    ]
+
+
+def find_sequential_scans(vendor, plan):
+    """Return the tables a query plan reads with a full table scan"""
+    if vendor == 'postgresql':
+        return re.findall(r'Seq Scan on (\w+)', plan)
+    if vendor == 'sqlite':
+        # "SCAN table" reads every row, "SCAN table USING INDEX" walks an index;
+        # older versions print "SCAN TABLE table"
+        return re.findall(r'\bSCAN (?:TABLE )?(?!TABLE\b)(\w+)\b(?! USING)', plan)
+    if vendor == 'mysql':
+        tables = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if node.get('access_type') == 'ALL':
+                    tables.append(node.get('table_name'))
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        walk(json.loads(plan))
+        return tables
+    return None
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN over the canonical service queries and flag sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--disable-seqscan', action='store_true',
+                            help='PostgreSQL only: discourage sequential scans so small development '
+                                 'tables still show whether an index can serve the query')
+        parser.add_argument('--fail-on-seq-scan', action='store_true',
+                            help='Exit with an error if any query uses a sequential scan')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Print the full plan of every query')
+
+    def handle(self, *args, **options):
+        flagged = []
+        for name, queryset in canonical_queries():
+            db = router.db_for_read(queryset.model)
+            vendor = connections[db].vendor
+            try:
+                plan = self._explain(queryset, db, vendor, options['disable_seqscan'])
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"SKIP  {name} ({db}): EXPLAIN failed: {e}"))
+                continue
+
+            tables = find_sequential_scans(vendor, plan)
+            if tables is None:
+                self.stdout.write(self.style.WARNING(f"SKIP  {name} ({db}): {vendor} plans are not checked"))
+            elif tables:
+                flagged.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f"SCAN  {name} ({db}): sequential scan on {', '.join(sorted(set(tables)))}"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"OK    {name} ({db})"))
+
+            if options['verbose_plans']:
+                self.stdout.write(plan)
+
+        if flagged and options['fail_on_seq_scan']:
+            raise CommandError(f"{len(flagged)} queries use a sequential scan: {', '.join(flagged)}")
+
+    def _explain(self, queryset, db, vendor, disable_seqscan):
+        queryset = queryset.using(db)
+        if vendor == 'mysql':
+            return queryset.explain(format='json')
+        if vendor == 'postgresql' and disable_seqscan:
+            with transaction.atomic(using=db):
+                with connections[db].cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+                return queryset.explain()
+        return queryset.explain()
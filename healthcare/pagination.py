@@ -0,0 +1,43 @@
+"""
+Default pagination for the service APIs.
+
+List endpoints use keyset (cursor) pagination: each page is selected with a
+``WHERE <ordering key> < <cursor>`` condition on an indexed column instead of
+an OFFSET, so fetching page N costs the same as fetching page 1 and the
+response size is bounded by ``max_page_size`` however large the table gets.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class DefaultCursorPagination(CursorPagination):
+    """
+    Cursor pagination ordered by ``-created_at, -id`` unless the view says
+    otherwise.
+
+    A view picks its ordering key with the ``ordering`` attribute, which is
+    also the default used by ``OrderingFilter``. The key should be immutable
+    and not nullable, otherwise cursors may skip or repeat rows.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        # Views without an OrderingFilter can still declare their ordering key
+        has_ordering_filter = any(
+            hasattr(backend, 'get_ordering') for backend in getattr(view, 'filter_backends', [])
+        )
+        view_ordering = getattr(view, 'ordering', None)
+        if not has_ordering_filter and view_ordering:
+            if isinstance(view_ordering, str):
+                return (view_ordering,)
+            return tuple(view_ordering)
+        return super().get_ordering(request, queryset, view)
+
+    def _get_position_from_instance(self, instance, ordering):
+        # Follow related lookups such as ``time_slot__start_time``
+        value = instance
+        for part in ordering[0].lstrip('-').split('__'):
+            value = value[part] if isinstance(value, dict) else getattr(value, part)
+        return str(value)
@@ -0,0 +1,50 @@
+"""
+Publishing of patient summary sections.
+
+patient_service keeps one denormalized summary document per patient (see
+patient_service.models.PatientSummary). Each service owns some sections of
+it: it registers a builder per section and, from its post-save and
+post-delete signals, rebuilds the changed patient's section and sends it to
+the patient service once the transaction commits. Only that patient's
+section is rebuilt, with an indexed per-patient query.
+"""
+import json
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from healthcare.service_dispatch import ServiceCallError, call_service
+
+logger = logging.getLogger(__name__)
+
+# Section name: (builder returning the patient's entries, function listing
+# every patient ID with data for the section)
+SECTION_BUILDERS = {}
+
+
+def register_section(section, build, patient_ids):
+    SECTION_BUILDERS[section] = (build, patient_ids)
+
+
+def publish_section(patient_id, section):
+    """Rebuild a section of a patient's summary and send it to the patient service"""
+    build = SECTION_BUILDERS[section][0]
+    # Send the entries as plain JSON, whichever way the call is dispatched
+    entries = json.loads(json.dumps(build(patient_id), cls=DjangoJSONEncoder))
+    call_service('patient', 'update_summary', {'patient_id': str(patient_id), 'section': section, 'entries': entries})
+
+
+def schedule_publish(patient_id, section, using):
+    """Publish the section once the transaction on database ``using`` commits"""
+    if not patient_id:
+        return
+
+    def publish():
+        try:
+            publish_section(patient_id, section)
+        except ServiceCallError as e:
+            # The write itself succeeded; rebuild_patient_summaries repairs the summary
+            logger.error(f"Failed to update the {section} summary of patient {patient_id}: {e}")
+
+    transaction.on_commit(publish, using=using)
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+from rest_framework import permissions
+
+
+class IsInternalService(permissions.BasePermission):
+    """
+    Other services, identified by the shared internal service token that
+    service_dispatch sends with every call, or staff
+    """
+    def has_permission(self, request, view):
+        token = request.headers.get('X-Internal-Service-Token')
+        if token and settings.INTERNAL_SERVICE_SECRET_TOKEN:
+            return constant_time_compare(token, settings.INTERNAL_SERVICE_SECRET_TOKEN)
+        return bool(request.user and request.user.is_staff)
@@ -0,0 +1,233 @@
+"""
+Per-request profiling.
+
+ProfilingMiddleware measures every request: wall time, database time and
+query count per database alias (through ``connection.execute_wrapper``),
+outbound HTTP calls made with ``requests``, and the response size. It adds
+the figures as a ``Server-Timing`` header and aggregates them per view into
+in-memory histograms. MetricsAPIView serves those at ``/api/_metrics``.
+
+Metrics are kept per process; each worker reports its own.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+import requests
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+# Upper bounds, in milliseconds, of the latency histogram buckets
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """Counters of a single request, which may run queries from several threads"""
+
+    __slots__ = ('db_time', 'db_queries', 'outbound_time', 'outbound_calls', 'lock')
+
+    def __init__(self):
+        self.db_time = {}
+        self.db_queries = {}
+        self.outbound_time = 0.0
+        self.outbound_calls = 0
+        self.lock = threading.Lock()
+
+
+def record_query(execute, sql, params, many, context):
+    """``execute_wrapper`` hook adding the query time to the current request"""
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        alias = context['connection'].alias
+        with profile.lock:
+            profile.db_time[alias] = profile.db_time.get(alias, 0.0) + elapsed
+            profile.db_queries[alias] = profile.db_queries.get(alias, 0) + 1
+
+
+@contextmanager
+def instrument_connections():
+    """
+    Time the queries of this thread's connections. Connections are per
+    thread, so code running queries in other threads for the request enters
+    this there too.
+    """
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(record_query))
+        yield
+
+
+_original_send = requests.Session.send
+_patch_lock = threading.Lock()
+
+
+def _profiled_send(self, request, **kwargs):
+    profile = _current_profile.get()
+    if profile is None:
+        return _original_send(self, request, **kwargs)
+    started = time.perf_counter()
+    try:
+        return _original_send(self, request, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - started
+        with profile.lock:
+            profile.outbound_time += elapsed
+            profile.outbound_calls += 1
+
+
+def install_outbound_hook():
+    """Count every call made through ``requests``, including requests.get/post"""
+    with _patch_lock:
+        if requests.Session.send is not _profiled_send:
+            requests.Session.send = _profiled_send
+
+
+class MetricsRegistry:
+    """Thread-safe per-view aggregates of request profiles"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self.started_at = time.time()
+
+    def record(self, view, status_code, wall_time, profile, response_bytes):
+        wall_ms = wall_time * 1000
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = {
+                    'requests': 0,
+                    'errors': 0,
+                    'wall_ms_total': 0.0,
+                    'wall_ms_max': 0.0,
+                    'latency_buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                    'db': {},
+                    'outbound_calls': 0,
+                    'outbound_ms_total': 0.0,
+                    'response_bytes_total': 0,
+                }
+            stats['requests'] += 1
+            if status_code >= 500:
+                stats['errors'] += 1
+            stats['wall_ms_total'] += wall_ms
+            stats['wall_ms_max'] = max(stats['wall_ms_max'], wall_ms)
+            stats['latency_buckets'][bisect.bisect_left(LATENCY_BUCKETS_MS, wall_ms)] += 1
+            for alias, queries in profile.db_queries.items():
+                db = stats['db'].setdefault(alias, {'queries': 0, 'ms_total': 0.0})
+                db['queries'] += queries
+                db['ms_total'] += profile.db_time[alias] * 1000
+            stats['outbound_calls'] += profile.outbound_calls
+            stats['outbound_ms_total'] += profile.outbound_time * 1000
+            stats['response_bytes_total'] += response_bytes
+
+    def snapshot(self):
+        with self._lock:
+            views = {}
+            for view, stats in self._views.items():
+                count = stats['requests']
+                views[view] = {
+                    'requests': count,
+                    'errors': stats['errors'],
+                    'wall_ms_avg': round(stats['wall_ms_total'] / count, 3),
+                    'wall_ms_max': round(stats['wall_ms_max'], 3),
+                    'latency_histogram': {
+                        f"le_{bound}ms" if bound is not None else f"gt_{LATENCY_BUCKETS_MS[-1]}ms": bucket
+                        for bound, bucket in zip((*LATENCY_BUCKETS_MS, None), stats['latency_buckets'])
+                    },
+                    'db': {
+                        alias: {
+                            'queries_avg': round(db['queries'] / count, 2),
+                            'ms_avg': round(db['ms_total'] / count, 3),
+                        }
+                        for alias, db in stats['db'].items()
+                    },
+                    'outbound_calls_avg': round(stats['outbound_calls'] / count, 2),
+                    'outbound_ms_avg': round(stats['outbound_ms_total'] / count, 3),
+                    'response_bytes_avg': round(stats['response_bytes_total'] / count),
+                }
+            return {'since': self.started_at, 'views': views}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self.started_at = time.time()
+
+
+metrics = MetricsRegistry()
+
+
+def view_label(request):
+    """Name of the view, and of the viewset action, that handled the request"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name or match.func.__name__
+    actions = getattr(match.func, 'actions', None)
+    if actions:
+        return f"{view_class.__name__}.{actions.get(request.method.lower(), request.method.lower())}"
+    return f"{view_class.__name__}.{request.method.lower()}"
+
+
+class ProfilingMiddleware:
+    """Profile every request; see the module docstring"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_PROFILING_ENABLED', True)
+        if self.enabled:
+            install_outbound_hook()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            with instrument_connections():
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        wall_time = time.perf_counter() - started
+
+        response_bytes = 0 if response.streaming else len(response.content)
+        metrics.record(view_label(request), response.status_code, wall_time, profile, response_bytes)
+        response['Server-Timing'] = self.server_timing(wall_time, profile)
+        return response
+
+    @staticmethod
+    def server_timing(wall_time, profile):
+        entries = [f'total;dur={wall_time * 1000:.1f}']
+        for alias, db_time in profile.db_time.items():
+            entries.append(f'db-{alias};dur={db_time * 1000:.1f};desc="{profile.db_queries[alias]} queries"')
+        if profile.outbound_calls:
+            entries.append(f'outbound;dur={profile.outbound_time * 1000:.1f};desc="{profile.outbound_calls} calls"')
+        return ', '.join(entries)
+
+
+class MetricsAPIView(APIView):
+    """Per-view request metrics of this worker; DELETE resets them"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, format=None):
+        return Response(metrics.snapshot())
+
+    def delete(self, request, format=None):
+        metrics.reset()
+        return Response(status=204)
@@ -0,0 +1,204 @@
+"""
+HTTP client for calls between services.
+
+Every call goes through one ``requests.Session`` per target host, so
+connections are pooled and reused instead of paying TCP setup each time.
+Calls are bounded by connect and read timeouts. Failed idempotent calls are
+retried with jittered exponential backoff. A per-host circuit breaker makes
+calls fail fast while a dependency keeps failing, instead of pinning workers
+on timeouts.
+
+Errors are raised as ``requests`` exceptions, so callers handle them with
+``except requests.exceptions.RequestException`` as before.
+"""
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# Responses worth retrying: the dependency or a proxy in front of it is
+# overloaded or restarting
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without calling a host whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    fail immediately. Once ``reset_timeout`` seconds have passed, a single
+    trial call is let through; its success closes the circuit again and its
+    failure keeps it open for another ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        """Whether a call may go ahead now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class ServiceClient:
+    """Pooled, timeout-bounded HTTP client with retries and circuit breakers"""
+
+    def __init__(self, connect_timeout=None, read_timeout=None, max_retries=None, backoff_base=None,
+                 backoff_max=None, pool_size=None, failure_threshold=None, reset_timeout=None):
+        def setting(value, name):
+            return value if value is not None else getattr(settings, name)
+
+        self.timeout = (
+            setting(connect_timeout, 'SERVICE_CLIENT_CONNECT_TIMEOUT'),
+            setting(read_timeout, 'SERVICE_CLIENT_READ_TIMEOUT'),
+        )
+        self.max_retries = setting(max_retries, 'SERVICE_CLIENT_MAX_RETRIES')
+        self.backoff_base = setting(backoff_base, 'SERVICE_CLIENT_BACKOFF_BASE')
+        self.backoff_max = setting(backoff_max, 'SERVICE_CLIENT_BACKOFF_MAX')
+        self.pool_size = setting(pool_size, 'SERVICE_CLIENT_POOL_SIZE')
+        self.failure_threshold = setting(failure_threshold, 'SERVICE_CLIENT_FAILURE_THRESHOLD')
+        self.reset_timeout = setting(reset_timeout, 'SERVICE_CLIENT_RESET_TIMEOUT')
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._breakers = {}
+
+    def _host(self, url):
+        parts = urlsplit(url)
+        return f'{parts.scheme}://{parts.netloc}'
+
+    def session(self, host):
+        """The pooled session used for ``host``"""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                # Retries are handled here, where they can be counted by the breaker
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount(host, adapter)
+                self._sessions[host] = session
+            return session
+
+    def breaker(self, host):
+        """The circuit breaker of ``host``"""
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number ``attempt``, with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def request(self, method, url, idempotent=None, **kwargs):
+        """
+        Send a request and return the response.
+
+        ``idempotent`` defaults to whether the method is; pass ``True`` for
+        read-only POST lookups so they are retried too. Calls that are not
+        idempotent are only retried when the connection could not be set up,
+        which guarantees the request was not sent.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault('timeout', self.timeout)
+        host = self._host(url)
+        session = self.session(host)
+        breaker = self.breaker(host)
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f'{host} is unavailable: too many recent failures')
+            try:
+                response = session.request(method, url, **kwargs)
+            except requests.exceptions.ConnectTimeout:
+                breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                breaker.record_failure()
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+            except Exception:
+                # Any other error, such as a broken chunked response or a
+                # redirect loop, is not retried but still ends a trial call
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code < 500:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if not (idempotent and response.status_code in RETRY_STATUSES) or attempt >= self.max_retries:
+                    return response
+                response.close()
+
+            delay = self.backoff(attempt)
+            attempt += 1
+            logger.warning(f"Retrying {method} {url} in {delay:.2f}s (attempt {attempt} of {self.max_retries})")
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+
+service_client = ServiceClient()
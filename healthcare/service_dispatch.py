@@ -0,0 +1,152 @@
+"""
+Dispatch of calls between services.
+
+Services call each other by logical name and endpoint, e.g.
+``call_service('patient', 'create', data)``. ``settings.SERVICES`` says, per
+service, whether the call goes through HTTP or straight to the Python code of
+an app installed in this process:
+
+    'local'  always call the app directly
+    'http'   always call the service URL
+    'auto'   call directly when the app is installed here, HTTP otherwise
+
+Direct calls skip JSON encoding, a second request cycle and a worker slot.
+With a fixed-size worker pool, that also rules out the deadlock where every
+worker waits on a loopback call that no free worker can serve.
+"""
+import requests
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+
+from healthcare.service_client import service_client
+
+DISPATCH_MODES = ('auto', 'local', 'http')
+
+
+class ServiceCallError(Exception):
+    """A call to another service failed. ``detail`` holds its error response."""
+
+    def __init__(self, service, endpoint, status_code, detail):
+        super().__init__(f"{service}.{endpoint} failed ({status_code}): {detail}")
+        self.service = service
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.detail = detail
+
+
+class Endpoint:
+    """
+    A service endpoint: its HTTP method and path, and the function serving it
+    in process, or its dotted path. The function takes the request data and
+    returns what the HTTP endpoint would return as JSON.
+    """
+
+    def __init__(self, method, path, handler, idempotent=None):
+        self.method = method
+        self.path = path
+        self.handler = handler
+        self.idempotent = idempotent
+
+
+def create_with_serializer(serializer_path):
+    """In-process handler that validates and saves the data like a CreateAPIView"""
+    def handler(data):
+        serializer = import_string(serializer_path)(data=data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return serializer.data
+    return handler
+
+
+ENDPOINTS = {
+    'auth': {
+        # A read-only lookup, safe to retry
+        'users': Endpoint('POST', '/api/auth/internal/users/', 'healthcare.user_enrichment.fetch_users_local',
+                          idempotent=True),
+    },
+    'doctor': {
+        'create': Endpoint('POST', '/api/doctors/create/',
+                           create_with_serializer('doctor_service.serializers.DoctorSerializer')),
+    },
+    'nurse': {
+        'create': Endpoint('POST', '/api/nurses/create/',
+                           create_with_serializer('nurse_service.serializers.NurseSerializer')),
+    },
+    'patient': {
+        'create': Endpoint('POST', '/api/patients/create/',
+                           create_with_serializer('patient_service.serializers.PatientSerializer')),
+        # Replaces a whole section, so repeating it is harmless
+        'update_summary': Endpoint('POST', '/api/patients/summary-sections/',
+                                   'patient_service.summary.store_summary_section', idempotent=True),
+    },
+}
+
+
+def _plain(detail):
+    """Validation error detail as the plain JSON data the HTTP endpoint returns"""
+    if isinstance(detail, dict):
+        return {key: _plain(value) for key, value in detail.items()}
+    if isinstance(detail, list):
+        return [_plain(value) for value in detail]
+    return str(detail)
+
+
+def service_config(service):
+    try:
+        return settings.SERVICES[service]
+    except KeyError:
+        raise ImproperlyConfigured(f"Service '{service}' is not configured in settings.SERVICES")
+
+
+def is_local(service, mode=None):
+    """Whether calls to ``service`` are served in this process"""
+    config = service_config(service)
+    mode = mode or config.get('dispatch', 'auto')
+    if mode not in DISPATCH_MODES:
+        raise ImproperlyConfigured(f"Unknown dispatch mode '{mode}' for service '{service}'")
+    if mode == 'http':
+        return False
+    installed = apps.is_installed(config['app'])
+    if mode == 'local' and not installed:
+        raise ImproperlyConfigured(f"Service '{service}' is set to local dispatch but {config['app']} is not installed")
+    return installed
+
+
+def call_service(service, endpoint, data=None, mode=None):
+    """
+    Call ``endpoint`` of ``service`` with ``data`` and return its JSON result.
+    ``mode`` overrides the configured dispatch mode. Raises ServiceCallError.
+    """
+    try:
+        target = ENDPOINTS[service][endpoint]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown service endpoint {service}.{endpoint}")
+
+    if is_local(service, mode):
+        handler = target.handler
+        if isinstance(handler, str):
+            handler = import_string(handler)
+        try:
+            return handler(data)
+        except ValidationError as e:
+            raise ServiceCallError(service, endpoint, 400, _plain(e.detail)) from e
+
+    url = f"{service_config(service)['url']}{target.path}"
+    headers = {}
+    if settings.INTERNAL_SERVICE_SECRET_TOKEN:
+        headers['X-Internal-Service-Token'] = settings.INTERNAL_SERVICE_SECRET_TOKEN
+    try:
+        response = service_client.request(target.method, url, json=data, headers=headers,
+                                          idempotent=target.idempotent)
+    except requests.exceptions.RequestException as e:
+        raise ServiceCallError(service, endpoint, 503, str(e)) from e
+    if not response.ok:
+        try:
+            detail = response.json()
+        except ValueError:
+            detail = response.text
+        raise ServiceCallError(service, endpoint, response.status_code, detail)
+    return response.json()
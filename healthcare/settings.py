@@ -39,6 +39,9 @@ INSTALLED_APPS = [
     "rest_framework",
     "django_filters",
 
+    # Shared service infrastructure and its cross-service management commands
+    "healthcare",
+
     # All Services
     "auth_service",
     "doctor_service",
@@ -68,6 +71,8 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'healthcare.pagination.DefaultCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
 from datetime import timedelta
@@ -86,6 +91,7 @@ SIMPLE_JWT = {
 AUTH_USER_MODEL = 'auth_service.User'
 
 MIDDLEWARE = [
+    "healthcare.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -277,5 +283,101 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Shared secret for internal service-to-service communication
 # IMPORTANT: Change this key to a strong, unique value and keep it secret!
+# Sent in the X-Internal-Service-Token header of every call dispatched over
+# HTTP; internal endpoints reject calls without it (empty allows staff only)
+INTERNAL_SERVICE_SECRET_TOKEN = os.environ.get('INTERNAL_SERVICE_SECRET_TOKEN', '')
+
+# Base URL of the auth service, used for user lookups when auth_service is not
+# installed in the same process as the calling service
+AUTH_SERVICE_URL = os.environ.get('AUTH_SERVICE_URL', 'http://localhost:8000')
+
+# How calls between services are dispatched (see healthcare/service_dispatch.py):
+# 'local' calls the app in this process, 'http' calls its URL, and 'auto'
+# calls locally when the app is installed here
+SERVICES = {
+    'auth': {
+        'app': 'auth_service',
+        'url': AUTH_SERVICE_URL,
+        'dispatch': os.environ.get('AUTH_SERVICE_DISPATCH', 'auto'),
+    },
+    'doctor': {
+        'app': 'doctor_service',
+        'url': os.environ.get('DOCTOR_SERVICE_URL', 'http://localhost:8000'),
+        'dispatch': os.environ.get('DOCTOR_SERVICE_DISPATCH', 'auto'),
+    },
+    'nurse': {
+        'app': 'nurse_service',
+        'url': os.environ.get('NURSE_SERVICE_URL', 'http://localhost:8000'),
+        'dispatch': os.environ.get('NURSE_SERVICE_DISPATCH', 'auto'),
+    },
+    'patient': {
+        'app': 'patient_service',
+        'url': os.environ.get('PATIENT_SERVICE_URL', 'http://localhost:8000'),
+        'dispatch': os.environ.get('PATIENT_SERVICE_DISPATCH', 'auto'),
+    },
+    'appointment': {
+        'app': 'appointment_service',
+        'url': os.environ.get('APPOINTMENT_SERVICE_URL', 'http://localhost:8000'),
+        'dispatch': os.environ.get('APPOINTMENT_SERVICE_DISPATCH', 'auto'),
+    },
+    'prescription': {
+        'app': 'prescription_service',
+        'url': os.environ.get('PRESCRIPTION_SERVICE_URL', 'http://localhost:8000'),
+        'dispatch': os.environ.get('PRESCRIPTION_SERVICE_DISPATCH', 'auto'),
+    },
+    'medical_record': {
+        'app': 'medical_record_service',
+        'url': os.environ.get('MEDICAL_RECORD_SERVICE_URL', 'http://localhost:8000'),
+        'dispatch': os.environ.get('MEDICAL_RECORD_SERVICE_DISPATCH', 'auto'),
+    },
+    'laboratory': {
+        'app': 'laboratory_service',
+        'url': os.environ.get('LABORATORY_SERVICE_URL', 'http://localhost:8000'),
+        'dispatch': os.environ.get('LABORATORY_SERVICE_DISPATCH', 'auto'),
+    },
+}
 
+# Seconds each service call of an aggregated response may take before the
+# response is returned without that part
+AGGREGATION_CALL_TIMEOUT = float(os.environ.get('AGGREGATION_CALL_TIMEOUT', 3))
+# Threads running those calls, shared by all requests of a process
+AGGREGATION_MAX_WORKERS = int(os.environ.get('AGGREGATION_MAX_WORKERS', 32))
+
+# Chatbot answer cache: maximum number of cached queries and their time to
+# live in seconds (0 keeps answers until they are evicted)
+CHATBOT_ANSWER_CACHE_SIZE = int(os.environ.get('CHATBOT_ANSWER_CACHE_SIZE', 10000))
+CHATBOT_ANSWER_CACHE_TTL = int(os.environ.get('CHATBOT_ANSWER_CACHE_TTL', 3600))
+
+# Seconds between checks for a newly published chatbot model (0 disables them)
+CHATBOT_MODEL_CHECK_INTERVAL = int(os.environ.get('CHATBOT_MODEL_CHECK_INTERVAL', 5))
+
+# Cache shared by every process of every service, so that an entry cleared
+# by one process is gone for all. The database cache needs
+# `python manage.py createcachetable`; set CACHE_BACKEND and CACHE_LOCATION
+# to use Memcached or Redis instead.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'django_cache'),
+    }
+}
 
+# Seconds the doctor dashboard counters are cached; appointment and medical
+# record changes invalidate them earlier, other writes are picked up on expiry
+DOCTOR_DASHBOARD_CACHE_TTL = int(os.environ.get('DOCTOR_DASHBOARD_CACHE_TTL', 60))
+
+# Inter-service HTTP client: timeouts in seconds, retries of idempotent
+# calls, connections kept per host, and the circuit breaker that fails calls
+# fast after consecutive failures until the reset timeout has passed
+SERVICE_CLIENT_CONNECT_TIMEOUT = float(os.environ.get('SERVICE_CLIENT_CONNECT_TIMEOUT', 2))
+SERVICE_CLIENT_READ_TIMEOUT = float(os.environ.get('SERVICE_CLIENT_READ_TIMEOUT', 10))
+SERVICE_CLIENT_MAX_RETRIES = int(os.environ.get('SERVICE_CLIENT_MAX_RETRIES', 2))
+SERVICE_CLIENT_BACKOFF_BASE = float(os.environ.get('SERVICE_CLIENT_BACKOFF_BASE', 0.1))
+SERVICE_CLIENT_BACKOFF_MAX = float(os.environ.get('SERVICE_CLIENT_BACKOFF_MAX', 2))
+SERVICE_CLIENT_POOL_SIZE = int(os.environ.get('SERVICE_CLIENT_POOL_SIZE', 20))
+SERVICE_CLIENT_FAILURE_THRESHOLD = int(os.environ.get('SERVICE_CLIENT_FAILURE_THRESHOLD', 5))
+SERVICE_CLIENT_RESET_TIMEOUT = float(os.environ.get('SERVICE_CLIENT_RESET_TIMEOUT', 30))
+
+# Per-request timing and query counts, reported in Server-Timing headers and
+# at /api/_metrics
+REQUEST_PROFILING_ENABLED = os.environ.get('REQUEST_PROFILING_ENABLED', 'true').lower() == 'true'
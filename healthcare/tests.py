@@ -0,0 +1,153 @@
+import json
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from .management.commands.explain_queries import find_sequential_scans
+from .service_client import CircuitBreaker, CircuitOpenError, ServiceClient
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('healthcare.service_client.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    def open_breaker(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_lets_a_single_trial_through_after_the_reset_timeout(self):
+        self.open_breaker()
+        self.now += 30
+        self.assertEqual(self.breaker.state, 'half-open')
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+    def test_successful_trial_closes_the_circuit(self):
+        self.open_breaker()
+        self.now += 30
+        self.breaker.allow()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_trial_reopens_the_circuit(self):
+        self.open_breaker()
+        self.now += 30
+        self.breaker.allow()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'open')
+        self.now += 30
+        self.assertTrue(self.breaker.allow())
+
+
+class ServiceClientTests(SimpleTestCase):
+    url = 'http://service.test/api/'
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('healthcare.service_client.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = ServiceClient(max_retries=0, failure_threshold=1, reset_timeout=30)
+        self.session = self.client.session('http://service.test')
+
+    def test_unexpected_request_error_ends_the_trial(self):
+        breaker = self.client.breaker('http://service.test')
+        breaker.record_failure()
+        self.now += 30
+
+        with mock.patch.object(self.session, 'request', side_effect=requests.exceptions.ChunkedEncodingError):
+            with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+                self.client.get(self.url)
+        self.assertEqual(breaker.state, 'open')
+
+        # The next trial is let through once the reset timeout has passed again
+        self.now += 30
+        response = mock.Mock(status_code=200)
+        with mock.patch.object(self.session, 'request', return_value=response):
+            self.assertIs(self.client.get(self.url), response)
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_open_circuit_fails_without_calling(self):
+        with mock.patch.object(self.session, 'request', side_effect=requests.exceptions.ConnectionError):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                self.client.get(self.url)
+        with mock.patch.object(self.session, 'request') as request:
+            with self.assertRaises(CircuitOpenError):
+                self.client.get(self.url)
+        request.assert_not_called()
+
+    def test_idempotent_calls_are_retried_on_server_errors(self):
+        client = ServiceClient(max_retries=2, backoff_base=0, failure_threshold=5)
+        session = client.session('http://service.test')
+        responses = [mock.Mock(status_code=503), mock.Mock(status_code=503), mock.Mock(status_code=200)]
+        with mock.patch.object(session, 'request', side_effect=responses) as request:
+            self.assertEqual(client.get(self.url).status_code, 200)
+            self.assertEqual(request.call_count, 3)
+        with mock.patch.object(session, 'request', return_value=mock.Mock(status_code=503)) as request:
+            self.assertEqual(client.post(self.url).status_code, 503)
+            self.assertEqual(request.call_count, 1)
+
+
+class FindSequentialScansTests(SimpleTestCase):
+    def test_postgresql(self):
+        plan = (
+            'Limit  (cost=0.29..8.31 rows=1 width=64)\n'
+            '  ->  Nested Loop  (cost=0.29..8.31 rows=1 width=64)\n'
+            '        ->  Seq Scan on lab_orders  (cost=0.00..1.01 rows=1 width=32)\n'
+            '              Filter: ((patient_id)::text = \'EXPLAIN-0000\'::text)\n'
+            '        ->  Index Scan using laboratories_pkey on laboratories  (cost=0.29..7.30 rows=1 width=32)\n'
+            '  ->  Parallel Seq Scan on lab_order_tests  (cost=0.00..2.00 rows=1 width=32)'
+        )
+        self.assertEqual(find_sequential_scans('postgresql', plan), ['lab_orders', 'lab_order_tests'])
+        self.assertEqual(find_sequential_scans(
+            'postgresql', 'Index Only Scan using lab_orders_patient_idx on lab_orders  (cost=0.15..8.17 rows=1)'
+        ), [])
+
+    def test_sqlite(self):
+        self.assertEqual(find_sequential_scans('sqlite', '2 0 0 SCAN t'), ['t'])
+        self.assertEqual(find_sequential_scans('sqlite', '2 0 0 SCAN t USING INDEX t_a_idx'), [])
+        self.assertEqual(find_sequential_scans('sqlite', '3 0 0 SCAN t USING COVERING INDEX t_a_idx'), [])
+        self.assertEqual(find_sequential_scans('sqlite', '2 0 0 SEARCH t USING INDEX t_a_idx (a=?)'), [])
+        plan = (
+            '3 0 0 SCAN lab_orders\n'
+            '5 0 0 SEARCH laboratories USING INTEGER PRIMARY KEY (rowid=?)\n'
+            '7 0 0 SCAN lab_order_tests USING INDEX lab_order_tests_order_idx\n'
+            '9 0 0 SCAN TABLE test_results\n'
+            '11 0 0 SCAN TABLE lab_tests USING INDEX lab_tests_category_idx'
+        )
+        self.assertEqual(find_sequential_scans('sqlite', plan), ['lab_orders', 'test_results'])
+
+    def test_mysql(self):
+        plan = {'query_block': {'select_id': 1, 'nested_loop': [
+            {'table': {'table_name': 'lab_orders', 'access_type': 'ALL', 'rows_examined_per_scan': 100}},
+            {'table': {'table_name': 'laboratories', 'access_type': 'eq_ref', 'key': 'PRIMARY'}},
+            {'table': {'table_name': 'lab_order_tests', 'access_type': 'ref', 'key': 'order_id'}},
+        ], 'ordering_operation': {'table': {'table_name': 'test_results', 'access_type': 'ALL'}}}}
+        self.assertEqual(find_sequential_scans('mysql', json.dumps(plan)), ['lab_orders', 'test_results'])
+        self.assertEqual(find_sequential_scans('mysql', json.dumps(
+            {'query_block': {'table': {'table_name': 'lab_orders', 'access_type': 'range', 'key': 'status_idx'}}}
+        )), [])
+
+    def test_unknown_vendor(self):
+        self.assertIsNone(find_sequential_scans('oracle', 'TABLE ACCESS FULL LAB_ORDERS'))
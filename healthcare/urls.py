@@ -18,6 +18,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from healthcare.profiling import MetricsAPIView
+
 urlpatterns = [
     path("", include("template_service.urls")),  # Main application
     path("admin/", admin.site.urls),
@@ -57,4 +59,6 @@ urlpatterns = [
     path("api/laboratory/", include("laboratory_service.urls")),
     # Chatbot Service
     path("", include("chatbot_service.urls")),
+    # Request metrics collected by the profiling middleware
+    path("api/_metrics", MetricsAPIView.as_view(), name="request-metrics"),
 ]
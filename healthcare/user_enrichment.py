@@ -0,0 +1,89 @@
+"""
+Batched user-profile enrichment for service list endpoints.
+
+Staff and patient records only store a ``user_id``; the username, email and
+names live in auth_service. Instead of one lookup per row, the helpers here
+collect every user ID on a page and resolve them with a single bulk lookup.
+"""
+import logging
+
+from healthcare.service_dispatch import call_service, is_local
+
+logger = logging.getLogger(__name__)
+
+# User fields merged into service records
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name')
+USER_CONTACT_FIELDS = USER_FIELDS + ('phone_number',)
+
+# IDs sent per call to the auth service bulk endpoint
+REMOTE_CHUNK_SIZE = 1000
+
+
+def fetch_users_local(user_ids):
+    """Look the users and their primary names up with a single ORM query"""
+    from auth_service.models import User, annotate_primary_name
+
+    users = annotate_primary_name(User.objects.filter(id__in=user_ids)).values(
+        'id', 'username', 'email', 'primary_first_name', 'primary_last_name', 'phone_number', 'role'
+    )
+    return {
+        user['id']: {
+            'username': user['username'],
+            'email': user['email'],
+            'first_name': user['primary_first_name'],
+            'last_name': user['primary_last_name'],
+            'phone_number': user['phone_number'],
+            'role': user['role'],
+        }
+        for user in users
+    }
+
+
+def fetch_users(user_ids):
+    """
+    Resolve user IDs to user detail dicts keyed by ID.
+
+    The lookup is dispatched to auth_service: a single ORM query when it runs
+    in this process, one bulk endpoint call per chunk of IDs otherwise.
+    Unknown IDs are left out.
+    """
+    user_ids = sorted({int(user_id) for user_id in user_ids if user_id})
+    if not user_ids:
+        return {}
+    if is_local('auth'):
+        return fetch_users_local(user_ids)
+
+    result = {}
+    for i in range(0, len(user_ids), REMOTE_CHUNK_SIZE):
+        users = call_service('auth', 'users', user_ids[i:i + REMOTE_CHUNK_SIZE])
+        result.update({int(user_id): user_data for user_id, user_data in users.items()})
+    return result
+
+
+def attach_user_details(rows, user_ids, fields=USER_FIELDS):
+    """
+    Merge user details into serialized ``rows``, which are paired one-to-one
+    with ``user_ids``. All IDs are resolved with a single lookup.
+
+    Rows without a user get ``None`` values; rows whose user could not be
+    resolved get ``'N/A'``.
+    """
+    user_ids = list(user_ids)
+    try:
+        users = fetch_users(user_ids)
+    except Exception as e:
+        # Handle case when auth service is unavailable
+        logger.error(f"Failed to fetch user details: {e}")
+        users = {}
+
+    for row, user_id in zip(rows, user_ids):
+        if not user_id:
+            # No user associated with this record
+            for field in fields:
+                row[field] = None
+            continue
+
+        user_data = users.get(int(user_id))
+        for field in fields:
+            row[field] = user_data.get(field) if user_data else 'N/A'
+    return rows
@@ -1,7 +1,7 @@
 from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-import requests
+from healthcare.user_enrichment import attach_user_details
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import InsuranceProvider
@@ -15,73 +15,24 @@ class InsuranceProviderViewSet(viewsets.ModelViewSet):
     filterset_fields = ['is_active']
     search_fields = ['company_name', 'provider_id_number']
     ordering_fields = ['company_name', 'created_at']
+    ordering = ['-created_at', '-id']
     
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        data = []
-        for provider in queryset:
-            provider_data = InsuranceProviderSerializer(provider).data
-            
-            # Only fetch user data if there's a user_id
-            if provider.user_id:
-                try:
-                    # Fetch user details from auth service
-                    auth_service_url = f'http://localhost:8000/api/auth/internal/user/{provider.user_id}/'
-                    response = requests.get(auth_service_url)
-                    response.raise_for_status()
-                    user_data = response.json()
-                    
-                    # Add user data to the provider data
-                    provider_data['username'] = user_data.get('username')
-                    provider_data['email'] = user_data.get('email')
-                    provider_data['first_name'] = user_data.get('first_name')
-                    provider_data['last_name'] = user_data.get('last_name')
-                except Exception as e:
-                    # Handle case when auth service is unavailable
-                    provider_data['username'] = 'N/A'
-                    provider_data['email'] = 'N/A'
-                    provider_data['first_name'] = 'N/A'
-                    provider_data['last_name'] = 'N/A'
-            else:
-                # No user associated with this provider
-                provider_data['username'] = None
-                provider_data['email'] = None
-                provider_data['first_name'] = None
-                provider_data['last_name'] = None
-                
-            data.append(provider_data)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        providers = page if page is not None else list(queryset)
+
+        # Resolve user details for every provider on the page in one lookup
+        data = self.get_serializer(providers, many=True).data
+        attach_user_details(data, [provider.user_id for provider in providers])
+
+        if page is not None:
+            return self.get_paginated_response(data)
         return Response(data)
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
         data = serializer.data
-        
-        # Only fetch user data if there's a user_id
-        if instance.user_id:
-            try:
-                # Fetch user details from auth service
-                auth_service_url = f'http://localhost:8000/api/auth/internal/user/{instance.user_id}/'
-                response = requests.get(auth_service_url)
-                response.raise_for_status()
-                user_data = response.json()
-                
-                # Add user data to the response
-                data['username'] = user_data.get('username')
-                data['email'] = user_data.get('email')
-                data['first_name'] = user_data.get('first_name')
-                data['last_name'] = user_data.get('last_name')
-            except Exception as e:
-                # Handle case when auth service is unavailable
-                data['username'] = 'N/A'
-                data['email'] = 'N/A'
-                data['first_name'] = 'N/A'
-                data['last_name'] = 'N/A'
-        else:
-            # No user associated with this provider
-            data['username'] = None
-            data['email'] = None
-            data['first_name'] = None
-            data['last_name'] = None
-            
+        attach_user_details([data], [instance.user_id])
         return Response(data)
@@ -32,6 +32,7 @@ class PatientPolicyViewSet(viewsets.ModelViewSet):
     filterset_fields = ['patient_id', 'insurance_provider_company_id', 'status', 'expiration_date']
     search_fields = ['patient_id', 'policy_number', 'insurance_provider_company_id']
     ordering_fields = ['patient_id', 'effective_date', 'expiration_date', 'updated_at']
+    ordering = ['-created_at', '-id']
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -79,6 +80,7 @@ class InsuranceClaimViewSet(viewsets.ModelViewSet):
     }
     search_fields = ['policy__policy_number', 'insurer_claim_reference_id', 'payment_transaction_id', 'policy__patient_id']
     ordering_fields = ['claim_submission_date', 'service_date_start', 'status', 'last_updated_at']
+    ordering = ['-claim_submission_date', '-id']
 
     def get_permissions(self):
         if self.action in ['initiate_claim_internal', 'update_claim_adjudication_internal']:
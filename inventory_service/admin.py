@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import InventoryItem
+from .models import InventoryItem, ReorderSuggestion, StockAlert, StockMovement, StockSnapshot
 
 @admin.register(InventoryItem)
 class InventoryItemAdmin(admin.ModelAdmin):
@@ -24,3 +24,30 @@ class InventoryItemAdmin(admin.ModelAdmin):
             'fields': ('notes', ('created_at', 'updated_at'))
         }),
     )
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ('inventory_item', 'movement_type', 'delta', 'reason', 'performed_by', 'created_at')
+    list_filter = ('movement_type', 'created_at')
+    search_fields = ('inventory_item__item_name', 'inventory_item__item_id', 'reason', 'reference')
+    readonly_fields = [field.name for field in StockMovement._meta.fields]
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('inventory_item', 'quantity', 'last_movement_id', 'taken_at')
+    readonly_fields = [field.name for field in StockSnapshot._meta.fields]
+
+
+@admin.register(StockAlert)
+class StockAlertAdmin(admin.ModelAdmin):
+    list_display = ('inventory_item', 'alert_type', 'severity', 'quantity', 'reorder_level', 'expiration_date', 'updated_at')
+    list_filter = ('alert_type', 'severity')
+    readonly_fields = [field.name for field in StockAlert._meta.fields]
+
+
+@admin.register(ReorderSuggestion)
+class ReorderSuggestionAdmin(admin.ModelAdmin):
+    list_display = ('inventory_item', 'daily_consumption', 'reorder_point', 'order_up_to_level', 'days_of_cover', 'created_at')
+    readonly_fields = [field.name for field in ReorderSuggestion._meta.fields]
@@ -0,0 +1,122 @@
+"""
+Consumption forecasting and reorder points for inventory items.
+
+Daily dispensed quantities are read from the stock ledger into a dense
+(items x days) matrix. Every item is then smoothed at once. Simple exponential
+smoothing has a closed form: the smoothed level after the last day is a
+weighted sum of the daily values, with weights decaying by (1 - alpha) per
+day. That makes the whole computation a couple of matrix-vector products,
+with no loop over items.
+
+From the smoothed daily consumption ``d`` and its spread ``s``:
+
+    safety stock  = z * s * sqrt(lead time)
+    reorder point = d * lead time + safety stock
+    order-up-to   = d * (lead time + review period) + safety stock
+
+An item needs reordering once its quantity falls to the reorder point, and the
+suggested order tops it up to the order-up-to level.
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import InventoryItem, StockMovement
+
+DEFAULT_WINDOW_DAYS = 90
+DEFAULT_ALPHA = 0.3
+DEFAULT_LEAD_TIME_DAYS = 7
+DEFAULT_REVIEW_DAYS = 14
+DEFAULT_SERVICE_Z = 1.65  # About a 95% chance of not running out during the lead time
+
+
+def smoothing_weights(num_days, alpha):
+    """Weights that turn a daily series into its exponentially smoothed last value"""
+    weights = alpha * (1 - alpha) ** np.arange(num_days - 1, -1, -1, dtype=np.float64)
+    # The series starts from its first observation rather than from zero
+    weights[0] = (1 - alpha) ** (num_days - 1)
+    return weights
+
+
+def smooth(consumption, alpha=DEFAULT_ALPHA):
+    """
+    Exponentially smoothed daily level and standard deviation of every row of
+    an (items x days) consumption matrix
+    """
+    weights = smoothing_weights(consumption.shape[1], alpha)
+    level = consumption @ weights
+    # The weights sum to one, so this is the weighted variance around the level;
+    # unlike E[x^2] - E[x]^2 it does not leave rounding noise on steady series
+    variance = ((consumption - level[:, np.newaxis]) ** 2) @ weights
+    return level, np.sqrt(variance)
+
+
+def reorder_points(level, spread, lead_time_days=DEFAULT_LEAD_TIME_DAYS, review_days=DEFAULT_REVIEW_DAYS,
+                   service_z=DEFAULT_SERVICE_Z):
+    """Reorder points and order-up-to levels for arrays of daily levels and spreads"""
+    safety_stock = service_z * spread * np.sqrt(lead_time_days)
+    reorder_point = np.ceil(level * lead_time_days + safety_stock)
+    order_up_to = np.ceil(level * (lead_time_days + review_days) + safety_stock)
+    return reorder_point.astype(np.int64), order_up_to.astype(np.int64)
+
+
+def load_consumption(item_ids, window_days=DEFAULT_WINDOW_DAYS, end_date=None):
+    """
+    Dense (items x days) matrix of the quantities dispensed from each item on
+    each of the last ``window_days`` days, rows following ``item_ids`` (sorted)
+    """
+    end_date = end_date or timezone.localdate()
+    start = timezone.make_aware(datetime.combine(end_date - timedelta(days=window_days - 1), time.min))
+    consumption = np.zeros((len(item_ids), window_days), dtype=np.float64)
+    if not len(item_ids):
+        return consumption
+
+    dispensed = StockMovement.objects.filter(movement_type='dispense', inventory_item__isnull=False).order_by()
+    for day in range(window_days):
+        # One grouped query per day: no date function is needed in the
+        # query, which not every inventory database backend supports
+        day_start = start + timedelta(days=day)
+        rows = list(
+            dispensed
+            .filter(created_at__gte=day_start, created_at__lt=day_start + timedelta(days=1))
+            .values_list('inventory_item')
+            .annotate(total=Sum('delta'))
+        )
+        if not rows:
+            continue
+        movement_items, totals = (np.asarray(column) for column in zip(*rows))
+        rows_index = np.searchsorted(item_ids, movement_items)
+        known = (rows_index < len(item_ids)) & (item_ids[np.minimum(rows_index, len(item_ids) - 1)] == movement_items)
+        # Dispensed deltas are negative
+        consumption[rows_index[known], day] = -totals[known].astype(np.float64)
+    return consumption
+
+
+def forecast(window_days=DEFAULT_WINDOW_DAYS, alpha=DEFAULT_ALPHA, lead_time_days=DEFAULT_LEAD_TIME_DAYS,
+             review_days=DEFAULT_REVIEW_DAYS, service_z=DEFAULT_SERVICE_Z, end_date=None):
+    """
+    Forecast every inventory item. Returns a dict of equally long arrays:
+    item ids, current quantities, smoothed daily consumption, its standard
+    deviation, reorder points, order-up-to levels and days of cover.
+    """
+    items = np.asarray(list(InventoryItem.objects.order_by('pk').values_list('pk', 'quantity')), dtype=np.int64)
+    items = items.reshape(-1, 2)
+    item_ids, quantities = items[:, 0], items[:, 1]
+
+    consumption = load_consumption(item_ids, window_days, end_date)
+    level, spread = smooth(consumption, alpha)
+    reorder_point, order_up_to = reorder_points(level, spread, lead_time_days, review_days, service_z)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_cover = np.where(level > 0, quantities / level, np.inf)
+
+    return {
+        'item_ids': item_ids,
+        'quantities': quantities,
+        'daily_consumption': level,
+        'consumption_std': spread,
+        'reorder_points': reorder_point,
+        'order_up_to': order_up_to,
+        'days_of_cover': days_of_cover,
+    }
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from inventory_service.models import StockSnapshot
+
+
+class Command(BaseCommand):
+    help = 'Snapshot the quantity of every inventory item that moved since its last snapshot (run periodically)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--settle-seconds', type=int, default=60,
+                            help='Leave movements younger than this for the next run (default: 60)')
+
+    def handle(self, *args, **options):
+        created = StockSnapshot.take(settle_seconds=options['settle_seconds'])
+        self.stdout.write(self.style.SUCCESS(f'Created {created} stock snapshots'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from inventory_service.models import InventoryItem, StockAlert
+
+
+class Command(BaseCommand):
+    help = 'Re-evaluate the stock alerts of every inventory item (run nightly to pick up expiry dates crossing a threshold)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Number of items evaluated per batch (default: 1000)')
+
+    def handle(self, *args, **options):
+        chunk = []
+        evaluated = 0
+        for item in InventoryItem.objects.order_by('pk').iterator(chunk_size=options['chunk_size']):
+            chunk.append(item)
+            if len(chunk) >= options['chunk_size']:
+                StockAlert.sync(chunk)
+                evaluated += len(chunk)
+                chunk = []
+        StockAlert.sync(chunk)
+        evaluated += len(chunk)
+
+        counts = {
+            alert_type: StockAlert.objects.filter(alert_type=alert_type).count()
+            for alert_type, _ in StockAlert.ALERT_TYPE_CHOICES
+        }
+        self.stdout.write(self.style.SUCCESS(
+            f"Evaluated {evaluated} items: {counts[StockAlert.LOW_STOCK]} low stock and "
+            f"{counts[StockAlert.EXPIRY]} expiry alerts"
+        ))
@@ -0,0 +1,79 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def record_opening_balances(apps, schema_editor):
+    """Start the ledger of every existing item with its current quantity"""
+    InventoryItem = apps.get_model('inventory_service', 'InventoryItem')
+    StockMovement = apps.get_model('inventory_service', 'StockMovement')
+    db_alias = schema_editor.connection.alias
+    StockMovement.objects.using(db_alias).bulk_create([
+        StockMovement(
+            inventory_item_id=pk,
+            movement_type='opening',
+            delta=quantity,
+            reason='Balance when the stock ledger was introduced'
+        )
+        for pk, quantity in InventoryItem.objects.using(db_alias).values_list('pk', 'quantity').iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField()),
+                ('last_movement_id', models.BigIntegerField()),
+                ('taken_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inventory_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='inventory_service.inventoryitem')),
+            ],
+            options={
+                'verbose_name': 'Stock Snapshot',
+                'verbose_name_plural': 'Stock Snapshots',
+                'db_table': 'stock_snapshots',
+                'ordering': ['-taken_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('movement_type', models.CharField(choices=[('opening', 'Opening Balance'), ('receive', 'Receive'), ('dispense', 'Dispense'), ('transfer_in', 'Transfer In'), ('transfer_out', 'Transfer Out'), ('relocation', 'Relocation'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('delta', models.IntegerField(help_text='Change in quantity, negative when stock leaves the item')),
+                ('reason', models.CharField(blank=True, default='', max_length=255)),
+                ('reference', models.CharField(blank=True, help_text='e.g., the other item of a transfer', max_length=100, null=True)),
+                ('performed_by', models.CharField(blank=True, help_text='ID of the user who moved the stock', max_length=50, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inventory_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='inventory_service.inventoryitem')),
+            ],
+            options={
+                'verbose_name': 'Stock Movement',
+                'verbose_name_plural': 'Stock Movements',
+                'db_table': 'stock_movements',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='stocksnapshot',
+            index=models.Index(fields=['inventory_item', 'taken_at'], name='stock_snaps_invento_4f3e9d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['inventory_item', 'created_at'], name='stock_movem_invento_74b0be_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['movement_type', 'created_at'], name='stock_movem_movemen_d2f919_idx'),
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_service', '0002_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alert_type', models.CharField(choices=[('low_stock', 'Low Stock'), ('expiry', 'Expiry')], max_length=20)),
+                ('severity', models.CharField(choices=[('warning', 'Warning'), ('critical', 'Critical')], max_length=20)),
+                ('quantity', models.IntegerField()),
+                ('reorder_level', models.IntegerField()),
+                ('expiration_date', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inventory_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='inventory_service.inventoryitem')),
+            ],
+            options={
+                'verbose_name': 'Stock Alert',
+                'verbose_name_plural': 'Stock Alerts',
+                'db_table': 'stock_alerts',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='stockalert',
+            index=models.Index(fields=['alert_type', 'created_at'], name='stock_alert_alert_t_cfd9b9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockalert',
+            index=models.Index(fields=['alert_type', 'expiration_date'], name='stock_alert_alert_t_28693e_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='stockalert',
+            unique_together={('inventory_item', 'alert_type')},
+        ),
+    ]
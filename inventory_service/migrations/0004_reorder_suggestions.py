@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory_service', '0003_stock_alerts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReorderSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('daily_consumption', models.FloatField(help_text='Exponentially smoothed units dispensed per day')),
+                ('consumption_std', models.FloatField(help_text='Standard deviation of the daily consumption')),
+                ('reorder_point', models.PositiveIntegerField()),
+                ('order_up_to_level', models.PositiveIntegerField()),
+                ('days_of_cover', models.FloatField(blank=True, help_text='Days the stock lasts at the forecast rate', null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('inventory_item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reorder_suggestion', to='inventory_service.inventoryitem')),
+            ],
+            options={
+                'verbose_name': 'Reorder Suggestion',
+                'verbose_name_plural': 'Reorder Suggestions',
+                'db_table': 'reorder_suggestions',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='reordersuggestion',
+            index=models.Index(fields=['reorder_point'], name='reorder_sug_reorder_b6707b_idx'),
+        ),
+    ]
@@ -1,7 +1,95 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import connections, models, router
+from django.db.models import Case, Exists, F, Max, OuterRef, Subquery, Sum, Value, When
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+
+class InventoryItemQuerySet(models.QuerySet):
+    def adjust_quantity(self, delta, **fields):
+        """
+        Add ``delta`` (negative to remove stock) to the quantity of the selected
+        items in a single UPDATE. Items that do not hold enough stock are left
+        untouched, and the stock status is recomputed in the same statement.
+        Returns the number of updated items.
+        """
+        if self._is_mongodb():
+            return self._adjust_documents({pk: delta for pk in self.values_list('pk', flat=True)}, fields)
+        return self._adjust(delta, **fields)
+
+    def adjust_quantities(self, deltas, **fields):
+        """
+        Like ``adjust_quantity`` with a different delta per item, given as
+        ``{pk: delta}``, still in a single UPDATE.
+        """
+        if not deltas:
+            return 0
+        queryset = self.filter(pk__in=list(deltas))
+        if self._is_mongodb():
+            return queryset._adjust_documents({pk: deltas[pk] for pk in queryset.values_list('pk', flat=True)}, fields)
+        delta = Case(
+            *[When(pk=pk, then=Value(item_delta)) for pk, item_delta in deltas.items()],
+            default=Value(0),
+            output_field=models.IntegerField()
+        )
+        return queryset._adjust(delta, **fields)
+
+    def _adjust(self, delta, **fields):
+        queryset = self
+        if not isinstance(delta, int) or delta < 0:
+            queryset = queryset.filter(quantity__gte=-delta)
+        return queryset.update(
+            # Listed before quantity so that every backend compares the
+            # quantity as it was before this update
+            status=InventoryItem.stock_status_expression(delta),
+            quantity=F('quantity') + delta,
+            updated_at=timezone.now(),
+            **fields
+        )
+
+    def _is_mongodb(self):
+        return connections[self._db or router.db_for_write(self.model)].vendor == 'djongo'
+
+    def _adjust_documents(self, deltas, fields):
+        """
+        MongoDB version of ``_adjust``: djongo only translates UPDATEs that set
+        columns to plain values, so each item is changed with an update
+        pipeline sent through pymongo instead. A single document update is
+        atomic, and the stock check is part of its filter. ``fields`` must
+        hold plain values.
+        """
+        connection = connections[self._db or router.db_for_write(self.model)]
+        connection.ensure_connection()
+        collection = connection.connection[self.model._meta.db_table]
+        values = {}
+        for name, value in {**fields, 'updated_at': timezone.now()}.items():
+            field = self.model._meta.get_field(name)
+            values[field.column] = {'$literal': field.get_db_prep_save(value, connection)}
+
+        updated = 0
+        for pk, delta in deltas.items():
+            query = {'id': pk}
+            if delta < 0:
+                query['quantity'] = {'$gte': -delta}
+            result = collection.update_one(query, [{'$set': {
+                # Every expression of a $set stage reads the document as it
+                # was before the update
+                'status': InventoryItem.stock_status_document(delta),
+                'quantity': {'$add': ['$quantity', delta]},
+                **values,
+            }}])
+            updated += result.matched_count
+        return updated
+
+
 class InventoryItem(models.Model):
+    OUT_OF_STOCK = 'Out of Stock'
+    LOW_STOCK = 'Low Stock'
+    AVAILABLE = 'Available'
+    # Statuses set by hand that stock changes must not overwrite
+    MANUAL_STATUSES = ['Recalled']
+
     ITEM_TYPE_CHOICES = [
         ('medicine', _('Medicine')),
         ('supply', _('Medical Supply')),
@@ -48,6 +136,8 @@ class InventoryItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = InventoryItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Inventory Item')
         verbose_name_plural = _('Inventory Items')
@@ -64,6 +154,47 @@ class InventoryItem(models.Model):
     def __str__(self):
         return f"{self.item_name} ({self.quantity} {self.unit_of_measure}) at {self.location_id} ({self.location_type})"
 
+    @classmethod
+    def stock_status_expression(cls, delta=0):
+        """
+        Status of an item once ``delta`` (an int or an expression) is added to
+        its current quantity
+        """
+        return Case(
+            When(status__in=cls.MANUAL_STATUSES, then=F('status')),
+            When(quantity__lte=-delta, then=Value(cls.OUT_OF_STOCK)),
+            When(quantity__lte=F('reorder_level') - delta, then=Value(cls.LOW_STOCK)),
+            default=Value(cls.AVAILABLE),
+            output_field=models.CharField()
+        )
+
+    @classmethod
+    def stock_status_document(cls, delta=0):
+        """``stock_status_expression`` as a MongoDB aggregation expression, for an int ``delta``"""
+        return {'$switch': {
+            'branches': [
+                {'case': {'$in': ['$status', cls.MANUAL_STATUSES]}, 'then': '$status'},
+                {'case': {'$lte': ['$quantity', -delta]}, 'then': cls.OUT_OF_STOCK},
+                {'case': {'$lte': ['$quantity', {'$subtract': ['$reorder_level', delta]}]}, 'then': cls.LOW_STOCK},
+            ],
+            'default': cls.AVAILABLE,
+        }}
+
+    def quantity_at(self, when):
+        """
+        Quantity held at ``when``, from the latest snapshot taken before then
+        plus the movements recorded after it. Returns None if the item had no
+        recorded stock yet at that time.
+        """
+        snapshot = self.snapshots.filter(taken_at__lte=when).order_by('-taken_at', '-id').first()
+        movements = self.movements.filter(created_at__lte=when)
+        if snapshot is not None:
+            movements = movements.filter(id__gt=snapshot.last_movement_id)
+        elif not movements.exists():
+            return None
+        tail = movements.aggregate(total=Sum('delta'))['total'] or 0
+        return (snapshot.quantity if snapshot else 0) + tail
+
     @property
     def is_expired(self):
         from django.utils import timezone
@@ -74,3 +205,253 @@ class InventoryItem(models.Model):
     @property
     def needs_reorder(self):
         return self.quantity <= self.reorder_level
+
+
+class StockMovement(models.Model):
+    """Append-only ledger of every change to the quantity of an inventory item"""
+    MOVEMENT_TYPE_CHOICES = [
+        ('opening', _('Opening Balance')),
+        ('receive', _('Receive')),
+        ('dispense', _('Dispense')),
+        ('transfer_in', _('Transfer In')),
+        ('transfer_out', _('Transfer Out')),
+        ('relocation', _('Relocation')),  # The whole item moved; its quantity is unchanged
+        ('adjustment', _('Adjustment')),
+    ]
+
+    # Deleting an item keeps its history in the ledger
+    inventory_item = models.ForeignKey(
+        InventoryItem, on_delete=models.SET_NULL, null=True, related_name='movements'
+    )
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPE_CHOICES)
+    delta = models.IntegerField(help_text=_("Change in quantity, negative when stock leaves the item"))
+    reason = models.CharField(max_length=255, blank=True, default='')
+    reference = models.CharField(max_length=100, blank=True, null=True, help_text=_("e.g., the other item of a transfer"))
+    performed_by = models.CharField(max_length=50, blank=True, null=True, help_text=_("ID of the user who moved the stock"))
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Stock Movement')
+        verbose_name_plural = _('Stock Movements')
+        db_table = 'stock_movements'
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['inventory_item', 'created_at']),
+            models.Index(fields=['movement_type', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.movement_type} {self.delta:+d} for item {self.inventory_item_id}"
+
+
+class StockSnapshot(models.Model):
+    """
+    Quantity of an inventory item once every movement up to and including
+    ``last_movement_id`` is applied. Historical quantities start from the
+    nearest snapshot, so only the movements recorded after it are replayed.
+    """
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='snapshots')
+    quantity = models.IntegerField()
+    last_movement_id = models.BigIntegerField()
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Stock Snapshot')
+        verbose_name_plural = _('Stock Snapshots')
+        db_table = 'stock_snapshots'
+        ordering = ['-taken_at']
+        indexes = [
+            models.Index(fields=['inventory_item', 'taken_at']),
+        ]
+
+    def __str__(self):
+        return f"Item {self.inventory_item_id}: {self.quantity} at {self.taken_at}"
+
+    @classmethod
+    def take(cls, settle_seconds=60):
+        """
+        Snapshot every item that moved since its latest snapshot. Each snapshot
+        extends the previous one with the movements recorded since, so the
+        cost depends on the new movements rather than the size of the ledger.
+        Movements younger than ``settle_seconds`` are left for the next run,
+        so a transaction still in flight cannot commit a movement below the
+        watermark. Returns the number of snapshots created.
+        """
+        taken_at = timezone.now()
+        watermark = StockMovement.objects.filter(
+            created_at__lte=taken_at - timedelta(seconds=settle_seconds)
+        ).aggregate(last=Max('id'))['last']
+        if watermark is None:
+            return 0
+
+        latest = cls.objects.filter(inventory_item=OuterRef('pk')).order_by('-taken_at', '-id')
+        items = InventoryItem.objects.annotate(
+            snapshot_quantity=Subquery(latest.values('quantity')[:1]),
+            snapshot_movement_id=Subquery(latest.values('last_movement_id')[:1]),
+        ).filter(
+            Exists(StockMovement.objects.filter(inventory_item=OuterRef('pk')))
+        ).values_list('pk', 'snapshot_quantity', 'snapshot_movement_id')
+
+        # Items are grouped by the watermark of their latest snapshot, which
+        # after the first run is usually the same for all of them
+        by_watermark = {}
+        for pk, quantity, last_movement_id in items:
+            by_watermark.setdefault(last_movement_id or 0, {})[pk] = quantity or 0
+
+        snapshots = []
+        for last_movement_id, quantities in by_watermark.items():
+            if last_movement_id >= watermark:
+                continue
+            new_movements = StockMovement.objects.filter(
+                inventory_item__in=list(quantities), id__gt=last_movement_id, id__lte=watermark
+            ).order_by().values('inventory_item').annotate(total=Sum('delta'))
+            for row in new_movements:
+                snapshots.append(cls(
+                    inventory_item_id=row['inventory_item'],
+                    quantity=quantities[row['inventory_item']] + row['total'],
+                    last_movement_id=watermark,
+                    taken_at=taken_at
+                ))
+        cls.objects.bulk_create(snapshots, batch_size=1000)
+        return len(snapshots)
+
+
+class StockAlert(models.Model):
+    """
+    Watchlist entry for an inventory item that is at or below its reorder
+    level, or whose expiration date is within EXPIRY_WARNING_DAYS. It is
+    kept up to date by every stock mutation and by a nightly sweep, so the
+    watchlist endpoints never scan the inventory.
+    """
+    LOW_STOCK = 'low_stock'
+    EXPIRY = 'expiry'
+    ALERT_TYPE_CHOICES = [
+        (LOW_STOCK, _('Low Stock')),
+        (EXPIRY, _('Expiry')),
+    ]
+    SEVERITY_CHOICES = [
+        ('warning', _('Warning')),
+        ('critical', _('Critical')),
+    ]
+
+    EXPIRY_WARNING_DAYS = 90
+    EXPIRY_CRITICAL_DAYS = 30
+
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.CASCADE, related_name='alerts')
+    alert_type = models.CharField(max_length=20, choices=ALERT_TYPE_CHOICES)
+    severity = models.CharField(max_length=20, choices=SEVERITY_CHOICES)
+    # Values of the item when the alert was last evaluated
+    quantity = models.IntegerField()
+    reorder_level = models.IntegerField()
+    expiration_date = models.DateField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Stock Alert')
+        verbose_name_plural = _('Stock Alerts')
+        db_table = 'stock_alerts'
+        unique_together = [('inventory_item', 'alert_type')]
+        indexes = [
+            models.Index(fields=['alert_type', 'created_at']),
+            models.Index(fields=['alert_type', 'expiration_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.severity} {self.alert_type} alert for item {self.inventory_item_id}"
+
+    @classmethod
+    def evaluate(cls, item, today):
+        """Return ``{alert_type: severity}`` for the alerts an item should have"""
+        alerts = {}
+        if item.quantity <= item.reorder_level:
+            alerts[cls.LOW_STOCK] = 'critical' if item.quantity == 0 else 'warning'
+        if item.expiration_date and item.expiration_date <= today + timedelta(days=cls.EXPIRY_WARNING_DAYS):
+            critical = item.expiration_date <= today + timedelta(days=cls.EXPIRY_CRITICAL_DAYS)
+            alerts[cls.EXPIRY] = 'critical' if critical else 'warning'
+        return alerts
+
+    @classmethod
+    def sync(cls, items, today=None):
+        """
+        Bring the alerts of ``items`` in line with their current values.
+        Alerts whose values do not change are left untouched.
+        """
+        items = list(items)
+        if not items:
+            return
+        today = today or timezone.now().date()
+        now = timezone.now()
+        existing = {
+            (alert.inventory_item_id, alert.alert_type): alert
+            for alert in cls.objects.filter(inventory_item__in=[item.pk for item in items])
+        }
+
+        to_create = []
+        to_update = []
+        current = set()
+        for item in items:
+            for alert_type, severity in cls.evaluate(item, today).items():
+                key = (item.pk, alert_type)
+                current.add(key)
+                values = {
+                    'severity': severity,
+                    'quantity': item.quantity,
+                    'reorder_level': item.reorder_level,
+                    'expiration_date': item.expiration_date,
+                }
+                alert = existing.get(key)
+                if alert is None:
+                    to_create.append(cls(inventory_item=item, alert_type=alert_type, updated_at=now, **values))
+                elif any(getattr(alert, field) != value for field, value in values.items()):
+                    for field, value in values.items():
+                        setattr(alert, field, value)
+                    alert.updated_at = now
+                    to_update.append(alert)
+
+        stale = [alert.pk for key, alert in existing.items() if key not in current]
+        if stale:
+            cls.objects.filter(pk__in=stale).delete()
+        if to_update:
+            fields = ['severity', 'quantity', 'reorder_level', 'expiration_date', 'updated_at']
+            if connections[router.db_for_write(cls)].vendor == 'djongo':
+                # djongo cannot translate the CASE expressions of bulk_update
+                for alert in to_update:
+                    cls.objects.filter(pk=alert.pk).update(**{field: getattr(alert, field) for field in fields})
+            else:
+                cls.objects.bulk_update(to_update, fields)
+        if to_create:
+            # A concurrent mutation of the same item may have created it first
+            cls.objects.bulk_create(to_create, ignore_conflicts=True)
+
+
+class ReorderSuggestion(models.Model):
+    """
+    Forecast consumption and dynamic reorder point of an inventory item,
+    recomputed for all items by the compute_reorder_suggestions command.
+    """
+    inventory_item = models.OneToOneField(InventoryItem, on_delete=models.CASCADE, related_name='reorder_suggestion')
+    daily_consumption = models.FloatField(help_text=_("Exponentially smoothed units dispensed per day"))
+    consumption_std = models.FloatField(help_text=_("Standard deviation of the daily consumption"))
+    reorder_point = models.PositiveIntegerField()
+    order_up_to_level = models.PositiveIntegerField()
+    days_of_cover = models.FloatField(blank=True, null=True, help_text=_("Days the stock lasts at the forecast rate"))
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Reorder Suggestion')
+        verbose_name_plural = _('Reorder Suggestions')
+        db_table = 'reorder_suggestions'
+        indexes = [
+            models.Index(fields=['reorder_point']),
+        ]
+
+    def __str__(self):
+        return f"Item {self.inventory_item_id}: reorder at {self.reorder_point}"
+
+    @property
+    def suggested_quantity(self):
+        """Quantity to order now to get back to the order-up-to level"""
+        if self.inventory_item.quantity > self.reorder_point:
+            return 0
+        return max(self.order_up_to_level - self.inventory_item.quantity, 0)
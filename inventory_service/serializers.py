@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import InventoryItem
+from .models import InventoryItem, ReorderSuggestion, StockAlert, StockMovement
 
 class InventoryItemSerializer(serializers.ModelSerializer):
     is_expired = serializers.ReadOnlyField()
@@ -26,3 +26,75 @@ class InventoryItemCreateUpdateSerializer(serializers.ModelSerializer):
         #     # For now, we assume item_name is provided or handled elsewhere if denormalized.
         return data
 
+
+
+class StockMovementLineSerializer(serializers.Serializer):
+    """
+    One line of a bulk stock movement. The item is identified either by its
+    ``id`` or by its unique key (item_id, location, batch and serial number).
+    Lines receiving stock for a key that does not exist yet create the item,
+    using the optional item fields.
+    """
+    id = serializers.IntegerField(required=False)
+    item_id = serializers.CharField(max_length=100, required=False)
+    location_id = serializers.CharField(max_length=100, required=False)
+    location_type = serializers.ChoiceField(choices=InventoryItem.LOCATION_TYPE_CHOICES, required=False)
+    batch_number = serializers.CharField(max_length=100, required=False, allow_null=True, default=None)
+    serial_number = serializers.CharField(max_length=100, required=False, allow_null=True, default=None)
+    delta = serializers.IntegerField()
+    reason = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+    # Used when the line creates a new item
+    item_name = serializers.CharField(max_length=255, required=False)
+    item_type = serializers.ChoiceField(choices=InventoryItem.ITEM_TYPE_CHOICES, required=False)
+    unit_of_measure = serializers.CharField(max_length=50, required=False)
+    manufacturer = serializers.CharField(max_length=200, required=False, allow_null=True)
+    expiration_date = serializers.DateField(required=False, allow_null=True)
+    purchase_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    selling_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
+    reorder_level = serializers.IntegerField(min_value=0, required=False)
+    supplier_id = serializers.CharField(max_length=100, required=False, allow_null=True)
+
+    NEW_ITEM_FIELDS = (
+        'item_name', 'item_type', 'unit_of_measure', 'manufacturer', 'expiration_date',
+        'purchase_price', 'selling_price', 'reorder_level', 'supplier_id',
+    )
+
+    def validate(self, data):
+        if not data['delta']:
+            raise serializers.ValidationError("delta must not be zero.")
+        if 'id' not in data and not all(data.get(field) for field in ('item_id', 'location_id', 'location_type')):
+            raise serializers.ValidationError("Provide id, or item_id, location_id and location_type.")
+        return data
+
+    # The unique_together key of an inventory item
+    KEY_FIELDS = ('location_id', 'location_type', 'item_id', 'batch_number', 'serial_number')
+
+
+class StockMovementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockMovement
+        fields = '__all__'
+
+
+class StockAlertSerializer(serializers.ModelSerializer):
+    item = InventoryItemSerializer(source='inventory_item', read_only=True)
+
+    class Meta:
+        model = StockAlert
+        fields = (
+            'id', 'alert_type', 'severity', 'quantity', 'reorder_level', 'expiration_date',
+            'created_at', 'updated_at', 'item'
+        )
+
+
+class ReorderSuggestionSerializer(serializers.ModelSerializer):
+    suggested_quantity = serializers.ReadOnlyField()
+    item = InventoryItemSerializer(source='inventory_item', read_only=True)
+
+    class Meta:
+        model = ReorderSuggestion
+        fields = (
+            'id', 'daily_consumption', 'consumption_std', 'reorder_point', 'order_up_to_level',
+            'days_of_cover', 'suggested_quantity', 'created_at', 'item'
+        )
@@ -1,3 +1,444 @@
-from django.test import TestCase
+import threading
+from contextlib import nullcontext
+from datetime import date, datetime, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db import DatabaseError, connections
+from django.db.models import F
+from django.db.models.sql import UpdateQuery
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+import djongo.base  # noqa: F401 (djongo.sql2mongo cannot be imported before it)
+from djongo.exceptions import SQLDecodeError
+from djongo.sql2mongo.query import Query as DjongoQuery
+from rest_framework.test import APIClient
+
+from auth_service.models import User
+
+from .forecasting import forecast, reorder_points, smooth
+from .models import InventoryItem, InventoryItemQuerySet, StockAlert, StockMovement
+
+
+def create_item(**fields):
+    return InventoryItem.objects.create(**{
+        'item_id': 'MED-1',
+        'item_name': 'Paracetamol',
+        'location_id': 'PH-1',
+        'location_type': 'pharmacy',
+        'batch_number': 'B1',
+        'quantity': 10,
+        'reorder_level': 2,
+        **fields,
+    })
+
+
+class ConcurrentStockUpdateTests(TransactionTestCase):
+    databases = {'default', 'inventory_db'}
+
+    def test_concurrent_dispenses_never_oversell(self):
+        item = create_item(quantity=10)
+        results = []
+        start = threading.Barrier(20)
+
+        def dispense():
+            try:
+                start.wait()
+                results.append(InventoryItem.objects.filter(pk=item.pk).adjust_quantity(-1))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=dispense) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        item.refresh_from_db()
+        self.assertEqual(sum(results), 10)
+        self.assertEqual(item.quantity, 0)
+        self.assertEqual(item.status, InventoryItem.OUT_OF_STOCK)
+
+    def test_concurrent_receipts_are_all_applied(self):
+        item = create_item(quantity=0)
+        start = threading.Barrier(20)
+
+        def receive():
+            try:
+                start.wait()
+                InventoryItem.objects.filter(pk=item.pk).adjust_quantity(5)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=receive) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, 100)
+
+
+class TransferTests(TestCase):
+    databases = {'default', 'inventory_db'}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(
+            username='storekeeper', email='storekeeper@example.com', password='password'
+        ))
+
+    def transfer(self, item, quantity, location_id='WARD-1'):
+        return self.client.post(f'/api/inventory/items/{item.pk}/transfer/', {
+            'location_id': location_id, 'location_type': 'hospital_ward', 'quantity': quantity
+        }, format='json')
+
+    def test_full_transfer_moves_the_item(self):
+        item = create_item(quantity=10)
+        response = self.transfer(item, 10)
+
+        self.assertEqual(response.status_code, 200)
+        item.refresh_from_db()
+        self.assertEqual((item.location_id, item.quantity), ('WARD-1', 10))
+        self.assertEqual(InventoryItem.objects.count(), 1)
+
+    def test_full_transfer_merges_into_existing_destination(self):
+        item = create_item(quantity=10)
+        destination = create_item(location_id='WARD-1', location_type='hospital_ward', quantity=4)
+        response = self.transfer(item, 10)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], destination.pk)
+        destination.refresh_from_db()
+        self.assertEqual(destination.quantity, 14)
+        self.assertEqual(
+            list(destination.movements.values_list('movement_type', 'delta')), [('transfer_in', 10)]
+        )
+        # The emptied source stays, with its ledger
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, 0)
+        self.assertEqual(list(item.movements.values_list('movement_type', 'delta')), [('transfer_out', -10)])
+
+    def test_deleting_an_item_keeps_its_ledger(self):
+        item = create_item(quantity=10)
+        self.transfer(item, 4)
+        item.delete()
+        self.assertEqual(
+            list(StockMovement.objects.filter(inventory_item=None).values_list('movement_type', 'delta')),
+            [('transfer_out', -4)]
+        )
+
+    def test_partial_transfer_adds_to_existing_destination(self):
+        item = create_item(quantity=10)
+        destination = create_item(location_id='WARD-1', location_type='hospital_ward', quantity=4)
+        response = self.transfer(item, 3)
+
+        self.assertEqual(response.status_code, 200)
+        item.refresh_from_db()
+        destination.refresh_from_db()
+        self.assertEqual((item.quantity, destination.quantity), (7, 7))
+        self.assertEqual(StockMovement.objects.filter(inventory_item=item).get().delta, -3)
+
+    def test_transfer_of_more_than_the_stock_is_rejected(self):
+        item = create_item(quantity=10)
+        response = self.transfer(item, 11)
+
+        self.assertEqual(response.status_code, 400)
+        item.refresh_from_db()
+        self.assertEqual((item.location_id, item.quantity), ('PH-1', 10))
+
+
+class BulkMovementTests(TestCase):
+    databases = {'default', 'inventory_db'}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(
+            username='storekeeper', email='storekeeper@example.com', password='password'
+        ))
+
+    def test_lines_are_applied_and_recorded(self):
+        item = create_item(quantity=10)
+        response = self.client.post('/api/inventory/items/bulk_movements/', {'movements': [
+            {'id': item.pk, 'delta': -4},
+            {'item_id': 'MED-2', 'location_id': 'PH-1', 'location_type': 'pharmacy', 'delta': 5,
+             'item_name': 'Ibuprofen'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], ['applied', 'created'])
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, 6)
+        self.assertEqual(InventoryItem.objects.get(item_id='MED-2').quantity, 5)
+        self.assertEqual(StockMovement.objects.count(), 2)
+
+    def test_insufficient_stock_applies_nothing(self):
+        item = create_item(quantity=10)
+        response = self.client.post('/api/inventory/items/bulk_movements/', {'movements': [
+            {'id': item.pk, 'delta': -4},
+            {'id': item.pk, 'delta': -7},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, 10)
+        self.assertFalse(StockMovement.objects.exists())
+
+
+class NonTransactionalDatabaseTests(TransactionTestCase):
+    """Failed stock changes are undone by hand on a database that cannot roll back, such as djongo"""
+    databases = {'default', 'inventory_db'}
+
+    def setUp(self):
+        for patcher in [
+            mock.patch('inventory_service.transactions.can_roll_back', return_value=False),
+            mock.patch('inventory_service.views.can_roll_back', return_value=False),
+            mock.patch('inventory_service.transactions.transaction', atomic=lambda using: nullcontext()),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(
+            username='storekeeper', email='storekeeper@example.com', password='password'
+        ))
+
+    def test_failed_ledger_write_undoes_the_stock_change(self):
+        item = create_item(quantity=10)
+        with mock.patch.object(StockMovement.objects, 'create', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post(f'/api/inventory/items/{item.pk}/dispense/', {'quantity': 3}, format='json')
+
+        item.refresh_from_db()
+        self.assertEqual((item.quantity, item.status), (10, InventoryItem.AVAILABLE))
+
+    def test_failed_bulk_ledger_write_undoes_every_line(self):
+        first = create_item(quantity=10)
+        second = create_item(item_id='MED-2', quantity=1)
+        with mock.patch.object(StockMovement.objects, 'bulk_create', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                self.client.post('/api/inventory/items/bulk_movements/', {'movements': [
+                    {'id': first.pk, 'delta': -4},
+                    {'id': second.pk, 'delta': 5},
+                    {'item_id': 'MED-3', 'location_id': 'PH-1', 'location_type': 'pharmacy', 'delta': 5,
+                     'item_name': 'Ibuprofen'},
+                ]}, format='json')
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.quantity, second.quantity), (10, 1))
+        self.assertIsNone(second.last_restock_date)
+        self.assertFalse(InventoryItem.objects.filter(item_id='MED-3').exists())
+
+    def test_bulk_conflict_undoes_the_lines_already_applied(self):
+        first = create_item(quantity=10)
+        second = create_item(item_id='MED-2', quantity=10)
+        adjust_quantity = InventoryItemQuerySet.adjust_quantity
+
+        def adjust_then_conflict(queryset, delta, **fields):
+            # Another request takes the second item's stock first
+            if queryset.filter(pk=second.pk).exists():
+                InventoryItem.objects.filter(pk=second.pk).update(quantity=0)
+            return adjust_quantity(queryset, delta, **fields)
+
+        with mock.patch.object(InventoryItemQuerySet, 'adjust_quantity', adjust_then_conflict):
+            response = self.client.post('/api/inventory/items/bulk_movements/', {'movements': [
+                {'id': first.pk, 'delta': -4},
+                {'id': second.pk, 'delta': -4},
+            ]}, format='json')
+
+        self.assertEqual(response.status_code, 409)
+        first.refresh_from_db()
+        self.assertEqual(first.quantity, 10)
+        self.assertFalse(StockMovement.objects.exists())
+
+
+def djongo_connection():
+    """A djongo connection for inventory_db, as in the deployed settings, that is never opened"""
+    databases = ConnectionHandler({
+        'default': {},
+        'inventory_db': {'ENGINE': 'djongo', 'NAME': 'healthcare_inventory'},
+    })
+    return databases['inventory_db']
+
+
+def evaluate(expression, document):
+    """Evaluate the subset of MongoDB aggregation expressions used by stock updates"""
+    if isinstance(expression, str) and expression.startswith('$'):
+        return document.get(expression[1:])
+    if not isinstance(expression, dict):
+        return expression
+    (operator, args), = expression.items()
+    if operator == '$literal':
+        return args
+    if operator == '$switch':
+        for branch in args['branches']:
+            if evaluate(branch['case'], document):
+                return evaluate(branch['then'], document)
+        return evaluate(args['default'], document)
+    left, right = (evaluate(arg, document) for arg in args)
+    return {
+        '$in': lambda: left in right,
+        '$lte': lambda: left <= right,
+        '$add': lambda: left + right,
+        '$subtract': lambda: left - right,
+    }[operator]()
+
+
+class FakeCollection:
+    """Applies update_one pipelines to in-memory documents"""
+    def __init__(self, *documents):
+        self.documents = list(documents)
+
+    def update_one(self, query, pipeline):
+        for document in self.documents:
+            if document['id'] == query['id'] and document['quantity'] >= query.get('quantity', {}).get('$gte', 0):
+                for stage in pipeline:
+                    document.update({key: evaluate(value, document) for key, value in stage['$set'].items()})
+                return mock.Mock(matched_count=1)
+        return mock.Mock(matched_count=0)
+
+
+class DjongoStockUpdateTests(TestCase):
+    """
+    inventory_db runs on djongo, which translates a subset of SQL to MongoDB:
+    UPDATEs may only set columns to plain values, so stock changes go
+    through pymongo there.
+    """
+    databases = {'inventory_db'}
+
+    def setUp(self):
+        self.djongo = djongo_connection()
+
+    def assert_djongo_parses(self, query):
+        sql, params = query.get_compiler(connection=self.djongo).as_sql()
+        DjongoQuery(mock.MagicMock(), mock.MagicMock(), mock.MagicMock(), sql, params)
+
+    def update_query(self, queryset, **values):
+        query = queryset.query.chain(UpdateQuery)
+        query.add_update_values(values)
+        return query
+
+    def test_djongo_parses_the_stock_queries(self):
+        items = InventoryItem.objects.filter(pk=1)
+        self.assert_djongo_parses(items.values_list('pk', flat=True).query)
+        self.assert_djongo_parses(InventoryItem.objects.filter(pk__in=[1, 2]).values_list('pk', flat=True).query)
+        self.assert_djongo_parses(self.update_query(items.filter(quantity=5), location_id='PH-2', location_type='pharmacy'))
+        # The SQL form of a stock change cannot be translated
+        with self.assertRaises(SQLDecodeError):
+            self.assert_djongo_parses(self.update_query(items, quantity=F('quantity') + 1))
+        with self.assertRaises(SQLDecodeError):
+            self.assert_djongo_parses(self.update_query(items, status=InventoryItem.stock_status_expression(1)))
+
+    def test_alerts_are_updated_one_by_one(self):
+        item = create_item(quantity=1, reorder_level=2)
+        StockAlert.sync([item])
+        item.quantity = 0
+        with mock.patch('inventory_service.models.connections', {'inventory_db': self.djongo}), \
+                mock.patch.object(StockAlert.objects, 'bulk_update') as bulk_update:
+            StockAlert.sync([item])
+        bulk_update.assert_not_called()
+
+        alert = StockAlert.objects.get()
+        self.assertEqual((alert.severity, alert.quantity), ('critical', 0))
+        self.assert_djongo_parses(self.update_query(
+            StockAlert.objects.filter(pk=alert.pk), severity='critical', quantity=0, updated_at=timezone.now()
+        ))
+
+    def adjust_documents(self, *documents):
+        collection = FakeCollection(*documents)
+        self.djongo.connection = {'inventory_items': collection}
+        patchers = [
+            mock.patch.object(self.djongo, 'ensure_connection'),
+            mock.patch('inventory_service.models.connections', {'inventory_db': self.djongo}),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return collection.documents
+
+    def test_stock_changes_are_conditional_document_updates(self):
+        item = create_item(quantity=5, reorder_level=2)
+        document, = self.adjust_documents({'id': item.pk, 'quantity': 5, 'reorder_level': 2, 'status': 'Available'})
+
+        self.assertEqual(InventoryItem.objects.filter(pk=item.pk).adjust_quantity(-3), 1)
+        self.assertEqual((document['quantity'], document['status']), (2, InventoryItem.LOW_STOCK))
+        self.assertEqual(InventoryItem.objects.filter(pk=item.pk).adjust_quantity(-3), 0)
+        self.assertEqual(document['quantity'], 2)
+        self.assertEqual(InventoryItem.objects.filter(pk=item.pk).adjust_quantity(-2), 1)
+        self.assertEqual((document['quantity'], document['status']), (0, InventoryItem.OUT_OF_STOCK))
+
+        restocked_at = timezone.make_aware(datetime(2030, 1, 1, 12))
+        InventoryItem.objects.filter(pk=item.pk).adjust_quantity(10, last_restock_date=restocked_at)
+        self.assertEqual((document['quantity'], document['status']), (10, InventoryItem.AVAILABLE))
+        self.assertEqual(document['last_restock_date'], datetime(2030, 1, 1, 12))
+
+    def test_manual_status_is_kept(self):
+        item = create_item(quantity=5, status='Recalled')
+        document, = self.adjust_documents({'id': item.pk, 'quantity': 5, 'reorder_level': 2, 'status': 'Recalled'})
+        InventoryItem.objects.filter(pk=item.pk).adjust_quantity(-5)
+        self.assertEqual((document['quantity'], document['status']), (0, 'Recalled'))
+
+    def test_per_item_deltas(self):
+        first, second = create_item(quantity=5), create_item(item_id='MED-2', quantity=1)
+        documents = self.adjust_documents(
+            {'id': first.pk, 'quantity': 5, 'reorder_level': 2, 'status': None},
+            {'id': second.pk, 'quantity': 1, 'reorder_level': 2, 'status': None},
+        )
+        self.assertEqual(InventoryItem.objects.adjust_quantities({first.pk: -1, second.pk: -2}), 1)
+        self.assertEqual([document['quantity'] for document in documents], [4, 1])
+
+
+class SmoothingTests(SimpleTestCase):
+    def test_matches_recursive_exponential_smoothing(self):
+        consumption = np.random.default_rng(0).poisson(5, size=(4, 30)).astype(np.float64)
+        level, spread = smooth(consumption, alpha=0.3)
+
+        for row, expected_level, expected_spread in zip(consumption, level, spread):
+            smoothed, second_moment = row[0], row[0] ** 2
+            for value in row[1:]:
+                smoothed = 0.3 * value + 0.7 * smoothed
+                second_moment = 0.3 * value ** 2 + 0.7 * second_moment
+            self.assertAlmostEqual(expected_level, smoothed)
+            self.assertAlmostEqual(expected_spread, np.sqrt(second_moment - smoothed ** 2))
+
+    def test_steady_consumption_has_no_spread(self):
+        level, spread = smooth(np.full((2, 10), 4.0))
+        np.testing.assert_allclose(level, [4, 4])
+        np.testing.assert_allclose(spread, [0, 0], atol=1e-9)
+
+    def test_reorder_points_cover_the_lead_time_and_review_period(self):
+        reorder_point, order_up_to = reorder_points(
+            np.array([2.0, 2.0, 0.0]), np.array([0.0, 1.0, 0.0]), lead_time_days=4, review_days=10, service_z=2
+        )
+        # Safety stock of the second item: 2 * 1 * sqrt(4) = 4
+        np.testing.assert_array_equal(reorder_point, [8, 12, 0])
+        np.testing.assert_array_equal(order_up_to, [28, 32, 0])
+
+
+class ForecastTests(TestCase):
+    databases = {'default', 'inventory_db'}
+
+    def dispense(self, item, quantity, day):
+        StockMovement.objects.create(
+            inventory_item=item, movement_type='dispense', delta=-quantity,
+            created_at=timezone.make_aware(datetime.combine(day, time(12)))
+        )
+
+    def test_daily_dispenses_are_smoothed_per_item(self):
+        end_date = date(2030, 1, 10)
+        busy = create_item(quantity=30)
+        idle = create_item(item_id='MED-2', quantity=5)
+        for day in range(10):
+            self.dispense(busy, 3, end_date - timedelta(days=day))
+        # Receipts and dispenses outside the window are not consumption
+        StockMovement.objects.create(inventory_item=idle, movement_type='receive', delta=5)
+        self.dispense(idle, 50, end_date - timedelta(days=10))
+
+        result = forecast(window_days=10, lead_time_days=7, review_days=14, end_date=end_date)
+        self.assertEqual(list(result['item_ids']), [busy.pk, idle.pk])
+        np.testing.assert_allclose(result['daily_consumption'], [3, 0])
+        np.testing.assert_array_equal(result['reorder_points'], [21, 0])
+        np.testing.assert_array_equal(result['order_up_to'], [63, 0])
+        np.testing.assert_allclose(result['days_of_cover'], [10, np.inf])
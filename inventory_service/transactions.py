@@ -0,0 +1,71 @@
+"""
+Stock transactions on databases without transaction support.
+
+The inventory database runs on djongo, which reports
+``supports_transactions = False``: ``transaction.atomic`` does not roll
+anything back there, so a failure halfway through a stock change would leave
+the writes made before it. Writes made inside ``stock_transaction`` register
+how to undo themselves with ``on_rollback``. If the block raises on such a
+backend, the undo actions run in reverse order; on a transactional backend
+the rollback takes care of it and they are dropped.
+
+Undoing is best effort: a change made to the same items in the meantime can
+make an undo action fail, which is logged.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import connections, transaction
+
+from .models import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+@contextmanager
+def stock_transaction(using):
+    """``transaction.atomic(using)`` that also undoes its writes by hand when ``using`` cannot roll back"""
+    if getattr(_local, 'undo', None) is not None:
+        # Nested blocks join the outermost one
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    _local.undo = undo = []
+    try:
+        with transaction.atomic(using=using):
+            yield
+    except Exception:
+        if not can_roll_back(using):
+            _run_undo(undo)
+        raise
+    finally:
+        _local.undo = None
+
+
+def on_rollback(func):
+    """Register ``func`` to undo a write of the current stock transaction"""
+    undo = getattr(_local, 'undo', None)
+    if undo is not None:
+        undo.append(func)
+
+
+def can_roll_back(using):
+    return connections[using].features.supports_transactions
+
+
+def _run_undo(undo):
+    for func in reversed(undo):
+        try:
+            func()
+        except Exception:
+            logger.exception("Failed to undo a stock change after an error")
+
+
+def undo_adjustment(pk, delta, **fields):
+    """Reverse an adjust_quantity of ``delta``, restoring ``fields`` to their previous values"""
+    if not InventoryItem.objects.filter(pk=pk).adjust_quantity(-delta, **fields):
+        logger.error(f"Could not undo a stock change of {delta:+d} on inventory item {pk}: not enough stock left")
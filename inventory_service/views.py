@@ -3,12 +3,22 @@ from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import F, Q
+import hashlib
+from collections import defaultdict
+from functools import partial
+
+from django.db import IntegrityError, router
+from django.db.models import Case, Count, F, Max, Q, Value, When
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from datetime import timedelta
 
-from .models import InventoryItem
-from .serializers import InventoryItemSerializer, InventoryItemCreateUpdateSerializer
+from .models import InventoryItem, ReorderSuggestion, StockAlert, StockMovement
+from .serializers import (
+    InventoryItemSerializer, InventoryItemCreateUpdateSerializer, ReorderSuggestionSerializer, StockAlertSerializer,
+    StockMovementLineSerializer, StockMovementSerializer
+)
+from .transactions import can_roll_back, on_rollback, stock_transaction, undo_adjustment
 
 class InventoryItemViewSet(viewsets.ModelViewSet):
     queryset = InventoryItem.objects.all()
@@ -25,6 +35,8 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
     }
     search_fields = ['item_id', 'item_name', 'description', 'batch_number', 'serial_number']
     ordering_fields = ['item_name', 'quantity', 'expiration_date', 'created_at', 'updated_at']
+    ordering = ['-created_at', '-id']
+    max_bulk_movements = 1000
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
@@ -39,39 +51,84 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
             permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    def _watchlist_response(self, request, alerts):
+        """
+        Paginated watchlist entries with an ETag derived from their count and
+        latest change, so polls that find nothing new get 304 Not Modified.
+        """
+        state = alerts.aggregate(count=Count('id'), changed=Max('updated_at'))
+        fingerprint = f"{request.get_full_path()}|{state['count']}|{state['changed']}"
+        etag = f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+        if_none_match = [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]
+        if etag in if_none_match or '*' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        alerts = alerts.select_related('inventory_item')
+        page = self.paginate_queryset(alerts)
+        if page is not None:
+            serializer = StockAlertSerializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = StockAlertSerializer(alerts, many=True)
+            response = Response(serializer.data)
+        response['ETag'] = etag
+        return response
+
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """Return inventory items that are at or below their reorder level."""
-        low_stock_items = InventoryItem.objects.filter(quantity__lte=F('reorder_level'))
-        serializer = self.get_serializer(low_stock_items, many=True)
-        return Response(serializer.data)
+        return self._watchlist_response(request, StockAlert.objects.filter(alert_type=StockAlert.LOW_STOCK))
 
     @action(detail=False, methods=['get'])
     def expiring_soon(self, request):
         """Return inventory items that are expiring within a specified number of days (default 90)."""
-        days_threshold = request.query_params.get('days', 90)
+        days_threshold = request.query_params.get('days', StockAlert.EXPIRY_WARNING_DAYS)
         try:
             days_threshold = int(days_threshold)
         except ValueError:
             return Response({"error": "Invalid days parameter."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= days_threshold <= StockAlert.EXPIRY_WARNING_DAYS:
+            return Response(
+                {"error": f"days must be between 0 and {StockAlert.EXPIRY_WARNING_DAYS}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        expiry_threshold_date = timezone.now().date() + timedelta(days=days_threshold)
-        expiring_items = InventoryItem.objects.filter(
-            expiration_date__isnull=False,
-            expiration_date__lte=expiry_threshold_date,
-            expiration_date__gte=timezone.now().date() # Only include items not yet expired
+        today = timezone.now().date()
+        expiring_alerts = StockAlert.objects.filter(
+            alert_type=StockAlert.EXPIRY,
+            expiration_date__lte=today + timedelta(days=days_threshold),
+            expiration_date__gte=today # Only include items not yet expired
+        )
+        return self._watchlist_response(request, expiring_alerts)
+
+    def _expired_alerts(self):
+        return StockAlert.objects.filter(
+            alert_type=StockAlert.EXPIRY,
+            expiration_date__lt=timezone.now().date()
         )
-        serializer = self.get_serializer(expiring_items, many=True)
-        return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def expired_items(self, request):
         """Return inventory items that have passed their expiration date."""
-        expired = InventoryItem.objects.filter(
-            expiration_date__isnull=False,
-            expiration_date__lt=timezone.now().date()
-        )
-        serializer = self.get_serializer(expired, many=True)
+        return self._watchlist_response(request, self._expired_alerts())
+
+    @action(detail=False, methods=['get'])
+    def reorder_suggestions(self, request):
+        """
+        Return the items at or below their forecast reorder point with the
+        quantity to order (?include_all=true returns every forecast item).
+        """
+        suggestions = ReorderSuggestion.objects.select_related('inventory_item')
+        if request.query_params.get('include_all', '').lower() not in ('1', 'true'):
+            suggestions = suggestions.filter(inventory_item__quantity__lte=F('reorder_point'), daily_consumption__gt=0)
+        for param in ('location_id', 'location_type'):
+            if request.query_params.get(param):
+                suggestions = suggestions.filter(**{f'inventory_item__{param}': request.query_params[param]})
+        page = self.paginate_queryset(suggestions)
+        if page is not None:
+            serializer = ReorderSuggestionSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = ReorderSuggestionSerializer(suggestions, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -90,27 +147,78 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
             return Response({"error": "Please provide location_id or location_type."}, status=status.HTTP_400_BAD_REQUEST)
 
         items = InventoryItem.objects.filter(query)
+        page = self.paginate_queryset(items)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(items, many=True)
         return Response(serializer.data)
 
+    def _get_quantity(self, request):
+        """Read a positive integer quantity from the request body"""
+        try:
+            quantity = int(request.data.get('quantity'))
+        except (TypeError, ValueError):
+            raise ValueError("Quantity must be a positive integer.")
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive.")
+        return quantity
+
+    def _record_movement(self, item, movement_type, delta, reason='', reference=None):
+        movement = StockMovement.objects.create(
+            inventory_item=item,
+            movement_type=movement_type,
+            delta=delta,
+            reason=reason or '',
+            reference=reference,
+            performed_by=str(self.request.user.id)
+        )
+        on_rollback(movement.delete)
+        return movement
+
+    def _adjust_stock(self, item, delta, movement_type, reason='', reference=None, **fields):
+        """
+        Apply a stock change with a single conditional UPDATE and record it in
+        the ledger; returns False if stock is insufficient
+        """
+        with stock_transaction(router.db_for_write(InventoryItem)):
+            if not InventoryItem.objects.filter(pk=item.pk).adjust_quantity(delta, **fields):
+                return False
+            on_rollback(partial(undo_adjustment, item.pk, delta, **{name: getattr(item, name) for name in fields}))
+            self._record_movement(item, movement_type, delta, reason, reference)
+        item.refresh_from_db()
+        StockAlert.sync([item])
+        return True
+
+    def perform_create(self, serializer):
+        with stock_transaction(router.db_for_write(InventoryItem)):
+            item = serializer.save()
+            on_rollback(item.delete)
+            self._record_movement(item, 'opening', item.quantity)
+        StockAlert.sync([item])
+
+    def perform_update(self, serializer):
+        with stock_transaction(router.db_for_write(InventoryItem)):
+            previous_quantity = serializer.instance.quantity
+            previous = {name: getattr(serializer.instance, name) for name in serializer.validated_data}
+            item = serializer.save()
+            on_rollback(partial(InventoryItem.objects.filter(pk=item.pk).update, **previous))
+            if item.quantity != previous_quantity:
+                self._record_movement(item, 'adjustment', item.quantity - previous_quantity, 'Manual update')
+        StockAlert.sync([item])
+
     # Potentially, an action to receive stock (adjust quantity up)
     @action(detail=True, methods=['post'])
     def receive_stock(self, request, pk=None):
         item = self.get_object()
-        quantity_received = request.data.get('quantity')
-        if quantity_received is None:
+        if request.data.get('quantity') is None:
             return Response({"error": "Quantity is required."}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            quantity_received = int(quantity_received)
-            if quantity_received <= 0:
-                raise ValueError("Quantity must be positive.")
+            quantity_received = self._get_quantity(request)
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        item.quantity = F('quantity') + quantity_received
-        item.last_restock_date = timezone.now()
-        item.save()
-        item.refresh_from_db() # Refresh to get the updated quantity
+        self._adjust_stock(item, quantity_received, 'receive', request.data.get('reason'), last_restock_date=timezone.now())
         serializer = self.get_serializer(item)
         return Response(serializer.data)
 
@@ -118,46 +226,36 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def dispense_stock(self, request, pk=None):
         item = self.get_object()
-        quantity_dispensed = request.data.get('quantity')
-        if quantity_dispensed is None:
+        if request.data.get('quantity') is None:
             return Response({"error": "Quantity is required."}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            quantity_dispensed = int(quantity_dispensed)
-            if quantity_dispensed <= 0:
-                raise ValueError("Quantity must be positive.")
+            quantity_dispensed = self._get_quantity(request)
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        if item.quantity < quantity_dispensed:
+        if not self._adjust_stock(item, -quantity_dispensed, 'dispense', request.data.get('reason')):
             return Response({"error": "Insufficient stock."}, status=status.HTTP_400_BAD_REQUEST)
-
-        item.quantity = F('quantity') - quantity_dispensed
-        item.save()
-        item.refresh_from_db()
         serializer = self.get_serializer(item)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def expired(self, request):
         """Return inventory items that have expired."""
-        expired_items = InventoryItem.objects.filter(expiration_date__lt=timezone.now().date())
-        serializer = self.get_serializer(expired_items, many=True)
-        return Response(serializer.data)
+        return self._watchlist_response(request, self._expired_alerts())
 
     @action(detail=True, methods=['post'])
     def restock(self, request, pk=None):
         """Add stock to an inventory item."""
         inventory_item = self.get_object()
-        quantity = request.data.get('quantity', 0)
-        if quantity <= 0:
+        try:
+            quantity = self._get_quantity(request)
+        except ValueError:
             return Response(
                 {'error': 'Quantity must be positive'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        inventory_item.quantity += quantity
-        inventory_item.last_restock_date = timezone.now()
-        inventory_item.save()
+        self._adjust_stock(inventory_item, quantity, 'receive', request.data.get('reason'), last_restock_date=timezone.now())
 
         serializer = self.get_serializer(inventory_item)
         return Response(serializer.data)
@@ -166,25 +264,19 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
     def dispense(self, request, pk=None):
         """Remove stock from an inventory item."""
         inventory_item = self.get_object()
-        quantity = request.data.get('quantity', 0)
-        if quantity <= 0:
+        try:
+            quantity = self._get_quantity(request)
+        except ValueError:
             return Response(
                 {'error': 'Quantity must be positive'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        if quantity > inventory_item.quantity:
+        if not self._adjust_stock(inventory_item, -quantity, 'dispense', request.data.get('reason')):
             return Response(
                 {'error': 'Insufficient stock'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        inventory_item.quantity -= quantity
-        if inventory_item.quantity <= inventory_item.reorder_level:
-            inventory_item.status = 'Low Stock'
-        if inventory_item.quantity == 0:
-            inventory_item.status = 'Out of Stock'
-        inventory_item.save()
-
         serializer = self.get_serializer(inventory_item)
         return Response(serializer.data)
 
@@ -194,7 +286,10 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
         inventory_item = self.get_object()
         new_location_id = request.data.get('location_id')
         new_location_type = request.data.get('location_type')
-        quantity = request.data.get('quantity', 0)
+        try:
+            quantity = self._get_quantity(request)
+        except ValueError:
+            quantity = 0
 
         if not all([new_location_id, new_location_type, quantity > 0]):
             return Response(
@@ -202,40 +297,276 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if quantity > inventory_item.quantity:
+        source = f"{inventory_item.location_type}:{inventory_item.location_id}"
+        destination = f"{new_location_type}:{new_location_id}"
+        reason = request.data.get('reason')
+        db = router.db_for_write(InventoryItem)
+        destination_key = {
+            'location_id': new_location_id,
+            'location_type': new_location_type,
+            'item_id': inventory_item.item_id,
+            'batch_number': inventory_item.batch_number,
+            'serial_number': inventory_item.serial_number,
+        }
+
+        if not InventoryItem.objects.filter(**destination_key).exists():
+            try:
+                with stock_transaction(db):
+                    # Transferring all of the stock moves the item itself, provided
+                    # nothing changed its quantity in the meantime
+                    moved = InventoryItem.objects.filter(pk=inventory_item.pk, quantity=quantity).update(
+                        location_id=new_location_id,
+                        location_type=new_location_type,
+                        updated_at=timezone.now()
+                    )
+                    if moved:
+                        on_rollback(partial(
+                            InventoryItem.objects.filter(pk=inventory_item.pk).update,
+                            location_id=inventory_item.location_id, location_type=inventory_item.location_type
+                        ))
+                        self._record_movement(inventory_item, 'relocation', 0, reason or f"Moved from {source}", destination)
+            except IntegrityError:
+                # The item was created at the destination in the meantime; merge into it
+                moved = False
+            if moved:
+                inventory_item.refresh_from_db()
+                serializer = self.get_serializer(inventory_item)
+                return Response(serializer.data)
+
+        with stock_transaction(db):
+            if not self._adjust_stock(inventory_item, -quantity, 'transfer_out', reason, destination):
+                return Response(
+                    {'error': 'Insufficient stock for transfer'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            # Add to the same item at the destination, or create it there
+            new_item, created = InventoryItem.objects.get_or_create(
+                **destination_key,
+                defaults={
+                    'item_type': inventory_item.item_type,
+                    'item_name': inventory_item.item_name,
+                    'description': inventory_item.description,
+                    'manufacturer': inventory_item.manufacturer,
+                    'quantity': quantity,
+                    'unit_of_measure': inventory_item.unit_of_measure,
+                    'expiration_date': inventory_item.expiration_date,
+                    'purchase_price': inventory_item.purchase_price,
+                    'selling_price': inventory_item.selling_price,
+                    'reorder_level': inventory_item.reorder_level,
+                    'supplier_id': inventory_item.supplier_id,
+                    'status': InventoryItem.AVAILABLE if quantity > inventory_item.reorder_level
+                    else InventoryItem.LOW_STOCK,
+                }
+            )
+            if created:
+                on_rollback(new_item.delete)
+                self._record_movement(new_item, 'transfer_in', quantity, reason, source)
+            else:
+                # A source emptied by the merge is kept at zero with its ledger
+                self._adjust_stock(new_item, quantity, 'transfer_in', reason, source)
+        if created:
+            StockAlert.sync([new_item])
+
+        serializer = self.get_serializer(new_item)
+        return Response(serializer.data)
+
+    def _items_for_lines(self, lines):
+        """Fetch the existing items the movement lines refer to, with one query"""
+        key_fields = StockMovementLineSerializer.KEY_FIELDS
+        query = Q(pk__in=[line['id'] for line in lines if 'id' in line])
+        for line in lines:
+            if 'id' not in line:
+                query |= Q(**{field: line[field] for field in key_fields})
+        items = list(InventoryItem.objects.filter(query))
+        by_pk = {item.pk: item for item in items}
+        by_key = {tuple(getattr(item, field) for field in key_fields): item for item in items}
+        return by_pk, by_key
+
+    def _apply_deltas(self, deltas, items, now, db):
+        """
+        Apply the ``{pk: delta}`` stock changes of a bulk movement, setting the
+        restock date of the items receiving stock. Raises IntegrityError if
+        an item no longer holds enough stock.
+        """
+        restocked = [pk for pk, delta in deltas.items() if delta > 0]
+        if can_roll_back(db):
+            updated = InventoryItem.objects.adjust_quantities(
+                deltas,
+                last_restock_date=Case(
+                    When(pk__in=restocked, then=Value(now)),
+                    default=F('last_restock_date')
+                )
+            )
+            if updated != len(deltas):
+                raise IntegrityError("Stock changed while the movements were applied.")
+            return
+
+        # Without a rollback to fall back on, apply the changes one item at a
+        # time, so exactly the applied ones can be undone if a later one fails
+        for pk, delta in deltas.items():
+            fields = {'last_restock_date': now} if delta > 0 else {}
+            if not InventoryItem.objects.filter(pk=pk).adjust_quantity(delta, **fields):
+                raise IntegrityError("Stock changed while the movements were applied.")
+            previous = {'last_restock_date': items[pk].last_restock_date} if delta > 0 else {}
+            on_rollback(partial(undo_adjustment, pk, delta, **previous))
+
+    def _create_items(self, new_items, db):
+        """Create the items a bulk movement receives stock for"""
+        for item in new_items:
+            item.status = InventoryItem.AVAILABLE if item.quantity > item.reorder_level else InventoryItem.LOW_STOCK
+        if can_roll_back(db):
+            InventoryItem.objects.bulk_create(new_items)
+            return
+        for item in new_items:
+            item.save(force_insert=True)
+            on_rollback(item.delete)
+
+    @action(detail=False, methods=['post'])
+    def bulk_movements(self, request):
+        """
+        Apply a list of stock movements, such as a delivery manifest, in one
+        transaction: either every line is applied or none is (see
+        transactions.py for databases without transactions). Receiving stock
+        for an item that does not exist at the location yet creates it.
+        The response reports the outcome of every line.
+        """
+        lines = request.data.get('movements')
+        if not isinstance(lines, list) or not lines:
+            return Response({"error": "A non-empty list of movements is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(lines) > self.max_bulk_movements:
             return Response(
-                {'error': 'Insufficient stock for transfer'},
+                {"error": f"At most {self.max_bulk_movements} movements can be sent at once."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create new inventory item at destination if quantity is less than total
-        if quantity < inventory_item.quantity:
-            new_item = InventoryItem.objects.create(
-                item_id=inventory_item.item_id,
-                item_type=inventory_item.item_type,
-                item_name=inventory_item.item_name,
-                description=inventory_item.description,
-                manufacturer=inventory_item.manufacturer,
-                location_id=new_location_id,
-                location_type=new_location_type,
-                quantity=quantity,
-                unit_of_measure=inventory_item.unit_of_measure,
-                batch_number=inventory_item.batch_number,
-                expiration_date=inventory_item.expiration_date,
-                purchase_price=inventory_item.purchase_price,
-                selling_price=inventory_item.selling_price,
-                reorder_level=inventory_item.reorder_level,
-                supplier_id=inventory_item.supplier_id
+        line_serializer = StockMovementLineSerializer(data=lines, many=True)
+        if not line_serializer.is_valid():
+            return Response({
+                'error': 'Invalid movements.',
+                'results': [
+                    {'line': index, 'status': 'invalid', 'errors': errors} if errors
+                    else {'line': index, 'status': 'valid'}
+                    for index, errors in enumerate(line_serializer.errors)
+                ]
+            }, status=status.HTTP_400_BAD_REQUEST)
+        lines = line_serializer.validated_data
+
+        key_fields = StockMovementLineSerializer.KEY_FIELDS
+        db = router.db_for_write(InventoryItem)
+        try:
+            with stock_transaction(db):
+                by_pk, by_key = self._items_for_lines(lines)
+
+                results = []
+                line_items = []
+                deltas = defaultdict(int)
+                new_items = {}
+                for index, line in enumerate(lines):
+                    result = {'line': index, 'delta': line['delta'], 'reason': line['reason']}
+                    key = tuple(line.get(field) for field in key_fields)
+                    item = by_pk.get(line['id']) if 'id' in line else by_key.get(key)
+                    if item is not None:
+                        deltas[item.pk] += line['delta']
+                        line_items.append(item.pk)
+                    elif 'id' in line:
+                        result['error'] = "Inventory item not found."
+                    elif line['delta'] < 0:
+                        result['error'] = "Cannot remove stock from an item that does not exist."
+                    elif key not in new_items and not line.get('item_name'):
+                        result['error'] = "item_name is required to create a new item."
+                    else:
+                        new_item = new_items.setdefault(key, {
+                            **{field: line[field] for field in StockMovementLineSerializer.NEW_ITEM_FIELDS
+                               if field in line},
+                            **dict(zip(key_fields, key)),
+                            'quantity': 0,
+                        })
+                        new_item['quantity'] += line['delta']
+                        line_items.append(key)
+                    if 'error' in result:
+                        line_items.append(None)
+                    results.append(result)
+
+                # Report every line that would take an item below zero
+                for result, item_ref in zip(results, line_items):
+                    if item_ref in deltas and by_pk[item_ref].quantity + deltas[item_ref] < 0:
+                        result['error'] = "Insufficient stock."
+                if any('error' in result for result in results):
+                    for result in results:
+                        result['status'] = 'error' if 'error' in result else 'not_applied'
+                    return Response(
+                        {'error': 'No movements were applied.', 'results': results},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+                now = timezone.now()
+                deltas = {pk: delta for pk, delta in deltas.items() if delta}
+                self._apply_deltas(deltas, by_pk, now, db)
+                self._create_items(
+                    [InventoryItem(last_restock_date=now, **fields) for fields in new_items.values()], db
+                )
+
+                by_pk, by_key = self._items_for_lines(lines)
+                performed_by = str(request.user.id)
+                movements = [
+                    StockMovement(
+                        inventory_item=by_key[item_ref] if isinstance(item_ref, tuple) else by_pk[item_ref],
+                        movement_type='receive' if line['delta'] > 0 else 'dispense',
+                        delta=line['delta'],
+                        reason=line['reason'],
+                        performed_by=performed_by,
+                        created_at=now
+                    )
+                    for line, item_ref in zip(lines, line_items)
+                ]
+                # Registered first, as a failing batch may still have stored some rows
+                on_rollback(partial(
+                    StockMovement.objects.filter(
+                        inventory_item__in={movement.inventory_item_id for movement in movements},
+                        performed_by=performed_by, created_at=now
+                    ).delete
+                ))
+                StockMovement.objects.bulk_create(movements, batch_size=1000)
+        except IntegrityError:
+            return Response(
+                {'error': 'Stock changed while the movements were applied. No movements were applied, please retry.'},
+                status=status.HTTP_409_CONFLICT
             )
-            inventory_item.quantity -= quantity
-            inventory_item.save()
-            serializer = self.get_serializer(new_item)
-        else:
-            # Update location if transferring all quantity
-            inventory_item.location_id = new_location_id
-            inventory_item.location_type = new_location_type
-            inventory_item.save()
-            serializer = self.get_serializer(inventory_item)
 
+        StockAlert.sync({item.pk: item for item in [*by_pk.values(), *by_key.values()]}.values())
+        for result, item_ref in zip(results, line_items):
+            item = by_key[item_ref] if isinstance(item_ref, tuple) else by_pk[item_ref]
+            result.update({
+                'status': 'created' if isinstance(item_ref, tuple) else 'applied',
+                'id': item.pk,
+                'quantity': item.quantity,
+                'item_status': item.status,
+            })
+        return Response({'results': results})
+
+    @action(detail=True, methods=['get'])
+    def movements(self, request, pk=None):
+        """Return the stock movements of an inventory item, newest first."""
+        item = self.get_object()
+        movements = item.movements.all()
+        page = self.paginate_queryset(movements)
+        if page is not None:
+            serializer = StockMovementSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = StockMovementSerializer(movements, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def stock_at(self, request, pk=None):
+        """Return the quantity an inventory item held at a point in time (?at=YYYY-MM-DDTHH:MM:SS)."""
+        item = self.get_object()
+        at = parse_datetime(request.query_params.get('at', ''))
+        if at is None:
+            return Response(
+                {"error": "Invalid at parameter. Use an ISO 8601 date and time."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(at):
+            at = timezone.make_aware(at)
+        return Response({'id': item.pk, 'at': at, 'quantity': item.quantity_at(at)})
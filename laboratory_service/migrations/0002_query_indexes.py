@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('laboratory_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='laborder',
+            index=models.Index(fields=['patient_id', 'created_at'], name='lab_orders_patient_33c848_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='laborder',
+            index=models.Index(fields=['doctor_id', 'created_at'], name='lab_orders_doctor__aa0b48_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='laborder',
+            index=models.Index(fields=['status', 'created_at'], name='lab_orders_status_a40478_idx'),
+        ),
+    ]
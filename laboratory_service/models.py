@@ -84,6 +84,11 @@ class LabOrder(models.Model):
     class Meta:
         db_table = 'lab_orders'
         ordering = ['-ordered_date']
+        indexes = [
+            models.Index(fields=['patient_id', 'created_at']),
+            models.Index(fields=['doctor_id', 'created_at']),
+            models.Index(fields=['status', 'created_at'])
+        ]
     
     def __str__(self):
         return f"Order {self.order_id} for Patient {self.patient_id}"
@@ -0,0 +1,36 @@
+"""Publish the abnormal results section of the patient summary"""
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from healthcare.patient_summary import register_section, schedule_publish
+
+from .models import LabOrder, TestResult
+from .serializers import TestResultSerializer
+
+SUMMARY_SECTION = 'abnormal_results'
+SUMMARY_LIMIT = 20
+ABNORMAL_FLAGS = ('LOW', 'HIGH', 'CRITICAL')
+
+
+def abnormal_results(patient_id):
+    results = TestResult.objects.filter(
+        order_test__order__patient_id=patient_id, abnormal_flag__in=ABNORMAL_FLAGS
+    ).order_by('-created_at', '-id')[:SUMMARY_LIMIT]
+    return TestResultSerializer(results, many=True).data
+
+
+def patients_with_results():
+    return LabOrder.objects.filter(
+        tests__result__isnull=False
+    ).order_by().values_list('patient_id', flat=True).distinct()
+
+
+register_section(SUMMARY_SECTION, abnormal_results, patients_with_results)
+
+
+@receiver(post_save, sender=TestResult)
+@receiver(post_delete, sender=TestResult)
+def test_result_changed(sender, instance, **kwargs):
+    patient_id = LabOrder.objects.filter(tests__id=instance.order_test_id).values_list('patient_id', flat=True).first()
+    schedule_publish(patient_id, SUMMARY_SECTION, router.db_for_write(TestResult))
@@ -1,3 +1,93 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from auth_service.models import User
+
+from .models import LabOrder, LabOrderTest, LabTest, Laboratory, TestResult
+
+PATIENT_ID = '200'
+
+
+class LabOrderQueryCountTests(TestCase):
+    """
+    Lab orders are listed with their laboratory, tests and results, and a
+    result is recorded, with a fixed number of queries whatever the number of
+    orders or of tests in an order.
+    """
+    databases = {'default', 'laboratory_db'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.technician = User.objects.create_user(
+            username='technician', email='technician@example.com', password='password', role='LAB_TECHNICIAN'
+        )
+        cls.laboratory = Laboratory.objects.create(
+            lab_id='LAB1', name='Main laboratory', department='Pathology', location='Floor 1',
+            contact_number='555-0100', email='lab@example.com'
+        )
+        LabTest.objects.bulk_create([
+            LabTest(
+                test_id=f'TEST{i:03d}', name=f'Test {i}', category='Blood', description='Blood test',
+                price='10.00', turn_around_time=24, sample_type='Blood'
+            )
+            for i in range(50)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.technician)
+
+    def create_orders(self, count, tests_per_order=2):
+        LabOrder.objects.bulk_create([
+            LabOrder(order_id=f'LO{i:05d}', patient_id=PATIENT_ID, doctor_id='100', laboratory=self.laboratory)
+            for i in range(count)
+        ])
+        tests = list(LabTest.objects.all()[:tests_per_order])
+        LabOrderTest.objects.bulk_create([
+            LabOrderTest(order=order, test=test) for order in LabOrder.objects.all() for test in tests
+        ])
+        TestResult.objects.bulk_create([
+            TestResult(result_id=f'RES{order_test.pk:05d}', order_test=order_test, result_value='5.0',
+                       performed_by=str(self.technician.pk))
+            for order_test in LabOrderTest.objects.filter(test=tests[0])
+        ])
+
+    def test_list(self):
+        for count in (1, 200):
+            with self.subTest(orders=count):
+                LabOrder.objects.all().delete()
+                self.create_orders(count)
+                with self.assertNumQueries(2, using='laboratory_db'):
+                    response = self.client.get('/api/laboratory/orders/?page_size=500')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), count)
+                order_tests = response.data['results'][0]['tests']
+                self.assertEqual(len(order_tests), 2)
+                self.assertEqual(sum(order_test['result'] is not None for order_test in order_tests), 1)
+                self.assertEqual(response.data['results'][0]['laboratory_details']['lab_id'], 'LAB1')
+
+    def record_result(self, order_test):
+        return self.client.post('/api/laboratory/results/', {
+            'order_test': order_test.pk, 'result_value': '5.0', 'performed_by': str(self.technician.pk)
+        }, format='json')
+
+    def test_order_completion_check(self):
+        for tests_per_order in (2, 50):
+            with self.subTest(tests=tests_per_order):
+                LabOrder.objects.all().delete()
+                self.create_orders(1, tests_per_order)
+                order = LabOrder.objects.get()
+                pending = list(LabOrderTest.objects.filter(result__isnull=True).order_by('pk'))
+
+                # Recording a result checks the rest of the order with one EXISTS query
+                for order_test in pending[:-1]:
+                    with self.assertNumQueries(7, using='laboratory_db'):
+                        self.assertEqual(self.record_result(order_test).status_code, 201)
+                order.refresh_from_db()
+                self.assertEqual(order.status, 'ORDERED')
+
+                LabOrderTest.objects.filter(result__isnull=False).update(status='REPORTED')
+                with self.assertNumQueries(8, using='laboratory_db'):
+                    self.assertEqual(self.record_result(pending[-1]).status_code, 201)
+                order.refresh_from_db()
+                self.assertEqual(order.status, 'REPORTED')
@@ -1,8 +1,10 @@
 from django.shortcuts import render, get_object_or_404
 from rest_framework import viewsets, permissions, status, filters
+from django.db.models import Prefetch
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from auth_service.models import UserRole
 from .models import Laboratory, LabTest, LabOrder, LabOrderTest, TestResult
 from .serializers import (
     LaboratorySerializer, 
@@ -35,6 +37,7 @@ class LaboratoryViewSet(viewsets.ModelViewSet):
     filterset_fields = ['department', 'is_active']
     search_fields = ['name', 'lab_id', 'department', 'location']
     ordering_fields = ['name', 'department']
+    ordering = ['-created_at', '-id']
     
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -59,6 +62,7 @@ class LabTestViewSet(viewsets.ModelViewSet):
     filterset_fields = ['category', 'sample_type', 'is_active']
     search_fields = ['name', 'test_id', 'description', 'category']
     ordering_fields = ['name', 'category', 'price']
+    ordering = ['-created_at', '-id']
     
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -82,6 +86,14 @@ class LabOrderViewSet(viewsets.ModelViewSet):
     filterset_fields = ['patient_id', 'doctor_id', 'laboratory', 'status', 'priority']
     search_fields = ['order_id', 'patient_id', 'doctor_id', 'notes']
     ordering_fields = ['ordered_date', 'scheduled_date']
+    ordering = ['-created_at', '-id']
+    
+    def get_queryset(self):
+        # Load the laboratory, the order tests and their test and result with
+        # a fixed number of queries, however many orders and tests are listed
+        return LabOrder.objects.select_related('laboratory').prefetch_related(
+            Prefetch('tests', queryset=LabOrderTest.objects.select_related('test', 'result'))
+        )
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -206,7 +218,11 @@ class LabOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        orders = LabOrder.objects.filter(patient_id=patient_id)
+        orders = self.get_queryset().filter(patient_id=patient_id)
+        page = self.paginate_queryset(orders)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(orders, many=True)
         return Response(serializer.data)
     
@@ -220,7 +236,11 @@ class LabOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        orders = LabOrder.objects.filter(doctor_id=doctor_id)
+        orders = self.get_queryset().filter(doctor_id=doctor_id)
+        page = self.paginate_queryset(orders)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(orders, many=True)
         return Response(serializer.data)
     
@@ -234,7 +254,11 @@ class LabOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        orders = LabOrder.objects.filter(laboratory_id=laboratory_id)
+        orders = self.get_queryset().filter(laboratory_id=laboratory_id)
+        page = self.paginate_queryset(orders)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(orders, many=True)
         return Response(serializer.data)
 
@@ -248,6 +272,7 @@ class TestResultViewSet(viewsets.ModelViewSet):
     filterset_fields = ['abnormal_flag', 'order_test__order__patient_id', 'order_test__order__doctor_id']
     search_fields = ['result_id', 'comments', 'order_test__order__order_id']
     ordering_fields = ['performed_date', 'verified_date']
+    ordering = ['-created_at', '-id']
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -286,8 +311,8 @@ class TestResultViewSet(viewsets.ModelViewSet):
         
         # Check if all tests in the order are reported, then update the order status
         order = order_test.order
-        all_tests_reported = all(test.status == 'REPORTED' for test in order.tests.all())
-        if all_tests_reported:
+        has_unreported_tests = order.tests.exclude(status='REPORTED').exists()
+        if not has_unreported_tests:
             order.status = 'REPORTED'
             order.save()
     
@@ -335,5 +360,9 @@ class TestResultViewSet(viewsets.ModelViewSet):
             )
         
         results = TestResult.objects.filter(order_test__order__patient_id=patient_id)
+        page = self.paginate_queryset(results)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(results, many=True)
         return Response(serializer.data)
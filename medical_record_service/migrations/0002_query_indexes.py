@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical_record_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='medicalrecord',
+            name='medical_rec_patient_98186b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='medicalrecord',
+            name='medical_rec_provide_2dbe34_idx',
+        ),
+        migrations.AddIndex(
+            model_name='medicalrecord',
+            index=models.Index(fields=['patient_id', 'created_at'], name='medical_rec_patient_bfaf9b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicalrecord',
+            index=models.Index(fields=['provider_id', 'created_at'], name='medical_rec_provide_951546_idx'),
+        ),
+    ]
@@ -151,10 +151,10 @@ class MedicalRecord(models.Model):
     class Meta:
         db_table = 'medical_records'
         indexes = [
-            models.Index(fields=['patient_id']),
+            models.Index(fields=['patient_id', 'created_at']),
             models.Index(fields=['record_id']),
             models.Index(fields=['visit_date']),
-            models.Index(fields=['provider_id'])
+            models.Index(fields=['provider_id', 'created_at'])
         ]
     
     def __str__(self):
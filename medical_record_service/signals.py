@@ -0,0 +1,33 @@
+"""Publish the recent records section of the patient summary and clear the doctor dashboard counters"""
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from healthcare import doctor_dashboard
+from healthcare.patient_summary import register_section, schedule_publish
+
+from .models import MedicalRecord
+from .serializers import MedicalRecordSerializer
+
+SUMMARY_SECTION = 'recent_records'
+SUMMARY_LIMIT = 10
+
+
+def recent_records(patient_id):
+    records = MedicalRecord.objects.filter(patient_id=patient_id).order_by('-created_at', '-id')[:SUMMARY_LIMIT]
+    return MedicalRecordSerializer(records, many=True).data
+
+
+def patients_with_records():
+    return MedicalRecord.objects.order_by().values_list('patient_id', flat=True).distinct()
+
+
+register_section(SUMMARY_SECTION, recent_records, patients_with_records)
+
+
+@receiver(post_save, sender=MedicalRecord)
+@receiver(post_delete, sender=MedicalRecord)
+def medical_record_changed(sender, instance, **kwargs):
+    using = router.db_for_write(MedicalRecord)
+    schedule_publish(instance.patient_id, SUMMARY_SECTION, using)
+    doctor_dashboard.invalidate_stats(instance.provider_id, using)
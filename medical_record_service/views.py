@@ -18,6 +18,7 @@ class MedicalRecordViewSet(viewsets.ModelViewSet):
     filterset_fields = ['patient_id', 'provider_id', 'status', 'visit_type']
     search_fields = ['record_id', 'diagnosis', 'chief_complaint', 'treatment_plan']
     ordering_fields = ['visit_date', 'created_at', 'updated_at']
+    ordering = ['-created_at', '-id']
     
     def get_permissions(self):
         if self.action == 'create':
@@ -169,6 +170,10 @@ class MedicalRecordViewSet(viewsets.ModelViewSet):
             )
         
         records = MedicalRecord.objects.filter(patient_id=patient_id)
+        page = self.paginate_queryset(records)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(records, many=True)
         return Response(serializer.data)
     
@@ -183,5 +188,9 @@ class MedicalRecordViewSet(viewsets.ModelViewSet):
             )
         
         records = MedicalRecord.objects.filter(provider_id=provider_id)
+        page = self.paginate_queryset(records)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(records, many=True)
         return Response(serializer.data)
@@ -13,6 +13,7 @@ class MedicineViewSet(viewsets.ModelViewSet):
     filterset_fields = ['dosage_form', 'requires_prescription', 'is_controlled_substance', 'manufacturer']
     search_fields = ['name', 'generic_name', 'ndc_code', 'description']
     ordering_fields = ['name', 'price', 'created_at']
+    ordering = ['-created_at', '-id']
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -29,12 +30,20 @@ class MedicineViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def prescription_required(self, request):
         medicines = Medicine.objects.filter(requires_prescription=True)
+        page = self.paginate_queryset(medicines)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(medicines, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def controlled_substances(self, request):
         medicines = Medicine.objects.filter(is_controlled_substance=True)
+        page = self.paginate_queryset(medicines)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(medicines, many=True)
         return Response(serializer.data)
     
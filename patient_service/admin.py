@@ -1,8 +1,14 @@
 from django.contrib import admin
-from .models import Patient
+from .models import Patient, PatientSummary
 
 @admin.register(Patient)
 class PatientAdmin(admin.ModelAdmin):
     list_display = ('id', 'user_id', 'date_of_birth', 'blood_type', 'emergency_contact', 'created_at')
     search_fields = ('user_id', 'blood_type', 'emergency_contact')
     list_filter = ('blood_type', 'created_at')
+
+
+@admin.register(PatientSummary)
+class PatientSummaryAdmin(admin.ModelAdmin):
+    list_display = ('patient_id', 'created_at', 'updated_at')
+    search_fields = ('patient_id',)
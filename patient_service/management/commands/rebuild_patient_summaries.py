@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from healthcare.patient_summary import SECTION_BUILDERS, publish_section
+from healthcare.service_dispatch import ServiceCallError
+
+
+class Command(BaseCommand):
+    help = ('Republish the patient summary sections of the services installed here, for every patient '
+            'with data in them. Run after loading data without signals, or nightly to drop past appointments.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--section', action='append', choices=sorted(SECTION_BUILDERS),
+                            help='Only republish this section (can be repeated)')
+        parser.add_argument('--patient', action='append',
+                            help='Only republish the summary of this patient ID (can be repeated)')
+
+    def handle(self, *args, **options):
+        sections = options['section'] or sorted(SECTION_BUILDERS)
+        if not sections:
+            raise CommandError('No patient summary sections are registered by the installed services')
+
+        failed = 0
+        for section in sections:
+            patient_ids = options['patient'] or SECTION_BUILDERS[section][1]()
+            published = 0
+            for patient_id in patient_ids:
+                try:
+                    publish_section(patient_id, section)
+                    published += 1
+                except ServiceCallError as e:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f"{section} of patient {patient_id}: {e}"))
+            self.stdout.write(f"{section}: published {published} patients")
+
+        if failed:
+            raise CommandError(f"{failed} sections could not be published")
+        self.stdout.write(self.style.SUCCESS('Patient summaries rebuilt'))
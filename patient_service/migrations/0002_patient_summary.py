@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:12
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patient_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('patient_id', models.CharField(max_length=50, unique=True)),
+                ('upcoming_appointments', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('active_prescriptions', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('recent_records', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('abnormal_results', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 class Patient(models.Model):
@@ -11,3 +12,23 @@ class Patient(models.Model):
 
     def __str__(self):
         return f"Patient {self.user_id}"
+
+
+class PatientSummary(models.Model):
+    """
+    Denormalized per-patient read model for opening a chart with one lookup.
+    Each section is kept up to date by the service that owns its data (see
+    healthcare/patient_summary.py) and holds that service's serialized entries.
+    """
+    SECTIONS = ('upcoming_appointments', 'active_prescriptions', 'recent_records', 'abnormal_results')
+
+    patient_id = models.CharField(max_length=50, unique=True)
+    upcoming_appointments = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    active_prescriptions = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    recent_records = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    abnormal_results = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Summary of patient {self.patient_id}"
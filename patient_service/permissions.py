@@ -10,3 +10,4 @@ class IsPatientOwnerOrStaff(permissions.BasePermission):
 
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated
+
@@ -0,0 +1,122 @@
+"""
+The patient summary.
+
+The summary is served from the PatientSummary read model, whose sections the
+owning services publish as their data changes (healthcare/patient_summary.py).
+The live variant fetches the parts concurrently from those services instead.
+Other services' modules are imported inside the functions, so this module
+loads whether or not those apps are installed here.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from healthcare.aggregation import Source
+
+from .models import PatientSummary
+
+# Entries returned per part of the summary
+SUMMARY_LIMIT = 10
+
+
+def recent_appointments(patient_id, limit):
+    from appointment_service.serializers import AppointmentSerializer
+    from appointment_service.views import AppointmentViewSet
+
+    appointments = AppointmentViewSet().get_queryset().filter(
+        patient_id=patient_id
+    ).order_by(*AppointmentViewSet.ordering)[:limit]
+    return AppointmentSerializer(appointments, many=True).data
+
+
+def recent_prescriptions(patient_id, limit):
+    from prescription_service.models import Prescription
+    from prescription_service.serializers import PrescriptionSerializer
+    from prescription_service.views import PrescriptionViewSet
+
+    prescriptions = Prescription.objects.filter(
+        patient_id=patient_id
+    ).order_by(*PrescriptionViewSet.ordering)[:limit]
+    return PrescriptionSerializer(prescriptions, many=True).data
+
+
+def recent_medical_records(patient_id, limit):
+    from medical_record_service.models import MedicalRecord
+    from medical_record_service.serializers import MedicalRecordSerializer
+    from medical_record_service.views import MedicalRecordViewSet
+
+    records = MedicalRecord.objects.filter(
+        patient_id=patient_id
+    ).order_by(*MedicalRecordViewSet.ordering)[:limit]
+    return MedicalRecordSerializer(records, many=True).data
+
+
+def recent_lab_results(patient_id, limit):
+    from laboratory_service.models import TestResult
+    from laboratory_service.serializers import TestResultSerializer
+    from laboratory_service.views import TestResultViewSet
+
+    results = TestResult.objects.filter(
+        order_test__order__patient_id=patient_id
+    ).order_by(*TestResultViewSet.ordering)[:limit]
+    return TestResultSerializer(results, many=True).data
+
+
+SUMMARY_SOURCES = {
+    'appointments': Source(
+        'appointment', recent_appointments, '/api/appointments/',
+        {'patient_id': '{patient_id}', 'page_size': '{limit}'}
+    ),
+    'prescriptions': Source(
+        'prescription', recent_prescriptions, '/api/prescriptions/',
+        {'patient_id': '{patient_id}', 'page_size': '{limit}'}
+    ),
+    'medical_records': Source(
+        'medical_record', recent_medical_records, '/api/medical-records/records/',
+        {'patient_id': '{patient_id}', 'page_size': '{limit}'}
+    ),
+    'lab_results': Source(
+        'laboratory', recent_lab_results, '/api/laboratory/results/',
+        {'order_test__order__patient_id': '{patient_id}', 'page_size': '{limit}'}
+    ),
+}
+
+
+def store_summary_section(data):
+    """
+    Replace one section of a patient's summary with ``data['entries']``,
+    creating the summary on the first section received
+    """
+    patient_id = str(data.get('patient_id') or '')
+    section = data.get('section')
+    entries = data.get('entries')
+    if not patient_id:
+        raise ValidationError({'patient_id': 'This field is required.'})
+    if section not in PatientSummary.SECTIONS:
+        raise ValidationError({'section': f"Must be one of {', '.join(PatientSummary.SECTIONS)}."})
+    if not isinstance(entries, list):
+        raise ValidationError({'entries': 'Must be a list.'})
+
+    # Only the published section is written, so services updating other
+    # sections of the same patient at the same time do not overwrite each other
+    fields = {section: entries, 'updated_at': timezone.now()}
+    if not PatientSummary.objects.filter(patient_id=patient_id).update(**fields):
+        try:
+            with transaction.atomic(using=PatientSummary.objects.db):
+                PatientSummary.objects.create(patient_id=patient_id, **{section: entries})
+        except IntegrityError:
+            # Created concurrently by another section's update
+            PatientSummary.objects.filter(patient_id=patient_id).update(**fields)
+    return {'patient_id': patient_id, 'section': section, 'entries': len(entries)}
+
+
+def current_upcoming_appointments(entries, now=None):
+    """Drop the appointments whose time has passed since the section was published"""
+    now = now or timezone.now()
+    upcoming = []
+    for entry in entries:
+        start_time = parse_datetime((entry.get('time_slot_details') or {}).get('start_time') or '')
+        if start_time is None or start_time >= now:
+            upcoming.append(entry)
+    return upcoming
@@ -1,3 +1,87 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from auth_service.models import User
+
+from .models import PatientSummary
+from .summary import current_upcoming_appointments, store_summary_section
+
+SECTION_URL = '/api/patients/summary-sections/'
+
+
+class StoreSummarySectionTests(TestCase):
+    def test_first_section_creates_the_summary(self):
+        store_summary_section({'patient_id': '7', 'section': 'recent_records', 'entries': [{'id': 1}]})
+
+        summary = PatientSummary.objects.get(patient_id='7')
+        self.assertEqual(summary.recent_records, [{'id': 1}])
+        self.assertEqual(summary.upcoming_appointments, [])
+
+    def test_section_update_keeps_the_other_sections(self):
+        store_summary_section({'patient_id': '7', 'section': 'recent_records', 'entries': [{'id': 1}]})
+        store_summary_section({'patient_id': '7', 'section': 'abnormal_results', 'entries': [{'id': 2}]})
+        store_summary_section({'patient_id': '7', 'section': 'recent_records', 'entries': [{'id': 3}]})
+
+        summary = PatientSummary.objects.get(patient_id='7')
+        self.assertEqual(summary.recent_records, [{'id': 3}])
+        self.assertEqual(summary.abnormal_results, [{'id': 2}])
+
+    def test_invalid_sections_are_rejected(self):
+        for data in [
+            {'section': 'recent_records', 'entries': []},
+            {'patient_id': '7', 'section': 'billing', 'entries': []},
+            {'patient_id': '7', 'section': 'recent_records', 'entries': {}},
+        ]:
+            with self.subTest(data=data), self.assertRaises(ValidationError):
+                store_summary_section(data)
+        self.assertFalse(PatientSummary.objects.exists())
+
+
+class CurrentUpcomingAppointmentsTests(SimpleTestCase):
+    def test_past_appointments_are_dropped(self):
+        now = timezone.now()
+        entries = [
+            {'id': 1, 'time_slot_details': {'start_time': (now - timedelta(hours=1)).isoformat()}},
+            {'id': 2, 'time_slot_details': {'start_time': (now + timedelta(hours=1)).isoformat()}},
+            {'id': 3, 'time_slot_details': None},
+        ]
+        self.assertEqual([entry['id'] for entry in current_upcoming_appointments(entries, now)], [2, 3])
+
+
+@override_settings(INTERNAL_SERVICE_SECRET_TOKEN='s3cret')
+class SummarySectionEndpointTests(TestCase):
+    data = {'patient_id': '7', 'section': 'recent_records', 'entries': [{'id': 1}]}
+
+    def post(self, client=None, **headers):
+        return (client or APIClient()).post(SECTION_URL, self.data, format='json', **headers)
+
+    def test_service_token_is_accepted(self):
+        response = self.post(HTTP_X_INTERNAL_SERVICE_TOKEN='s3cret')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(PatientSummary.objects.filter(patient_id='7').exists())
+
+    def test_staff_is_accepted(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(
+            username='admin', email='admin@example.com', password='password', is_staff=True
+        ))
+        self.assertEqual(self.post(client).status_code, 200)
+
+    def test_other_callers_are_rejected(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(
+            username='patient', email='patient@example.com', password='password'
+        ))
+        self.assertEqual(self.post().status_code, 401)
+        self.assertEqual(self.post(HTTP_X_INTERNAL_SERVICE_TOKEN='guess').status_code, 401)
+        self.assertEqual(self.post(client).status_code, 403)
+        self.assertFalse(PatientSummary.objects.exists())
+
+    @override_settings(INTERNAL_SERVICE_SECRET_TOKEN='')
+    def test_token_is_ignored_when_none_is_configured(self):
+        self.assertEqual(self.post(HTTP_X_INTERNAL_SERVICE_TOKEN='').status_code, 401)
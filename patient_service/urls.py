@@ -5,6 +5,17 @@ urlpatterns = [
     path('', views.PatientListView.as_view(), name='patient-list'),
     path('create/', views.PatientCreateView.as_view(), name='patient-create'),
     path('<int:pk>/', views.PatientDetailView.as_view(), name='patient-detail'),
+    path('summary-sections/', views.PatientSummarySectionView.as_view(), name='patient-summary-sections'),
+    path('<int:pk>/summary/', views.PatientSummaryView.as_view(), name='patient-summary'),
+    path('<int:pk>/summary/live/', views.live_patient_summary, name='patient-summary-live'),
+    path('<int:pk>/appointments/', views.PatientSummaryView.as_view(section='upcoming_appointments'),
+         name='patient-appointments'),
+    path('<int:pk>/prescriptions/', views.PatientSummaryView.as_view(section='active_prescriptions'),
+         name='patient-prescriptions'),
+    path('<int:pk>/medical-records/', views.PatientSummaryView.as_view(section='recent_records'),
+         name='patient-medical-records'),
+    path('<int:pk>/lab-results/', views.PatientSummaryView.as_view(section='abnormal_results'),
+         name='patient-lab-results'),
 ]
 
 
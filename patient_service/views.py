@@ -1,9 +1,19 @@
+from asgiref.sync import sync_to_async
+from django.db.models import CharField, Subquery
+from django.db.models.functions import Cast
+from django.http import JsonResponse
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
-import requests
-from .models import Patient
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from healthcare.aggregation import fan_out
+from healthcare.permissions import IsInternalService
+from healthcare.user_enrichment import attach_user_details, USER_CONTACT_FIELDS
+from .models import Patient, PatientSummary
 from .serializers import PatientSerializer
 from .permissions import IsPatientOwnerOrStaff
+from .summary import SUMMARY_LIMIT, SUMMARY_SOURCES, current_upcoming_appointments, store_summary_section
 
 class PatientCreateView(generics.CreateAPIView):
     queryset = Patient.objects.all()
@@ -41,34 +51,111 @@ class PatientListView(generics.ListAPIView):
         return Patient.objects.all()
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        data = []
-        for patient in queryset:
-            patient_data = PatientSerializer(patient).data
-            try:
-                auth_service_url = f'http://localhost:8000/api/auth/internal/user/{patient.user_id}/'
-                response = requests.get(auth_service_url)
-                response.raise_for_status()
-                user_data = response.json()
-
-                patient_data['username'] = user_data.get('username')
-                patient_data['email'] = user_data.get('email')
-                patient_data['first_name'] = user_data.get('first_name')
-                patient_data['last_name'] = user_data.get('last_name')
-                patient_data['phone_number'] = user_data.get('phone_number')
-            except requests.exceptions.RequestException as e:
-                patient_data['username'] = 'N/A'
-                patient_data['email'] = 'N/A'
-                patient_data['first_name'] = 'N/A'
-                patient_data['last_name'] = 'N/A'
-                patient_data['phone_number'] = 'N/A'
-            except Exception as e:
-                patient_data['username'] = 'Error'
-                patient_data['email'] = 'Error'
-                patient_data['first_name'] = 'Error'
-                patient_data['last_name'] = 'Error'
-                patient_data['phone_number'] = 'Error'
-
-            data.append(patient_data)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        patients = page if page is not None else list(queryset)
+
+        # Resolve user details for every patient on the page in one lookup
+        data = self.get_serializer(patients, many=True).data
+        attach_user_details(data, [patient.user_id for patient in patients], fields=USER_CONTACT_FIELDS)
+
+        if page is not None:
+            return self.get_paginated_response(data)
         return Response(data)
 
+
+# Roles that may open any patient's summary; patients may open their own
+SUMMARY_STAFF_ROLES = ('DOCTOR', 'NURSE', 'ADMINISTRATOR')
+
+
+def can_view_summary(user, patient_user_id):
+    return user.role in SUMMARY_STAFF_ROLES or patient_user_id == user.id
+
+
+class PatientSummaryView(APIView):
+    """
+    The patient's summary from the PatientSummary read model: upcoming
+    appointments, active prescriptions, recent medical records and abnormal
+    lab results, read with a single indexed lookup. With ``section`` set, the
+    view returns that section alone as a list.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    section = None
+
+    def get(self, request, pk, format=None):
+        patient_user_id = Patient.objects.filter(pk=pk).values('user_id')[:1]
+        summary = PatientSummary.objects.filter(
+            patient_id=Cast(Subquery(patient_user_id), CharField())
+        ).first()
+        if summary is None:
+            # No section published yet, or no such patient
+            patient = Patient.objects.filter(pk=pk).first()
+            if patient is None:
+                return Response({"error": "Patient not found"}, status=status.HTTP_404_NOT_FOUND)
+            summary = PatientSummary(patient_id=str(patient.user_id))
+
+        if not can_view_summary(request.user, int(summary.patient_id)):
+            return Response(
+                {"error": "You can only access your own summary"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        sections = {name: getattr(summary, name) for name in PatientSummary.SECTIONS}
+        sections['upcoming_appointments'] = current_upcoming_appointments(sections['upcoming_appointments'])
+        if self.section:
+            return Response(sections[self.section])
+        return Response({'patient_id': summary.patient_id, **sections, 'updated_at': summary.updated_at})
+
+
+class PatientSummarySectionView(APIView):
+    """Internal endpoint the services publish their patient summary sections to"""
+    permission_classes = [IsInternalService]
+
+    def post(self, request, format=None):
+        return Response(store_summary_section(request.data))
+
+
+def _summary_patient(request, pk):
+    """Authenticate the request and load the patient with their user details"""
+    authenticated = JWTAuthentication().authenticate(request)
+    if authenticated is None:
+        raise AuthenticationFailed('Authentication credentials were not provided.')
+    user = authenticated[0]
+
+    patient = Patient.objects.filter(pk=pk).first()
+    if patient is None:
+        return user, None
+    data = PatientSerializer(patient).data
+    attach_user_details([data], [patient.user_id], fields=USER_CONTACT_FIELDS)
+    return user, data
+
+
+async def live_patient_summary(request, pk):
+    """
+    The patient with their recent appointments, prescriptions, medical records
+    and lab results, fetched from the four services concurrently. Parts that
+    fail or time out are listed in ``errors`` and the rest is still returned.
+    """
+    try:
+        user, patient = await sync_to_async(_summary_patient)(request, pk)
+    except AuthenticationFailed as e:
+        return JsonResponse({"error": str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    if patient is None:
+        return JsonResponse({"error": "Patient not found"}, status=status.HTTP_404_NOT_FOUND)
+    if not can_view_summary(user, patient['user_id']):
+        return JsonResponse(
+            {"error": "You can only access your own summary"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    headers = {'Authorization': request.headers['Authorization']}
+    data, errors = await fan_out(
+        SUMMARY_SOURCES, {'patient_id': str(patient['user_id']), 'limit': SUMMARY_LIMIT}, headers=headers
+    )
+    return JsonResponse({
+        'patient': patient,
+        **{name: data.get(name) for name in SUMMARY_SOURCES},
+        'errors': errors,
+        'partial': bool(errors),
+    })
+
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymenttransaction',
+            index=models.Index(fields=['patient_id', 'created_at'], name='payment_tra_patient_9bcae5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='paymenttransaction',
+            index=models.Index(fields=['payment_status', 'created_at'], name='payment_tra_payment_bce5b2_idx'),
+        ),
+    ]
@@ -40,6 +40,10 @@ class PaymentTransaction(models.Model):
     class Meta:
         db_table = "payment_transactions"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["patient_id", "created_at"]),
+            models.Index(fields=["payment_status", "created_at"])
+        ]
 
 class InsuranceClaimProcessing(models.Model):
     CLAIM_STATUS_CHOICES = [
@@ -28,6 +28,7 @@ class PaymentTransactionViewSet(viewsets.ModelViewSet):
     filterset_fields = ['patient_id', 'service_type', 'insurance_provider_id', 'payment_status']
     search_fields = ['originating_service_record_id', 'patient_id']
     ordering_fields = ['created_at', 'total_amount']
+    ordering = ['-created_at', '-id']
 
     def get_permissions(self):
         if self.action == 'create_transaction_internal':
@@ -212,3 +213,4 @@ class InsuranceClaimProcessingViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['payment_transaction__patient_id', 'insurance_provider_id', 'status']
     search_fields = ['claim_identifier', 'payment_transaction__originating_service_record_id']
+    ordering = ['-submitted_at', '-id']
@@ -1,7 +1,7 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-import requests
+from healthcare.user_enrichment import attach_user_details
 from .models import Pharmacist
 from .serializers import PharmacistSerializer
 from .permissions import IsPharmacist
@@ -21,56 +21,23 @@ class PharmacistViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
     
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        data = []
-        for pharmacist in queryset:
-            pharmacist_data = PharmacistSerializer(pharmacist).data
-            try:
-                # Fetch user details from auth service
-                auth_service_url = f'http://localhost:8000/api/auth/internal/user/{pharmacist.user_id}/'
-                response = requests.get(auth_service_url)
-                response.raise_for_status()
-                user_data = response.json()
-                
-                # Add user data to the pharmacist data
-                pharmacist_data['username'] = user_data.get('username')
-                pharmacist_data['email'] = user_data.get('email')
-                pharmacist_data['first_name'] = user_data.get('first_name')
-                pharmacist_data['last_name'] = user_data.get('last_name')
-            except Exception as e:
-                # Handle case when auth service is unavailable
-                pharmacist_data['username'] = 'N/A'
-                pharmacist_data['email'] = 'N/A'
-                pharmacist_data['first_name'] = 'N/A'
-                pharmacist_data['last_name'] = 'N/A'
-                
-            data.append(pharmacist_data)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        pharmacists = page if page is not None else list(queryset)
+
+        # Resolve user details for every pharmacist on the page in one lookup
+        data = self.get_serializer(pharmacists, many=True).data
+        attach_user_details(data, [pharmacist.user_id for pharmacist in pharmacists])
+
+        if page is not None:
+            return self.get_paginated_response(data)
         return Response(data)
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         serializer = self.get_serializer(instance)
         data = serializer.data
-        
-        # Fetch user details from auth service
-        try:
-            auth_service_url = f'http://localhost:8000/api/auth/internal/user/{instance.user_id}/'
-            response = requests.get(auth_service_url)
-            response.raise_for_status()
-            user_data = response.json()
-            
-            # Add user data to the response
-            data['username'] = user_data.get('username')
-            data['email'] = user_data.get('email')
-            data['first_name'] = user_data.get('first_name')
-            data['last_name'] = user_data.get('last_name')
-        except Exception as e:
-            # Handle case when auth service is unavailable
-            data['username'] = 'N/A'
-            data['email'] = 'N/A'
-            data['first_name'] = 'N/A'
-            data['last_name'] = 'N/A'
-            
+        attach_user_details([data], [instance.user_id])
         return Response(data)
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['patient_id', 'order_date'], name='pharmacy_or_patient_b76585_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'order_date'], name='pharmacy_or_status_1ba9d3_idx'),
+        ),
+    ]
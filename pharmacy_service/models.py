@@ -57,6 +57,10 @@ class Order(models.Model):
     
     class Meta:
         db_table = 'pharmacy_orders'
+        indexes = [
+            models.Index(fields=['patient_id', 'order_date']),
+            models.Index(fields=['status', 'order_date'])
+        ]
 
 
 class OrderItem(models.Model):
@@ -66,6 +66,7 @@ class OrderViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['pharmacy', 'status', 'patient_id']
     search_fields = ['patient_name', 'prescription_id']
+    ordering = ['-order_date', '-id']
     
     def get_serializer_class(self):
         if self.action in ['create']:
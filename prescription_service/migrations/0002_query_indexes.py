@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prescription_service', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['patient_id', 'created_at'], name='prescriptio_patient_50dfd5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['doctor_id', 'created_at'], name='prescriptio_doctor__2c554b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['status', 'created_at'], name='prescriptio_status_480f47_idx'),
+        ),
+    ]
@@ -79,6 +79,11 @@ class Prescription(models.Model):
     
     class Meta:
         db_table = 'prescriptions'
+        indexes = [
+            models.Index(fields=['patient_id', 'created_at']),
+            models.Index(fields=['doctor_id', 'created_at']),
+            models.Index(fields=['status', 'created_at'])
+        ]
     
     def __str__(self):
         return f"Prescription {self.prescription_id} for Patient {self.patient_id}"
@@ -0,0 +1,33 @@
+"""Publish the active prescriptions section of the patient summary"""
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from healthcare.patient_summary import register_section, schedule_publish
+
+from .models import Prescription
+from .serializers import PrescriptionSerializer
+
+SUMMARY_SECTION = 'active_prescriptions'
+SUMMARY_LIMIT = 20
+ACTIVE_STATUSES = ('CREATED', 'DISPENSED')
+
+
+def active_prescriptions(patient_id):
+    prescriptions = Prescription.objects.filter(
+        patient_id=patient_id, status__in=ACTIVE_STATUSES
+    ).order_by('-created_at', '-id')[:SUMMARY_LIMIT]
+    return PrescriptionSerializer(prescriptions, many=True).data
+
+
+def patients_with_prescriptions():
+    return Prescription.objects.order_by().values_list('patient_id', flat=True).distinct()
+
+
+register_section(SUMMARY_SECTION, active_prescriptions, patients_with_prescriptions)
+
+
+@receiver(post_save, sender=Prescription)
+@receiver(post_delete, sender=Prescription)
+def prescription_changed(sender, instance, **kwargs):
+    schedule_publish(instance.patient_id, SUMMARY_SECTION, router.db_for_write(Prescription))
@@ -17,6 +17,7 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
     filterset_fields = ['patient_id', 'doctor_id', 'status', 'pharmacy_id', 'is_refillable']
     search_fields = ['prescription_id', 'diagnosis', 'notes']
     ordering_fields = ['date_prescribed', 'created_at', 'updated_at']
+    ordering = ['-created_at', '-id']
     
     def get_permissions(self):
         if self.action == 'create':
@@ -135,6 +136,10 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
             )
         
         prescriptions = Prescription.objects.filter(patient_id=patient_id)
+        page = self.paginate_queryset(prescriptions)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(prescriptions, many=True)
         return Response(serializer.data)
     
@@ -149,5 +154,9 @@ class PrescriptionViewSet(viewsets.ModelViewSet):
             )
         
         prescriptions = Prescription.objects.filter(doctor_id=doctor_id)
+        page = self.paginate_queryset(prescriptions)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(prescriptions, many=True)
         return Response(serializer.data)
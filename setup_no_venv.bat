@@ -15,6 +15,7 @@ echo Running migrations...
 
 REM Default database migrations (MySQL)
 python manage.py migrate
+python manage.py createcachetable
 
 REM Migrations for all the service-specific databases
 python manage.py migrate --database=pharmacy_db
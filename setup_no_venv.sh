@@ -18,6 +18,7 @@ echo "Running migrations..."
 
 # Default database migrations (MySQL)
 python manage.py migrate
+python manage.py createcachetable
 
 # Migrations for all the service-specific databases
 python manage.py migrate --database=pharmacy_db
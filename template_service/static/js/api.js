@@ -0,0 +1,22 @@
+// Helpers shared by the page scripts for calling the service APIs
+
+// List endpoints return one page at a time as {next, previous, results}.
+// Fetch every page of a list by following the next links and return all of
+// its items; responses that are plain lists are returned as they are.
+async function fetchAllPages(url, options = {}) {
+    const items = [];
+    let next = url;
+    while (next) {
+        const response = await fetch(next, options);
+        if (!response.ok) {
+            throw new Error(`Request to ${next} failed with status ${response.status}`);
+        }
+        const data = await response.json();
+        if (Array.isArray(data)) {
+            return items.concat(data);
+        }
+        items.push(...data.results);
+        next = data.next;
+    }
+    return items;
+}
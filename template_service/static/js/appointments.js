@@ -17,8 +17,7 @@ const formatDateTime = (dateStr) => {
 async function loadAppointments(filters = {}) {
     try {
         let queryParams = new URLSearchParams(filters);
-        const response = await fetch(`${API_BASE_URL}/appointments/?${queryParams}`);
-        const appointments = await response.json();
+        const appointments = await fetchAllPages(`${API_BASE_URL}/appointments/?${queryParams}`);
 
         const appointmentsList = document.getElementById('appointmentsList');
         appointmentsList.innerHTML = '';
@@ -185,8 +184,7 @@ function getActiveFilters() {
 // Load doctors for filter and new appointment form
 async function loadDoctors() {
     try {
-        const response = await fetch(`${API_BASE_URL}/doctors/`);
-        const doctors = await response.json();
+        const doctors = await fetchAllPages(`${API_BASE_URL}/doctors/`);
 
         const doctorFilter = document.getElementById('doctorFilter');
         const doctorSelect = document.getElementById('doctorSelect');
@@ -204,8 +202,7 @@ async function loadDoctors() {
 
 async function loadPatients() {
     try {
-        const response = await fetch(`${API_BASE_URL}/patients/`);
-        const patients = await response.json();
+        const patients = await fetchAllPages(`${API_BASE_URL}/patients/`);
 
         const patientSelect = document.getElementById('patientSelect');
         patientSelect.innerHTML = '<option value="">Select Patient</option>';
@@ -13,11 +13,17 @@ const formatDateTime = (dateStr) => {
     });
 };
 
+function authHeaders() {
+    return { 'Authorization': `Bearer ${localStorage.getItem('authToken')}` };
+}
+
 // Load doctor's information and dashboard stats
 async function loadDoctorDashboard() {
     try {
         const doctorId = localStorage.getItem('doctorId');
-        const response = await fetch(`${API_BASE_URL}/doctors/${doctorId}/dashboard_stats/`);
+        const response = await fetch(`${API_BASE_URL}/doctors/${doctorId}/dashboard_stats/`, {
+            headers: authHeaders()
+        });
         const data = await response.json();
 
         // Update doctor info
@@ -42,7 +48,9 @@ async function loadDoctorDashboard() {
 async function loadTodayAppointments() {
     try {
         const doctorId = localStorage.getItem('doctorId');
-        const response = await fetch(`${API_BASE_URL}/doctors/${doctorId}/today_appointments/`);
+        const response = await fetch(`${API_BASE_URL}/doctors/${doctorId}/today_appointments/`, {
+            headers: authHeaders()
+        });
         const appointments = await response.json();
 
         const appointmentsList = document.getElementById('appointmentsList');
@@ -80,7 +88,9 @@ async function loadTodayAppointments() {
 async function loadRecentPatients() {
     try {
         const doctorId = localStorage.getItem('doctorId');
-        const response = await fetch(`${API_BASE_URL}/doctors/${doctorId}/recent_patients/`);
+        const response = await fetch(`${API_BASE_URL}/doctors/${doctorId}/recent_patients/`, {
+            headers: authHeaders()
+        });
         const patients = await response.json();
 
         const patientRecordsList = document.getElementById('patientRecordsList');
@@ -92,7 +102,7 @@ async function loadRecentPatients() {
                     <div class="d-flex justify-content-between align-items-center">
                         <div>
                             <h6 class="mb-1">${record.patient_name}</h6>
-                            <p class="mb-1"><small>Last Visit: ${formatDateTime(record.time_slot.start_time)}</small></p>
+                            <p class="mb-1"><small>Last Visit: ${formatDateTime(record.last_visit)}</small></p>
                         </div>
                         <button class="btn btn-sm btn-outline-primary" onclick="viewPatientRecord('${record.patient_id}')">
                             View Record
@@ -16,12 +16,11 @@ document.addEventListener('DOMContentLoaded', function() {
 });
 
 function loadInventoryData() {
-    fetch('/api/inventory/items/', {
+    fetchAllPages('/api/inventory/items/', {
         headers: {
             'Authorization': `Bearer ${localStorage.getItem('authToken')}`
         }
     })
-    .then(response => response.json())
     .then(data => {
         updateInventoryTable(data);
         updateInventoryStats(data);
@@ -93,12 +92,11 @@ function filterInventory() {
     if (status) url += `status=${status}&`;
     if (search) url += `search=${search}`;
 
-    fetch(url, {
+    fetchAllPages(url, {
         headers: {
             'Authorization': `Bearer ${localStorage.getItem('authToken')}`
         }
     })
-    .then(response => response.json())
     .then(data => {
         updateInventoryTable(data);
         updateInventoryStats(data);
@@ -24,12 +24,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load tests
     async function loadTests() {
         try {
-            const response = await fetch('/api/laboratory/tests/', {
+            const tests = await fetchAllPages('/api/laboratory/tests/', {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
-            const tests = await response.json();
             displayTests(tests);
         } catch (error) {
             console.error('Error loading tests:', error);
@@ -55,12 +54,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load doctors
     async function loadDoctors() {
         try {
-            const response = await fetch('/api/doctors/', {
+            const doctors = await fetchAllPages('/api/doctors/', {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
-            const doctors = await response.json();
             const doctorSelect = document.getElementById('doctorSelect');
             doctors.forEach(doctor => {
                 const option = document.createElement('option');
@@ -76,12 +74,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load patients
     async function loadPatients() {
         try {
-            const response = await fetch('/api/patients/', {
+            const patients = await fetchAllPages('/api/patients/', {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
-            const patients = await response.json();
             const patientSelect = document.getElementById('patientSelect');
             patients.forEach(patient => {
                 const option = document.createElement('option');
@@ -7,8 +7,8 @@ document.addEventListener('DOMContentLoaded', function() {
     const patientForm = document.getElementById('patientForm');
     const savePatientBtn = document.getElementById('savePatient');
     const editPatientBtn = document.getElementById('editPatient');
-    let currentPage = 1;
-    let totalPages = 1;
+    // Links to the neighbouring pages of the patient list (cursor pagination)
+    let pageLinks = {previous: null, next: null};
 
     // Load initial data
     loadPatients();
@@ -21,17 +21,17 @@ document.addEventListener('DOMContentLoaded', function() {
     savePatientBtn.addEventListener('click', savePatient);
     editPatientBtn.addEventListener('click', enablePatientEdit);
 
-    // Function to load patients
-    async function loadPatients(page = 1) {
+    // Function to load a page of patients, the first one by default
+    async function loadPatients(url = '/api/patients/') {
         try {
-            const response = await fetch(`/api/patients/?page=${page}`, {
+            const response = await fetch(url, {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
             const data = await response.json();
             displayPatients(data.results);
-            updatePagination(data.total_pages, page);
+            updatePagination(data);
         } catch (error) {
             console.error('Error loading patients:', error);
             showAlert('Error loading patients. Please try again.', 'danger');
@@ -141,37 +141,19 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
-    // Function to update pagination
-    function updatePagination(total, current) {
-        totalPages = total;
-        currentPage = current;
+    // Function to update pagination. The list is paginated by cursor, so
+    // there are no page numbers, only links to the previous and next pages
+    function updatePagination(data) {
+        pageLinks = {previous: data.previous, next: data.next};
         const pagination = document.getElementById('pagination');
-        let pages = '';
-
-        // Previous button
-        pages += `
-            <li class="page-item ${current === 1 ? 'disabled' : ''}">
-                <a class="page-link" href="#" onclick="changePage(${current - 1})">Previous</a>
+        pagination.innerHTML = `
+            <li class="page-item ${data.previous ? '' : 'disabled'}">
+                <a class="page-link" href="#" onclick="changePage('previous')">Previous</a>
             </li>
-        `;
-
-        // Page numbers
-        for (let i = 1; i <= total; i++) {
-            pages += `
-                <li class="page-item ${i === current ? 'active' : ''}">
-                    <a class="page-link" href="#" onclick="changePage(${i})">${i}</a>
-                </li>
-            `;
-        }
-
-        // Next button
-        pages += `
-            <li class="page-item ${current === total ? 'disabled' : ''}">
-                <a class="page-link" href="#" onclick="changePage(${current + 1})">Next</a>
+            <li class="page-item ${data.next ? '' : 'disabled'}">
+                <a class="page-link" href="#" onclick="changePage('next')">Next</a>
             </li>
         `;
-
-        pagination.innerHTML = pages;
     }
 
     // Function to filter patients
@@ -180,7 +162,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const status = statusFilter.value;
         const gender = genderFilter.value;
 
-        loadPatients(1); // Reset to first page with filters
+        loadPatients(); // Reset to first page with filters
     }
 
     // Helper function to calculate age
@@ -235,9 +217,9 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     // Expose necessary functions to window object
-    window.changePage = function(page) {
-        if (page > 0 && page <= totalPages) {
-            loadPatients(page);
+    window.changePage = function(direction) {
+        if (pageLinks[direction]) {
+            loadPatients(pageLinks[direction]);
         }
     };
 });
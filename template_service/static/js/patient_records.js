@@ -18,12 +18,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load patients
     async function loadPatients() {
         try {
-            const response = await fetch('/api/patients/', {
+            const patients = await fetchAllPages('/api/patients/', {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
-            const patients = await response.json();
             displayPatients(patients);
         } catch (error) {
             console.error('Error loading patients:', error);
@@ -22,12 +22,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load medicines
     async function loadMedicines() {
         try {
-            const response = await fetch('/api/medicines/', {
+            const medicines = await fetchAllPages('/api/medicines/', {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
-            const medicines = await response.json();
             displayMedicines(medicines);
         } catch (error) {
             console.error('Error loading medicines:', error);
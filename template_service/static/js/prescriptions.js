@@ -24,12 +24,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load doctors
     async function loadDoctors() {
         try {
-            const response = await fetch('/api/doctors/', {
+            const doctors = await fetchAllPages('/api/doctors/', {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
-            const doctors = await response.json();
             const doctorSelect = document.getElementById('doctorSelect');
             doctors.forEach(doctor => {
                 const option = document.createElement('option');
@@ -46,12 +45,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load patients
     async function loadPatients() {
         try {
-            const response = await fetch('/api/patients/', {
+            const patients = await fetchAllPages('/api/patients/', {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
-            const patients = await response.json();
             const patientSelect = document.getElementById('patientSelect');
             patients.forEach(patient => {
                 const option = document.createElement('option');
@@ -68,12 +66,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load medications
     async function loadMedications() {
         try {
-            const response = await fetch('/api/medications/', {
+            const medications = await fetchAllPages('/api/medications/', {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
-            const medications = await response.json();
             const medicationSelects = document.getElementsByClassName('medication-select');
             Array.from(medicationSelects).forEach(select => {
                 medications.forEach(medication => {
@@ -92,12 +89,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Function to load prescriptions
     async function loadPrescriptions() {
         try {
-            const response = await fetch('/api/prescriptions/', {
+            const prescriptions = await fetchAllPages('/api/prescriptions/', {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('authToken')}`
                 }
             });
-            const prescriptions = await response.json();
             displayPrescriptions(prescriptions);
         } catch (error) {
             console.error('Error loading prescriptions:', error);